@@ -0,0 +1,96 @@
+"""
+Benchmark pages per second with the local extractive content engine.
+
+Every product opts into the local engine, so no model calls are made: the
+run measures HTML-to-text, sentence scoring, key phrases and rendering.
+Content generation alone is timed too, to separate it from the render.
+
+    python benchmarks/extractive_throughput.py [pages] [--min-rate PAGES_PER_SECOND]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from landing_page_generator import LandingPageGenerator
+from middle_seek.extractive import ExtractiveGenerator
+
+DEFAULT_PAGES = 2000
+
+# Shaped like the sample product in test_generator.py: headings, badges, a feature list and a table
+DESCRIPTION = """<div class="product-description">
+<h1>{name}</h1>
+<div class="compliance-badges"><img alt="ISO Certified" src="/badges/iso.svg" width="80" /></div>
+<div class="product-meta">
+<p><strong>License:</strong> Open Source with Commercial Options</p>
+<p><strong>Support:</strong> Certified Compliance Experts ($150/hr)</p>
+</div>
+<div class="description-section">
+<h2>Simplify Compliance with AI</h2>
+<p>Automate your compliance across 37+ global regulations with our precision-engineered platform.
+Perfect for businesses that value both compliance and ethical technology.</p>
+<div class="highlight-box">
+<h3>Key Features</h3>
+<ul>
+    <li>Instant Audit Reports with Verified Evidence</li>
+    <li>Self-Updating Policy Engine</li>
+    <li>Ethical Impact Scoring</li>
+    <li>Automated Data Privacy Requests</li>
+</ul>
+</div>
+</div>
+<table class="compliance-table">
+    <thead><tr><th>Standard</th><th>Coverage</th><th>Add-On Service</th></tr></thead>
+    <tbody>
+        <tr><td>GDPR (EU)</td><td>Full Data Subject Rights</td><td>DPO Support Package</td></tr>
+        <tr><td>NIST (US)</td><td>Cybersecurity Framework 2.0</td><td>Gap Assessment</td></tr>
+        <tr><td>HIPAA (US)</td><td>Protected Health Information</td><td>Breach Response Plan</td></tr>
+    </tbody>
+</table>
+</div>"""
+
+
+def products(count):
+    for i in range(count):
+        name = f"Compliance Suite {i}"
+        yield {'name': name, 'description': DESCRIPTION.format(name=name), 'price': '99.00',
+               'stock_quantity': i % 40, 'content_engine': 'local',
+               'main_image': f'https://cdn.example.com/suite-{i}-front.jpg',
+               'gallery_images': [f'https://cdn.example.com/suite-{i}-detail.jpg']}
+
+
+def measure(count):
+    catalog = list(products(count))
+    engine = ExtractiveGenerator()
+    start = time.perf_counter()
+    for product in catalog:
+        engine.generate_content(product['name'], product['description'],
+                                [product['main_image']] + product['gallery_images'])
+    content_seconds = time.perf_counter() - start
+
+    generator = LandingPageGenerator('templates/landing_page.html', 'offline')
+    start = time.perf_counter()
+    for product in catalog:
+        generator.generate(product, 'Bench Store')
+    page_seconds = time.perf_counter() - start
+    return count / content_seconds, count / page_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pages', nargs='?', type=int, default=DEFAULT_PAGES)
+    parser.add_argument('--min-rate', type=float, help='exit non-zero below this many pages per second')
+    args = parser.parse_args()
+
+    content_rate, page_rate = measure(args.pages)
+    print(f"{'pages':>8} {'content/s':>10} {'pages/s':>10}")
+    print(f"{args.pages:>8} {content_rate:>10.0f} {page_rate:>10.0f}")
+    if args.min_rate and page_rate < args.min_rate:
+        sys.exit(f"Throughput {page_rate:.0f} pages/s is below {args.min_rate:.0f}")
+
+
+if __name__ == '__main__':
+    main()
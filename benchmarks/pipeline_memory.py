@@ -0,0 +1,95 @@
+"""
+Benchmark peak memory of the batch pipeline against catalog size.
+
+Each catalog size runs in a fresh subprocess so peak RSS is measured
+independently. Content generation is replaced by a local stand-in so the
+benchmark needs no network; parse, sanitize, render and write are real.
+
+    python benchmarks/pipeline_memory.py [sizes...]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from landing_page_generator import LandingPageGenerator
+from catalog_pipeline import CatalogPipeline, iter_products
+
+DEFAULT_SIZES = [250, 1000, 4000]
+DESCRIPTION_KB = 10
+
+
+class LocalContentGenerator(LandingPageGenerator):
+    """Generator whose model stage is a deterministic local stand-in."""
+
+    def generate_content(self, product_data):
+        text = product_data['description']
+        return {'description': text[:300], 'alt_text': f"{product_data['name']} product image"}
+
+
+def write_catalog(path, size):
+    block = "<div><h2>Feature</h2><p>Precision-engineered component with verified evidence.</p></div>\n"
+    description = block * (DESCRIPTION_KB * 1024 // len(block))
+    with open(path, 'w') as f:
+        for i in range(size):
+            f.write(json.dumps({'name': f'Product {i}', 'description': description,
+                                'price': '99.00', 'stock_quantity': i % 40}) + '\n')
+
+
+def measure(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = os.path.join(tmp, 'catalog.jsonl')
+        write_catalog(catalog, size)
+        baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        generator = LocalContentGenerator('templates/landing_page.html', 'offline')
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = CatalogPipeline(generator, 'Bench Store', os.path.join(tmp, 'out'),
+                                 workers=4, queue_size=32).run(iter_products(catalog))
+        elapsed = time.perf_counter() - start
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'size': size,
+            'written': result['written'],
+            'seconds': round(elapsed, 2),
+            'peak_traced_kb': peak_traced // 1024,
+            'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'baseline_rss_kb': baseline_rss,
+        }
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        print(json.dumps(measure(int(sys.argv[2]))))
+        return
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    rows = []
+    for size in sizes:
+        output = subprocess.run([sys.executable, __file__, '--child', str(size)],
+                                capture_output=True, text=True, check=True).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'products':>10} {'seconds':>8} {'peak traced KB':>15} {'peak RSS KB':>12}")
+    for row in rows:
+        print(f"{row['size']:>10} {row['seconds']:>8} {row['peak_traced_kb']:>15} {row['peak_rss_kb']:>12}")
+
+    # Memory must stay flat as the catalog grows
+    growth = rows[-1]['peak_traced_kb'] / max(rows[0]['peak_traced_kb'], 1)
+    print(f"\nPeak traced memory growth from {rows[0]['size']} to {rows[-1]['size']} products: {growth:.2f}x")
+    if growth > 1.5:
+        sys.exit("Peak memory grew with catalog size")
+
+
+if __name__ == '__main__':
+    main()
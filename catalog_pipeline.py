@@ -0,0 +1,202 @@
+"""
+Constant-memory batch pipeline for large product catalogs.
+
+Products stream through parse -> sanitize -> LLM -> render -> write stages.
+Stages run in their own threads and are connected by bounded queues, so a
+slow stage blocks the ones before it and at most a few queue-lengths of
+products are ever held in memory, whatever the catalog size.
+"""
+
+import csv
+import json
+import os
+import queue
+import sys
+import threading
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from landing_page_generator import LandingPageGenerator, atomic_write, page_filename
+from storefronts import Storefront
+from middle_seek.text import html_to_text
+from middle_seek.tracing import TRACER
+
+_DONE = object()
+MAX_RECORDED_ERRORS = 100
+
+
+def _skip_row(row_number: int, error: Exception) -> None:
+    print(f"Skipping row {row_number}: {str(error)}")
+
+
+def iter_products(path: str, on_error: Optional[Callable[[int, Exception], None]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream products from a JSON Lines or CSV export, one row at a time.
+
+    Malformed rows are reported to on_error(row_number, error) and skipped,
+    so one bad line does not end a long export.
+    """
+    on_error = on_error or _skip_row
+    if path.endswith('.csv'):
+        # Descriptions are often tens of KB of HTML
+        csv.field_size_limit(sys.maxsize)
+        with open(path, 'r', newline='') as f:
+            for row_number, row in enumerate(csv.DictReader(f), 1):
+                try:
+                    gallery = row.get('gallery_images') or ''
+                    row['gallery_images'] = [url.strip() for url in gallery.split('|') if url.strip()]
+                    # Left unset when the export has no stock column (e.g. a price-only update)
+                    if 'stock_quantity' in row:
+                        row['stock_quantity'] = int(row['stock_quantity'] or 0)
+                except (TypeError, ValueError) as e:
+                    on_error(row_number, e)
+                    continue
+                yield row
+    else:
+        with open(path, 'r') as f:
+            for row_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    product_data = json.loads(line)
+                except ValueError as e:
+                    on_error(row_number, e)
+                    continue
+                yield product_data
+
+
+def sanitize_product(product_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce the HTML description to visible text before it reaches the model."""
+    product_data['description'] = html_to_text(product_data['description'])
+    return product_data
+
+
+class CatalogPipeline:
+    """Generator pipeline connecting batch stages with bounded queues.
+
+    With `stores`, content generated once per product is rendered for every
+    store into its own subdirectory; on_page then receives the page path
+    relative to output_dir (e.g. "tech-haven/product_x.html").
+    """
+
+    def __init__(self, generator: LandingPageGenerator, store_name: str, output_dir: str,
+                 workers: int = 4, queue_size: int = 32,
+                 on_page: Optional[Callable[[Dict[str, Any], str, str], None]] = None,
+                 stores: Optional[Sequence[Storefront]] = None):
+        if workers < 1 or queue_size < 1:
+            raise ValueError("Workers and queue size must be positive")
+        self.generator = generator
+        self.store_name = store_name
+        self.stores = list(stores) if stores else [Storefront(store_name, slug='')]
+        self.output_dir = output_dir
+        self.workers = workers
+        self.queue_size = queue_size
+        self.on_page = on_page
+
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+        self.errors: List[Dict[str, str]] = []
+
+    def _record_error(self, product_data: Any, stage: str, error: Exception, span=None) -> None:
+        name = product_data.get('name', '?') if isinstance(product_data, dict) else '?'
+        print(f"Error in {stage} stage for {name}: {str(error)}")
+        if span:
+            span.set_error(error)
+            span.end()
+        with self._lock:
+            self.failed += 1
+            if len(self.errors) < MAX_RECORDED_ERRORS:
+                self.errors.append({'product': name, 'stage': stage, 'error': str(error)})
+
+    def record_bad_row(self, row_number: int, error: Exception) -> None:
+        """on_error hook for iter_products: count a malformed row and keep reading."""
+        self._record_error({'name': f'row {row_number}'}, 'parse', error)
+
+    def _read(self, products: Iterable[Dict[str, Any]], out: queue.Queue) -> None:
+        try:
+            for product_data in products:
+                # The page span lives until the write stage finishes with this product
+                span = TRACER.start_span("page", product=product_data.get('name') if isinstance(product_data, dict) else None)
+                try:
+                    with TRACER.span("sanitize", parent=span):
+                        product_data = sanitize_product(product_data)
+                except (KeyError, TypeError, AttributeError) as e:
+                    self._record_error(product_data, 'sanitize', e, span)
+                    continue
+                out.put((product_data, span))
+        except Exception as e:
+            # A broken export stops reading but lets in-flight products finish
+            self._record_error({}, 'parse', e)
+        finally:
+            for _ in range(self.workers):
+                out.put(_DONE)
+
+    def _generate(self, inbox: queue.Queue, out: queue.Queue) -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                out.put(_DONE)
+                return
+            product_data, span = item
+            try:
+                with TRACER.use_span(span):
+                    content = self.generator.generate_content(product_data)
+                out.put((product_data, span, content))
+            except Exception as e:
+                self._record_error(product_data, 'llm', e, span)
+
+    def _render(self, inbox: queue.Queue, out: queue.Queue) -> None:
+        remaining = self.workers
+        while remaining:
+            item = inbox.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            product_data, span, content = item
+            try:
+                with TRACER.use_span(span):
+                    pages = self.generator.render_stores(product_data, self.stores, content)
+                out.put((product_data, span, pages))
+            except Exception as e:
+                self._record_error(product_data, 'render', e, span)
+        out.put(_DONE)
+
+    def _write(self, inbox: queue.Queue) -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            product_data, span, pages = item
+            try:
+                for store, html in pages:
+                    filename = store.path(page_filename(product_data['name']))
+                    with TRACER.use_span(span):
+                        atomic_write(os.path.join(self.output_dir, filename), html)
+                    if self.on_page:
+                        self.on_page(product_data, filename, html)
+                # Counted only once nothing else can fail, so no product is both written and failed
+                with self._lock:
+                    self.written += 1
+                span.end()
+            except Exception as e:
+                self._record_error(product_data, 'write', e, span)
+
+    def run(self, products: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Drive every product through the pipeline and return a summary."""
+        for store in self.stores:
+            os.makedirs(os.path.join(self.output_dir, store.slug), exist_ok=True)
+        to_llm = queue.Queue(self.queue_size)
+        to_render = queue.Queue(self.queue_size)
+        to_write = queue.Queue(self.queue_size)
+
+        threads = [threading.Thread(target=self._read, args=(products, to_llm), name='pipeline-read')]
+        threads += [threading.Thread(target=self._generate, args=(to_llm, to_render), name=f'pipeline-llm-{i}')
+                    for i in range(self.workers)]
+        threads.append(threading.Thread(target=self._render, args=(to_render, to_write), name='pipeline-render'))
+        threads.append(threading.Thread(target=self._write, args=(to_write,), name='pipeline-write'))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return {'written': self.written, 'failed': self.failed, 'errors': list(self.errors)}
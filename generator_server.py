@@ -0,0 +1,218 @@
+"""
+Warm generator daemon exposing a local HTTP API.
+
+Keeps the compiled template, pooled OpenRouter connections and generated
+content in memory so previews pay no per-request setup cost.
+
+    POST /generate  {"product": {...}, "store_name": "..."}  -> {"html", "content"}
+    POST /render    {"product": {...}, "store_name": "...", "content": {...}}  -> {"html"}
+    GET  /metrics   Prometheus text format
+    GET  /healthz   liveness check
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from catalog_pipeline import sanitize_product
+from landing_page_generator import LandingPageGenerator
+from middle_seek.metrics import REGISTRY, MetricsRegistry
+from middle_seek.tracing import TRACER, current_span
+from render_store import content_key
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+# Metrics label for unknown paths, so stray requests cannot grow the metric series
+NOT_FOUND_PATH = "unmatched"
+
+
+class ContentCache:
+    """Thread-safe LRU cache of generated content keyed by product input."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(product_data: Dict[str, Any]) -> str:
+        return content_key(product_data)
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            content = self.entries.get(key)
+            if content is not None:
+                self.entries.move_to_end(key)
+            return content
+
+    def put(self, key: str, content: Dict[str, str]) -> None:
+        with self._lock:
+            self.entries[key] = content
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class BodyTooLarge(ValueError):
+    """Request body exceeds MAX_BODY_BYTES; it is left unread."""
+
+
+class GeneratorServer(ThreadingHTTPServer):
+    """HTTP server holding a single warm LandingPageGenerator."""
+
+    daemon_threads = True
+
+    def __init__(self, address, generator: LandingPageGenerator, store_name: str,
+                 cache: Optional[ContentCache] = None, metrics: MetricsRegistry = REGISTRY):
+        super().__init__(address, GeneratorRequestHandler)
+        self.generator = generator
+        self.store_name = store_name
+        self.cache = cache if cache is not None else ContentCache()
+        self.metrics = metrics
+
+    def generate_content(self, product_data: Dict[str, Any]) -> Dict[str, str]:
+        key = ContentCache.key(product_data)
+        content = self.cache.get(key)
+        if content is not None:
+            self.metrics.inc("generator_content_cache_total", result="hit")
+            return content
+        self.metrics.inc("generator_content_cache_total", result="miss")
+        content = self.generator.generate_content(product_data)
+        self.cache.put(key, content)
+        return content
+
+
+class GeneratorRequestHandler(BaseHTTPRequestHandler):
+    server: GeneratorServer
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: str, content_type: str = "application/json",
+              close: bool = False) -> None:
+        data = body.encode('utf-8')
+        self._status = status
+        # Count the request before the client can see the response (and scrape /metrics)
+        self._record_request()
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        span = current_span()
+        if span:
+            self.send_header("X-Trace-Id", span.trace_id)
+        if close:
+            # Unread request bytes would otherwise be parsed as the next request
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _record_request(self) -> None:
+        start = getattr(self, '_start', None)
+        if start is None:
+            return
+        self._start = None
+        metrics = self.server.metrics
+        path = self._path_label
+        metrics.add("generator_http_in_flight", -1)
+        metrics.inc("generator_http_requests_total", path=path, status=self._status)
+        metrics.observe("generator_http_request_seconds", time.perf_counter() - start, path=path)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], close: bool = False) -> None:
+        self._send(status, json.dumps(payload), close=close)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise BodyTooLarge("Request body too large")
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(body, dict) or not isinstance(body.get('product'), dict):
+            raise ValueError("Request body must be a JSON object with a 'product' object")
+        return body
+
+    def _timed(self, handler, path: Optional[str] = None) -> None:
+        path = path or self.path.split('?', 1)[0]
+        self._path_label = path
+        self._status = 500
+        self._start = time.perf_counter()
+        self.server.metrics.add("generator_http_in_flight", 1)
+        try:
+            with TRACER.span("http.request", method=self.command, path=path) as span:
+                try:
+                    handler()
+                except BodyTooLarge as e:
+                    span.set_error(e)
+                    self._send_json(413, {"error": str(e)}, close=True)
+                except (KeyError, ValueError) as e:
+                    span.set_error(e)
+                    self._send_json(400, {"error": f"{type(e).__name__}: {e}"})
+                except Exception as e:
+                    span.set_error(e)
+                    print(f"Error handling {self.path}: {str(e)}")
+                    self._send_json(500, {"error": str(e)})
+                span.set_attribute("status", self._status)
+        finally:
+            # Only reached without a response if writing it failed
+            self._record_request()
+
+    def do_GET(self):
+        handlers = {"/metrics": self._handle_metrics, "/healthz": self._handle_healthz}
+        handler = handlers.get(self.path.split('?', 1)[0])
+        if handler is None:
+            self._timed(lambda: self._send_json(404, {"error": "Not found"}), NOT_FOUND_PATH)
+            return
+        self._timed(handler)
+
+    def do_POST(self):
+        handlers = {"/generate": self._handle_generate, "/render": self._handle_render}
+        handler = handlers.get(self.path.split('?', 1)[0])
+        if handler is None:
+            self._timed(lambda: self._send_json(404, {"error": "Not found"}, close=True), NOT_FOUND_PATH)
+            return
+        self._timed(handler)
+
+    def _handle_healthz(self):
+        self._send_json(200, {"status": "ok"})
+
+    def _handle_generate(self):
+        body = self._read_json()
+        # Same input cleanup as batch runs, so previews match generated pages
+        product = sanitize_product(body['product'])
+        store_name = body.get('store_name') or self.server.store_name
+        content = self.server.generate_content(product)
+        html = self.server.generator.render(product, store_name, content)
+        self._send_json(200, {"html": html, "content": content})
+
+    def _handle_render(self):
+        body = self._read_json()
+        if not isinstance(body.get('content'), dict):
+            raise ValueError("Render requires a 'content' object")
+        store_name = body.get('store_name') or self.server.store_name
+        html = self.server.generator.render(body['product'], store_name, body['content'])
+        self._send_json(200, {"html": html})
+
+    def _handle_metrics(self):
+        metrics = self.server.metrics
+        metrics.set("generator_content_cache_entries", len(self.server.cache))
+        for model, stats in self.server.generator.middle_seek.router.snapshot().items():
+            metrics.set("middleseek_model_error_rate", stats["error_rate"], model=model)
+            if stats["median_latency"] is not None:
+                metrics.set("middleseek_model_median_latency_seconds", stats["median_latency"], model=model)
+        self._send(200, metrics.render(), "text/plain; version=0.0.4")
+
+
+def serve(generator: LandingPageGenerator, store_name: str, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """Run the warm generator until interrupted."""
+    # Compile the template up front so the first request is warm too
+    generator._get_template()
+    server = GeneratorServer((host, port), generator, store_name)
+    print(f"Serving landing page generator on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
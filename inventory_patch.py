@@ -0,0 +1,218 @@
+"""
+Price and stock patches for already generated pages.
+
+Price and stock_quantity change many times a day, but nothing else on a page
+depends on them. Instead of regenerating, each page's price and stock
+fragments (template blocks delimited by <!--fragment:NAME--> markers) are
+re-rendered on their own and swapped into the existing HTML, with no model
+calls. Stored render context (OUTPUT_DIR/.render) is used when present and is
+updated too, so a later template re-render keeps the new values.
+
+Optionally a small OUTPUT_DIR/inventory/<page>.json is written per product;
+pages generated with inventory hydration load their fragments from it, so
+inventory updates need not touch HTML at all.
+"""
+
+import json
+import os
+import re
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+from landing_page_generator import (LandingPageGenerator, atomic_write, base_page_filename, inventory_path,
+                                    page_filename)
+from middle_seek.tracing import TRACER
+from render_store import RenderStore
+from storefronts import Storefront
+
+# Fragment -> product fields it is rendered from
+INVENTORY_FRAGMENTS = {
+    'price': ('price',),
+    'stock': ('stock_quantity',),
+}
+INVENTORY_FIELDS = ('price', 'stock_quantity')
+MAX_RECORDED_ERRORS = 100
+
+
+def fragment_pattern(name: str) -> "re.Pattern[str]":
+    return re.compile(r'<!--fragment:%s-->.*?<!--/fragment:%s-->' % (re.escape(name), re.escape(name)), re.S)
+
+
+_PATTERNS = {name: fragment_pattern(name) for name in INVENTORY_FRAGMENTS}
+
+
+def replace_fragments(html: str, fragments: Dict[str, str]) -> Optional[str]:
+    """Swap each marked fragment for its new rendering; None if a page lacks a marker."""
+    for name, fragment in fragments.items():
+        pattern = _PATTERNS.get(name) or fragment_pattern(name)
+        html, count = pattern.subn(lambda _: fragment, html, count=1)
+        if not count:
+            return None
+    return html
+
+
+def inventory_changes(update: Dict[str, Any]) -> Dict[str, Any]:
+    """The inventory fields an update row actually sets; absent or empty fields stay unchanged."""
+    changes = {field: update[field] for field in INVENTORY_FIELDS if update.get(field) not in (None, '')}
+    if 'stock_quantity' in changes:
+        # The template compares stock numerically; a string would fail the render
+        changes['stock_quantity'] = int(changes['stock_quantity'])
+    return changes
+
+
+class InventoryPatcher:
+    """Apply price/stock updates to every page of a product across stores."""
+
+    def __init__(self, generator: LandingPageGenerator, output_dir: str,
+                 stores: Optional[Sequence[Storefront]] = None, store_name: str = 'Tech Haven',
+                 write_html: bool = True, write_json: bool = False):
+        self.generator = generator
+        self.output_dir = output_dir
+        self.stores = list(stores) if stores else [Storefront(store_name, slug='')]
+        self.write_html = write_html
+        self.write_json = write_json
+        self.patched = 0
+        self.unchanged = 0
+        self.missing = 0
+        self.failed = 0
+        self.hydrated = 0
+        self._indexes: Dict[str, Dict[str, List[str]]] = {}
+        self.errors: List[Dict[str, str]] = []
+
+    def _pages(self, directory: str, name: str) -> List[str]:
+        """The product's page and its locale/variant pages in one store directory."""
+        index = self._indexes.get(directory)
+        if index is None:
+            index = self._indexes[directory] = self._index(directory)
+        return sorted(index.get(page_filename(name), ()))
+
+    @staticmethod
+    def _index(directory: str) -> Dict[str, List[str]]:
+        """Map each base page name to its files, listing the directory once per run."""
+        index: Dict[str, List[str]] = {}
+        try:
+            entries = os.listdir(directory)
+        except FileNotFoundError:
+            return index
+        for entry in entries:
+            if entry.startswith('.') or not entry.endswith('.html'):
+                continue
+            # Every page is a product page; locale/variant pages also belong to their base page
+            index.setdefault(entry, []).append(entry)
+            base = base_page_filename(entry)
+            if base:
+                index.setdefault(base, []).append(entry)
+        return index
+
+    def _context(self, store: Storefront, render_store: RenderStore, filename: str, name: str,
+                 changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Render context for a page: stored if available, else just what the update provides."""
+        record = render_store.load(filename)
+        if record:
+            record['product'].update(changes)
+            return record
+        product = {'name': name, 'price': '', **changes}
+        return {'product': product, 'store_name': store.name, 'locale': 'en',
+                'content': {'description': '', 'alt_text': ''}, 'stored': False}
+
+    def _record_error(self, name: str, error: Exception) -> None:
+        print(f"Error patching {name}: {str(error)}")
+        self.failed += 1
+        if len(self.errors) < MAX_RECORDED_ERRORS:
+            self.errors.append({'product': name, 'error': str(error)})
+
+    def record_bad_row(self, row_number: int, error: Exception) -> None:
+        """on_error hook for iter_products: count a malformed row and keep reading."""
+        self._record_error(f'row {row_number}', error)
+
+    def patch(self, update: Dict[str, Any]) -> None:
+        """Patch every page of one product; counts land in patched/unchanged/missing/failed."""
+        name = update.get('name')
+        try:
+            changes = inventory_changes(update)
+            if not name or not changes:
+                raise ValueError("Updates need a name and a price or stock_quantity")
+        except (TypeError, ValueError) as e:
+            self._record_error(name or '?', e)
+            return
+
+        with TRACER.span("patch", product=name):
+            found = False
+            for store in self.stores:
+                directory = os.path.join(self.output_dir, store.slug)
+                render_store = RenderStore(directory)
+                pages = self._pages(directory, name)
+                product = None
+                for filename in pages:
+                    try:
+                        product = self._patch_page(store, directory, render_store, filename, name, changes) or product
+                    except Exception as e:
+                        self._record_error(f"{name} ({store.path(filename)})", e)
+                if pages and self.write_json:
+                    try:
+                        self._write_inventory(store, directory, name, changes, product)
+                    except Exception as e:
+                        self._record_error(f"{name} ({store.path(inventory_path(name))})", e)
+                found = found or bool(pages)
+            if not found:
+                self.missing += 1
+
+    def _patch_page(self, store: Storefront, directory: str, render_store: RenderStore, filename: str,
+                    name: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Patch one page; returns its full product data when render context is stored."""
+        context = self._context(store, render_store, filename, name, changes)
+        stored = context.pop('stored', True)
+        if stored:
+            render_store.save(filename, context['product'], context['store_name'], context['content'],
+                              context['locale'])
+        if self.write_html:
+            self._patch_html(store, os.path.join(directory, filename), context, stored, changes)
+        return context['product'] if stored else None
+
+    def _patch_html(self, store: Storefront, path: str, context: Dict[str, Any], stored: bool,
+                    changes: Dict[str, Any]) -> None:
+        # Without stored context only fragments whose inputs the update carries can be rendered
+        known = set(context['product']) if stored else set(changes)
+        names = [fragment for fragment, fields in INVENTORY_FRAGMENTS.items() if known.issuperset(fields)]
+        fragments = self.generator.render_fragments(context['product'], context['store_name'], context['content'],
+                                                    names, context['locale'], store.template_path)
+        with open(path, 'r') as f:
+            html = f.read()
+        patched = replace_fragments(html, fragments)
+        if patched is None:
+            if not stored:
+                raise ValueError("Page has no fragment markers and no stored render context")
+            # Pages from before the fragment markers: a full re-render is still model-free
+            patched = self.generator.render(context['product'], context['store_name'], context['content'],
+                                            context['locale'], store.template_path)
+        if patched == html:
+            self.unchanged += 1
+            return
+        atomic_write(path, patched)
+        self.patched += 1
+
+    def _write_inventory(self, store: Storefront, directory: str, name: str, changes: Dict[str, Any],
+                         product: Optional[Dict[str, Any]]) -> None:
+        """Write the product's hydration JSON: current price/stock and their rendered fragments."""
+        path = os.path.join(directory, inventory_path(name))
+        try:
+            with open(path, 'r') as f:
+                inventory = json.load(f)
+        except (FileNotFoundError, ValueError):
+            inventory = {}
+        if product:
+            inventory.update({field: product[field] for field in INVENTORY_FIELDS if field in product})
+        inventory.update(changes)
+        known = set(inventory).intersection(INVENTORY_FIELDS)
+        names = [fragment for fragment, fields in INVENTORY_FRAGMENTS.items() if known.issuperset(fields)]
+        product = {'name': name, 'price': '', **{field: inventory[field] for field in known}}
+        inventory['fragments'] = self.generator.render_fragments(
+            product, store.name, {'description': '', 'alt_text': ''}, names, template_path=store.template_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, json.dumps(inventory, ensure_ascii=False))
+        self.hydrated += 1
+
+    def run(self, updates: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        for update in updates:
+            self.patch(update)
+        return {'patched': self.patched, 'unchanged': self.unchanged, 'missing': self.missing,
+                'hydrated': self.hydrated, 'failed': self.failed, 'errors': list(self.errors)}
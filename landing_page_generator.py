@@ -1,15 +1,42 @@
 import os
 import json
-import requests
+import argparse
 from jinja2 import Template
 import re
-from typing import Dict, Any
+import time
+import threading
+import tempfile
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime
+from functools import partial
 from dotenv import load_dotenv
+from middle_seek.routing import ModelRouter
+from middle_seek.dedup import ContentDeduplicator
+from middle_seek.core import create_session, THROTTLE_RETRIES
+from middle_seek.concurrency import AdaptiveLimiter, LIMITER
+from middle_seek.metrics import REGISTRY
+from middle_seek import variants as variant_prompts
+from middle_seek import images as image_prompts
+from middle_seek.images import ImageAltCache, DEFAULT_IMAGE_ALT_ENTRIES
+from middle_seek.extractive import ExtractiveGenerator
+from middle_seek.replay import RecordingSession, ReplaySession
+from middle_seek.text import html_to_text, load_json
+from middle_seek.validation import FieldValidator, generate_validated, record_first_pass
+from middle_seek.tracing import TRACER, JsonLinesExporter, current_trace_id, new_trace_id
+from storefronts import Storefront, load_storefronts
 
 class MiddleSeekProcessor:
-    def __init__(self, openrouter_api_key: str):
+    def __init__(self, openrouter_api_key: str, router: Optional[ModelRouter] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, validator: Optional[FieldValidator] = None,
+                 retry_budget: int = 2):
         self.openrouter_api_key = openrouter_api_key
+        self.router = router or ModelRouter()
+        self.limiter = limiter or LIMITER
+        self.validator = validator or FieldValidator()
+        self.retry_budget = retry_budget
+        # Outages and exhausted retries get extractive copy rather than raw input
+        self.fallback_engine = ExtractiveGenerator()
+        self.session = create_session()
         self.headers = {
             "Authorization": f"Bearer {openrouter_api_key}",
             "Content-Type": "application/json",
@@ -27,16 +54,59 @@ class MiddleSeekProcessor:
 
     def _get_quantum_seed(self, action: str) -> str:
         """Generate Quantum Seed Crystal."""
-        return f"QSC-{self.timestamp}-{action}"
+        return f"QSC-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{action}"
 
     def _get_trace_id(self) -> str:
-        """Generate Trace ID."""
-        return f"OPEN-DHAMMA-6σ-MSQ-GALACTIC-{self.timestamp}"
-
-    def _call_deepseek(self, prompt: str, intention: str) -> str:
-        """Call DeepSeek model through OpenRouter API with Dharma Protocol."""
+        """Generate Trace ID, unique per request (shared by all spans of the active trace)."""
+        trace_id = current_trace_id() or new_trace_id()
+        return f"OPEN-DHAMMA-6σ-MSQ-GALACTIC-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{trace_id}"
+
+    def _call_deepseek(self, prompt: str, intention: str, field: Optional[str] = None,
+                       params: Optional[Dict[str, Any]] = None) -> str:
+        """Call the routed model through OpenRouter API with Dharma Protocol."""
+        choices = self._call_deepseek_choices(prompt, intention, field, params)
+        return choices[0] if choices else None
+
+    def _call_deepseek_choices(self, prompt: str, intention: str, field: Optional[str] = None,
+                               params: Optional[Dict[str, Any]] = None) -> Optional[List[str]]:
+        """Call the routed model and return every completion choice."""
+        # One span per attempt; throttled attempts are retried once the limiter admits them again
+        for _ in range(THROTTLE_RETRIES + 1):
+            with TRACER.span("llm.call", intention=intention, field=field) as span:
+                choices, status = self._request_choices(span, prompt, intention, field, params)
+                span.set_attribute("status", status)
+                if choices is None:
+                    span.set_error(RuntimeError("request failed"))
+            if choices is not None or status != 429:
+                return choices
+        return None
+
+    def _request_choices(self, span, prompt: str, intention: str, field: Optional[str],
+                         params: Optional[Dict[str, Any]]) -> Tuple[Optional[List[str]], Optional[int]]:
         url = "https://openrouter.ai/api/v1/chat/completions"
-        
+        with TRACER.span("llm.prompt"):
+            route, payload = self._build_payload(prompt, intention, field, params)
+        span.set_attribute("model", route["model"])
+
+        with self.limiter.request(route["model"]) as permit:
+            start = time.perf_counter()
+            try:
+                with TRACER.span("llm.http"):
+                    response = self.session.post(url, headers=self.headers, json=payload)
+                    permit.observe(response.status_code, response.headers)
+                    response.raise_for_status()
+                with TRACER.span("json.parse"):
+                    choices = [choice['message']['content'] for choice in response.json()['choices']]
+                self._record_call(route["model"], intention, time.perf_counter() - start, True)
+                return choices, permit.status
+            except Exception as e:
+                self._record_call(route["model"], intention, time.perf_counter() - start, False)
+                print(f"Error calling {route['model']}: {str(e)}")
+                return None, permit.status
+
+    def _build_payload(self, prompt: str, intention: str, field: Optional[str],
+                       params: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return the selected route and the request payload for a prompt."""
         # Construct Dharma Protocol enhanced prompt
         dharma_prompt = f"""# MiddleSeek: Open-Source Dharma Protocol
 Prompt ID: {self.prompt_id}
@@ -74,23 +144,49 @@ This work is offered freely under ISO 25010 + DMAIC
 
 Please provide a response that aligns with the Dharma Protocol and maintains ethical standards."""
 
+        route = self.router.select(intention, field)
         payload = {
-            "model": "deepseek/deepseek-chat-v3-0324",
             "messages": [
                 {"role": "system", "content": "You are MiddleSeek, an AI assistant operating under the Dharma Protocol. Your responses should be clear, ethical, and beneficial to all beings."},
                 {"role": "user", "content": dharma_prompt}
             ],
-            "temperature": 0.7,
-            "max_tokens": 500
+            **route,
+            **(params or {})
         }
-
-        try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content']
-        except Exception as e:
-            print(f"Error calling DeepSeek: {str(e)}")
-            return None
+        return route, payload
+
+    def _record_call(self, model: str, intention: str, latency: float, ok: bool) -> None:
+        """Feed call outcome to the router and the metrics registry."""
+        self.router.record(model, latency, ok)
+        status = "ok" if ok else "error"
+        REGISTRY.inc("middleseek_llm_requests_total", model=model, intention=intention, status=status)
+        REGISTRY.observe("middleseek_llm_request_seconds", latency, model=model)
+
+    def _clean(self, text: str) -> str:
+        """Trim model output for HTML use."""
+        return text.strip().strip('"\'“”').strip()
+
+    def _generate_field(self, prompt: str, intention: str, field: str, source: str,
+                        fallback: Callable[[], str]) -> str:
+        """Generate one field through local validation, retrying only this field on failure."""
+        def call(attempt_prompt: str, params: Optional[Dict[str, Any]]) -> Optional[str]:
+            if not params:
+                return self._call_deepseek(attempt_prompt, intention, field)
+            # Retries run in JSON response-format mode; unwrap the 'raw' field
+            response = self._call_deepseek(attempt_prompt + '\nExample: {"raw": "Your text here"}',
+                                           intention, field, params)
+            data = load_json(response) if response else None
+            return str(data.get('raw', '')) if isinstance(data, dict) else response
+
+        return generate_validated(call, self._clean, self.validator, prompt, intention, field,
+                                  source, fallback, self.retry_budget)
+
+    def _validated_cells(self, cells: Dict[Tuple[str, str], Dict[str, str]],
+                         source: str) -> Dict[Tuple[str, str], Dict[str, str]]:
+        """Keep only variant cells whose description and alt text pass validation."""
+        return {key: cell for key, cell in cells.items()
+                if not self.validator.validate('description', cell['description'], source)
+                and not self.validator.validate('alt_text', cell['alt_text'], source)}
 
     def rewrite_description(self, description: str) -> str:
         """Rewrite product description using DeepSeek with Dharma Protocol."""
@@ -113,10 +209,9 @@ Original description: {description}
 
 Rewritten description:"""
         
-        rewritten = self._call_deepseek(prompt, "ETHICAL-OPTIMIZATION")
-        if rewritten:
-            return rewritten.strip()
-        return description  # Fallback to original if API call fails
+        # Fall back to an extractive summary if generation fails validation or the API call fails
+        fallback = partial(self.fallback_engine.rewrite_description, description)
+        return self._generate_field(prompt, "ETHICAL-OPTIMIZATION", "description", description, fallback)
 
     def generate_meta_description(self, name: str, description: str) -> str:
         """Generate SEO-optimized meta description (max 160 characters)."""
@@ -142,10 +237,8 @@ Description: {description}
 
 Meta description:"""
         
-        meta = self._call_deepseek(prompt, "SEO")
-        if meta:
-            return meta.strip()[:160]
-        return f"{name} - {description[:100]}..."  # Fallback
+        fallback = partial(self.fallback_engine.generate_meta_description, name, description)
+        return self._generate_field(prompt, "SEO", "meta_description", f"{name} {description}", fallback)[:160]
 
     def generate_title_tag(self, name: str, store_name: str) -> str:
         """Generate SEO-optimized title tag (max 60 characters)."""
@@ -171,10 +264,8 @@ Store Name: {store_name}
 
 Title tag:"""
         
-        title = self._call_deepseek(prompt, "SEO")
-        if title:
-            return title.strip()[:60]
-        return f"{name} | {store_name}"  # Fallback
+        fallback = partial(self.fallback_engine.generate_title_tag, name, store_name)
+        return self._generate_field(prompt, "SEO", "title_tag", f"{name} {store_name}", fallback)[:60]
 
     def generate_alt_text(self, product_name: str, description: str) -> str:
         """Generate SEO-optimized alt text using DeepSeek with Dharma Protocol."""
@@ -198,44 +289,405 @@ Description: {description}
 
 Alt text:"""
         
-        alt_text = self._call_deepseek(prompt, "TRUTHFUL-ACCESSIBILITY")
-        if alt_text:
-            return alt_text.strip()
-        # Fallback to basic alt text if API call fails
-        return f"{product_name} product image"
+        # Fall back to extractive alt text if generation fails
+        fallback = partial(self.fallback_engine.generate_alt_text, product_name, description)
+        return self._generate_field(prompt, "TRUTHFUL-ACCESSIBILITY", "alt_text",
+                                    f"{product_name} {description}", fallback)
+
+    def generate_image_alts(self, product_name: str, description: str,
+                            image_urls: Sequence[str]) -> Dict[str, str]:
+        """Generate alt text for every product image, one call per batch of images.
+
+        Only alt texts that pass validation are returned, so callers can cache
+        them and fill in fallbacks for the rest.
+        """
+        source = f"{product_name} {description}"
+        alts: Dict[str, str] = {}
+        for batch in image_prompts.image_batches(list(image_urls)):
+            response = self._request_image_alts(product_name, description, batch)
+            found = self._validated_alts(image_prompts.parse_image_alts(response, batch), source)
+            for url in batch:
+                record_first_pass("TRUTHFUL-ACCESSIBILITY", url in found)
+
+            # One follow-up call covers missing or invalid images; a failed request is not retried
+            missing = [url for url in batch if url not in found]
+            if missing and response is not None:
+                retried = self._request_image_alts(product_name, description, missing)
+                found.update(self._validated_alts(image_prompts.parse_image_alts(retried, missing), source))
+            alts.update(found)
+        return alts
+
+    def _request_image_alts(self, product_name: str, description: str, image_urls: Sequence[str]) -> Optional[str]:
+        prompt = image_prompts.build_image_alt_prompt(product_name, description, image_urls)
+        params = {"max_tokens": image_prompts.image_max_tokens(len(image_urls))}
+        return self._call_deepseek(prompt, "TRUTHFUL-ACCESSIBILITY", "alt_text", params)
+
+    def _validated_alts(self, alts: Dict[str, str], source: str) -> Dict[str, str]:
+        return {url: alt for url, alt in alts.items() if not self.validator.validate('alt_text', alt, source)}
+
+    def generate_variants(self, product_name: str, description: str, locales: Sequence[str],
+                          variants: Sequence[str] = ('A', 'B'),
+                          strategy: str = 'structured') -> Dict[Tuple[str, str], Dict[str, str]]:
+        """Generate description and alt text for every (locale, variant) in batched calls.
+
+        The 'structured' strategy asks for all cells in one JSON response; the
+        'n' strategy makes one call per locale with the API's `n` parameter.
+        """
+        if not locales or not variants:
+            raise ValueError("At least one locale and one variant are required")
+        if strategy not in ('structured', 'n'):
+            raise ValueError(f"Unknown variant strategy: {strategy}")
+
+        cells: Dict[Tuple[str, str], Dict[str, str]] = {}
+        if strategy == 'n':
+            for locale in locales:
+                prompt = variant_prompts.build_locale_prompt(product_name, description, locale)
+                params = {"n": len(variants), "max_tokens": variant_prompts.variant_max_tokens(1)}
+                choices = self._call_deepseek_choices(prompt, "CONTENT", "variants", params) or []
+                parsed = {}
+                for variant, choice in zip(variants, choices):
+                    cell = variant_prompts.parse_cell(load_json(choice))
+                    if cell:
+                        parsed[(locale, variant)] = cell
+                parsed = self._validated_cells(parsed, f"{product_name} {description}")
+                for variant in variants:
+                    record_first_pass("CONTENT", (locale, variant) in parsed)
+                cells.update(parsed)
+        else:
+            # Grids too large for one response are split by locale rather than truncated
+            for batch_locales, batch_variants in variant_prompts.grid_batches(locales, variants):
+                cells.update(self._generate_variant_batch(product_name, description, batch_locales, batch_variants))
+
+        # Fall back to extractive content for anything the model did not provide. That copy is
+        # in the source language, so the cell carries its locale for the page to declare.
+        missing = variant_prompts.missing_cells(cells, locales, variants)
+        if missing:
+            fallback = {'description': self.fallback_engine.rewrite_description(description, product_name),
+                        'alt_text': self.fallback_engine.generate_alt_text(product_name, description),
+                        'locale': variant_prompts.SOURCE_LOCALE}
+            untranslated = [f"{locale}/{variant}" for locale, variant in missing
+                            if locale != variant_prompts.SOURCE_LOCALE]
+            if untranslated:
+                print(f"Untranslated {variant_prompts.SOURCE_LOCALE} fallback for {product_name}: "
+                      f"{', '.join(untranslated)}")
+            for key in missing:
+                cells[key] = dict(fallback)
+        return cells
+
+    def _generate_variant_batch(self, product_name: str, description: str, locales: Sequence[str],
+                                variants: Sequence[str]) -> Dict[Tuple[str, str], Dict[str, str]]:
+        """One structured call for a grid, plus one follow-up call for missing cells."""
+        prompt = variant_prompts.build_variant_prompt(product_name, description, locales, variants)
+        params = {"max_tokens": variant_prompts.variant_max_tokens(len(locales) * len(variants))}
+        response = self._call_deepseek(prompt, "CONTENT", "variants", params)
+        source = f"{product_name} {description}"
+        cells = self._validated_cells(variant_prompts.parse_variant_response(response, locales, variants), source)
+        for locale in locales:
+            for variant in variants:
+                record_first_pass("CONTENT", (locale, variant) in cells)
+
+        # The follow-up covers missing or malformed cells; a failed request is not retried
+        missing = variant_prompts.missing_cells(cells, locales, variants)
+        if missing and response is not None:
+            retry_locales = sorted({locale for locale, _ in missing}, key=list(locales).index)
+            retry_variants = sorted({variant for _, variant in missing}, key=list(variants).index)
+            prompt = variant_prompts.build_variant_prompt(product_name, description, retry_locales, retry_variants)
+            params = {"max_tokens": variant_prompts.variant_max_tokens(len(retry_locales) * len(retry_variants))}
+            retried = self._validated_cells(variant_prompts.parse_variant_response(
+                self._call_deepseek(prompt, "CONTENT", "variants", params), retry_locales, retry_variants), source)
+            cells.update({key: cell for key, cell in retried.items() if key in missing})
+        return cells
+
+# Per-product price/stock JSON for hydrating pages, under each store's output directory
+INVENTORY_DIR = 'inventory'
 
 class LandingPageGenerator:
-    def __init__(self, template_path: str, openrouter_api_key: str):
+    def __init__(self, template_path: str, openrouter_api_key: str, router: Optional[ModelRouter] = None,
+                 deduplicator: Optional[ContentDeduplicator] = None,
+                 image_alt_cache: Optional[ImageAltCache] = None,
+                 local_tiers: Sequence[str] = (), inventory_hydration: bool = False):
         self.template_path = template_path
-        self.middle_seek = MiddleSeekProcessor(openrouter_api_key)
+        self.middle_seek = MiddleSeekProcessor(openrouter_api_key, router)
+        self.local_engine = ExtractiveGenerator()
+        self.local_tiers = set(local_tiers)
+        # Pages load price/stock fragments from inventory JSON written by patch mode
+        self.inventory_hydration = inventory_hydration
+        self.deduplicator = deduplicator
+        self.image_alt_cache = image_alt_cache if image_alt_cache is not None else ImageAltCache(DEFAULT_IMAGE_ALT_ENTRIES)
+        # Compiled templates by path (stores may use their own), with the mtime they were read at
+        self._templates: Dict[str, Tuple[int, Template]] = {}
+        self._template_lock = threading.Lock()
+
+    def _get_template(self, template_path: Optional[str] = None) -> Template:
+        """Return the compiled template, recompiling only when the file changes."""
+        template_path = template_path or self.template_path
+        mtime = os.stat(template_path).st_mtime_ns
+        with self._template_lock:
+            cached = self._templates.get(template_path)
+            if cached is None or cached[0] != mtime:
+                with open(template_path, 'r') as f:
+                    cached = (mtime, Template(f.read()))
+                self._templates[template_path] = cached
+            return cached[1]
+
+    def uses_local_engine(self, product_data: Dict[str, Any]) -> bool:
+        """Products opt in with content_engine='local'; tiers listed in local_tiers ('*' = all) do too."""
+        engine = product_data.get('content_engine')
+        if engine:
+            return engine == 'local'
+        return '*' in self.local_tiers or product_data.get('tier') in self.local_tiers
+
+    def generate_content(self, product_data: Dict[str, Any]) -> Dict[str, str]:
+        """Generate the model-written fields for a product."""
+        name = product_data['name']
+        description = product_data['description']
+        key = str(product_data.get('id', name))
+        images = product_images(product_data)
+
+        if self.uses_local_engine(product_data):
+            # Cheap enough to recompute, so it bypasses the dedup index and alt text cache
+            with TRACER.span("content", product=name, engine="local"):
+                return self.local_engine.generate_content(name, description, images)
+
+        with TRACER.span("content", product=name, engine="llm") as span:
+            # Near-duplicates (variants, re-listings) reuse earlier content
+            reused = None
+            if self.deduplicator:
+                reused = self.deduplicator.lookup(key, name, description)
+                span.set_attribute("deduplicated", reused is not None)
+
+            if reused:
+                content = dict(reused)
+            else:
+                # Process product data with MiddleSeek
+                content = {'description': self.middle_seek.rewrite_description(description)}
+
+            # Alt text describes specific images, so it is never borrowed from a near-duplicate
+            if images:
+                content['image_alts'] = self.generate_image_alts(name, description, images)
+                content['alt_text'] = content['image_alts'][images[0]]
+            elif 'alt_text' not in content:
+                content['alt_text'] = self.middle_seek.generate_alt_text(name, description)
+
+            if self.deduplicator and not reused:
+                # Only image-independent fields are indexed for reuse
+                indexed = {field: value for field, value in content.items() if field != 'image_alts'}
+                if images:
+                    del indexed['alt_text']
+                self.deduplicator.add(key, name, description, indexed)
+            return content
+
+    def generate_image_alts(self, name: str, description: str, images: Sequence[str]) -> Dict[str, str]:
+        """Alt text per image URL: cached URLs are reused, the rest come from one batched call."""
+        alts, missing = self.image_alt_cache.lookup(images)
+        if missing:
+            generated = self.middle_seek.generate_image_alts(name, description, missing)
+            for url, alt_text in generated.items():
+                self.image_alt_cache.put(url, alt_text)
+            alts.update(generated)
+        REGISTRY.inc("middleseek_image_alt_cache_total", len(images) - len(missing), result="hit")
+        REGISTRY.inc("middleseek_image_alt_cache_total", len(missing), result="miss")
+        # Fallbacks are not cached, so a later run can still replace them
+        missing = [url for url in images if not alts.get(url)]
+        if missing:
+            alts.update(self.local_engine.generate_image_alts(name, description, missing))
+        return {url: alts[url] for url in images}
 
     def generate(self, product_data: Dict[str, Any], store_name: str) -> str:
         """Generate landing page HTML from product data."""
-        # Process product data with MiddleSeek
-        rewritten_description = self.middle_seek.rewrite_description(product_data['description'])
-        alt_text = self.middle_seek.generate_alt_text(
-            product_data['name'],
-            product_data['description']
-        )
-
-        # Prepare template data
-        template_data = {
+        with TRACER.span("page", product=product_data.get('name'), store=store_name):
+            content = self.generate_content(product_data)
+            return self.render(product_data, store_name, content)
+
+    def generate_stores(self, product_data: Dict[str, Any],
+                        stores: Sequence[Storefront]) -> List[Tuple[Storefront, str]]:
+        """Generate content once and render a page for every store."""
+        with TRACER.span("page", product=product_data.get('name'), stores=len(stores)):
+            content = self.generate_content(product_data)
+            return self.render_stores(product_data, stores, content)
+
+    def render_stores(self, product_data: Dict[str, Any], stores: Sequence[Storefront],
+                      content: Dict[str, str]) -> List[Tuple[Storefront, str]]:
+        """Render already generated content for each store; no model calls."""
+        return [(store, self.render(product_data, store.name, content, template_path=store.template_path))
+                for store in stores]
+
+    def generate_variants(self, product_data: Dict[str, Any], store_name: str, locales: Sequence[str],
+                          variants: Sequence[str] = ('A', 'B'),
+                          strategy: str = 'structured') -> Dict[Tuple[str, str], str]:
+        """Render one landing page per (locale, variant) from batched generation."""
+        # Same visible-text reduction the batch pipeline applies before the model sees it
+        description = html_to_text(product_data['description'])
+        cells = self.middle_seek.generate_variants(product_data['name'], description, locales, variants, strategy)
+        # Fallback cells are not in the requested locale and say which one they are in
+        return {key: self.render(product_data, store_name, content, locale=content.get('locale', key[0]))
+                for key, content in cells.items()}
+
+    def render(self, product_data: Dict[str, Any], store_name: str, content: Dict[str, str],
+               locale: str = 'en', template_path: Optional[str] = None) -> str:
+        """Render landing page HTML from product data and generated content.
+
+        Only store-independent fields come from `content`; store-dependent
+        ones (the title tag) are derived here, so one generation pass can be
+        rendered for any number of stores.
+        """
+        template_data = self._template_data(product_data, store_name, content, locale)
+        with TRACER.span("render", product=product_data['name'], locale=locale):
+            return self._get_template(template_path).render(**template_data)
+
+    def render_fragments(self, product_data: Dict[str, Any], store_name: str, content: Dict[str, str],
+                         names: Sequence[str], locale: str = 'en',
+                         template_path: Optional[str] = None) -> Dict[str, str]:
+        """Render only the named template blocks (e.g. price and stock), not the whole page."""
+        template = self._get_template(template_path)
+        missing = [name for name in names if name not in template.blocks]
+        if missing:
+            raise ValueError(f"Template has no block named {', '.join(missing)}")
+        context = template.new_context(self._template_data(product_data, store_name, content, locale))
+        with TRACER.span("render", product=product_data['name'], fragments=','.join(names)):
+            return {name: ''.join(template.blocks[name](context)) for name in names}
+
+    def _template_data(self, product_data: Dict[str, Any], store_name: str, content: Dict[str, str],
+                       locale: str) -> Dict[str, Any]:
+        return {
+            'locale': locale,
             'product_name': product_data['name'],
-            'description': rewritten_description,
+            'description': content['description'],
             'price': product_data['price'],
             'main_image': product_data.get('main_image', ''),
             'gallery_images': product_data.get('gallery_images', []),
             'stock_quantity': product_data.get('stock_quantity', 0),
             'store_name': store_name,
-            'MiddleSeek_alt_text': alt_text
+            'title_tag': self.local_engine.generate_title_tag(product_data['name'], store_name),
+            'MiddleSeek_alt_text': content['alt_text'],
+            'image_alts': content.get('image_alts') or {},
+            'inventory_url': inventory_path(product_data['name']) if self.inventory_hydration else None,
         }
 
-        # Load and render template
-        with open(self.template_path, 'r') as f:
-            template = Template(f.read())
-        return template.render(**template_data)
+def product_images(product_data: Dict[str, Any]) -> List[str]:
+    """Main image followed by gallery images, without blanks or repeats."""
+    images = [product_data.get('main_image') or ''] + list(product_data.get('gallery_images') or [])
+    return list(dict.fromkeys(url for url in images if url))
+
+def atomic_write(path: str, content: str) -> None:
+    """Write a file via a temporary sibling and rename, so readers never see partial output."""
+    directory = os.path.dirname(path) or '.'
+    with TRACER.span("write", path=path, bytes=len(content)):
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            # mkstemp creates 0600 files; published pages must stay readable
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+# Locale and A/B variant parts page_filename appends, e.g. product_x.pt-BR.A.html
+_LOCALE_RE = re.compile(r'[A-Za-z]{2,3}(?:[-_][A-Za-z0-9]{2,8})*')
+_VARIANT_RE = re.compile(r'[A-Za-z0-9]{1,8}')
+_PAGE_SUFFIX_RE = re.compile(r'\.%s(?:\.%s)?\.html$' % (_LOCALE_RE.pattern, _VARIANT_RE.pattern))
+
+def page_filename(name: str, locale: Optional[str] = None, variant: Optional[str] = None) -> str:
+    """Return the output file name for a product page (or one of its variants)."""
+    if locale and not _LOCALE_RE.fullmatch(locale):
+        raise ValueError(f"Invalid locale for a page file name: {locale!r}")
+    if variant and (not locale or not _VARIANT_RE.fullmatch(variant)):
+        raise ValueError(f"Invalid variant for a page file name: {variant!r}")
+    suffix = ''.join(f'.{part}' for part in (locale, variant) if part)
+    return f'product_{name.lower().replace(" ", "_")}{suffix}.html'
+
+def base_page_filename(filename: str) -> Optional[str]:
+    """The product page a locale/variant page belongs to, or None if it has no such suffix.
+
+    Product names may contain dots ("Desk Lamp 2.0"), so only suffixes shaped
+    like the ones page_filename writes count.
+    """
+    match = _PAGE_SUFFIX_RE.search(filename)
+    return filename[:match.start()] + '.html' if match else None
+
+def inventory_path(name: str) -> str:
+    """Path of a product's inventory JSON, relative to its pages (shared by locale/variant pages)."""
+    return f'{INVENTORY_DIR}/{page_filename(name)[:-len(".html")]}.json'
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate MiddleSeek product landing pages.")
+    parser.add_argument('--profile', nargs='?', const='profile', metavar='DIR',
+                        help="Write per-stage CPU profiles, collapsed stacks and allocation sites to DIR")
+    traffic = parser.add_mutually_exclusive_group()
+    traffic.add_argument('--record', metavar='PATH', help="Append every LLM response to a JSONL recording")
+    traffic.add_argument('--replay', metavar='PATH', help="Answer LLM calls from a recording instead of the API")
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve_parser = subparsers.add_parser('serve', help="Keep a warm generator behind a local HTTP API")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+
+    batch_parser = subparsers.add_parser('batch', help="Stream a JSONL or CSV catalog through the generator")
+    batch_parser.add_argument('catalog', help="Path to a .jsonl or .csv product export")
+    batch_parser.add_argument('--workers', type=int, default=16,
+                              help="Upper bound on LLM workers; the adaptive limiter sets how many requests are in flight")
+    batch_parser.add_argument('--queue-size', type=int, default=32, help="Bound on each inter-stage queue")
+
+    watch_parser = subparsers.add_parser('watch', help="Rebuild only the pages affected by template or product edits")
+    watch_parser.add_argument('sources', nargs='+', help="Product .json/.jsonl/.csv files or directories of them")
+    watch_parser.add_argument('--interval', type=float, default=0.25, help="Polling interval in seconds")
+    watch_parser.add_argument('--live-reload', action='store_true', help="Serve the output with browser live reload")
+    watch_parser.add_argument('--host', default='127.0.0.1')
+    watch_parser.add_argument('--port', type=int, default=35729)
+
+    patch_parser = subparsers.add_parser('patch', help="Update price and stock in existing pages without regenerating")
+    patch_parser.add_argument('updates', help="A .jsonl or .csv of rows with name plus price and/or stock_quantity")
+    patch_parser.add_argument('--json', action='store_true',
+                              help="Also write inventory/<page>.json for pages built with INVENTORY_HYDRATION")
+    patch_parser.add_argument('--json-only', action='store_true',
+                              help="Only write the inventory JSON (and render context); leave the HTML untouched")
+    return parser
+
+def build_generator(api_key: str, dedup_path: Optional[str] = None,
+                    image_alt_path: Optional[str] = None) -> LandingPageGenerator:
+    """Construct a generator from the optional environment configuration."""
+    # Optional per-field routing table (JSON layered over the defaults)
+    routes_path = os.getenv('MIDDLESEEK_ROUTES')
+    router = ModelRouter.from_json(routes_path) if routes_path else None
+
+    # Optional near-duplicate index persisted between runs
+    deduplicator = None
+    if dedup_path:
+        deduplicator = ContentDeduplicator.load(dedup_path) if os.path.exists(dedup_path) else ContentDeduplicator()
+
+    # Optional per-image-URL alt text cache persisted between runs
+    image_alt_cache = None
+    if image_alt_path:
+        image_alt_cache = (ImageAltCache.load(image_alt_path) if os.path.exists(image_alt_path)
+                           else ImageAltCache(DEFAULT_IMAGE_ALT_ENTRIES))
+
+    # Tiers served by the local extractive engine (LOCAL_TIERS=long-tail,clearance; '*' for all)
+    local_tiers = [tier.strip() for tier in os.getenv('LOCAL_TIERS', '').split(',') if tier.strip()]
+
+    # Pages fetch price/stock from inventory JSON written by patch mode
+    inventory_hydration = os.getenv('INVENTORY_HYDRATION', '').lower() in ('1', 'true', 'yes')
+
+    return LandingPageGenerator('templates/landing_page.html', api_key, router, deduplicator, image_alt_cache,
+                                local_tiers, inventory_hydration)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.profile:
+        return run(args)
+
+    from middle_seek.profiling import StageProfiler
+    profiler = StageProfiler(args.profile)
+    profiler.start()
+    try:
+        return run(args)
+    finally:
+        profiler.stop()
+        print(f"\nProfile written to {profiler.write_report()}")
 
-def main():
+def run(args: argparse.Namespace):
+    """Run the command selected on the command line."""
     # Load environment variables from .env file
     load_dotenv(override=True)
     
@@ -243,22 +695,97 @@ def main():
     OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
     STORE_NAME = os.getenv('STORE_NAME', 'Tech Haven')
     OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'output')
+    DEDUP_INDEX = os.getenv('DEDUP_INDEX')
+    IMAGE_ALT_CACHE = os.getenv('IMAGE_ALT_CACHE')
+    SITE_BASE_URL = os.getenv('SITE_BASE_URL')
+    STORES = os.getenv('STORES')
 
     # Debug logging
     print("\nEnvironment Variables:")
     print("-" * 50)
     print(f"OPENROUTER_API_KEY: {'*' * len(OPENROUTER_API_KEY) if OPENROUTER_API_KEY else 'Not set'}")
     print(f"STORE_NAME: {STORE_NAME}")
+    print(f"STORES: {STORES or 'Not set'}")
     print(f"OUTPUT_DIR: {OUTPUT_DIR}")
     print("-" * 50)
 
     # Validate required environment variables
-    if not OPENROUTER_API_KEY:
+    # Fully local (offline), replayed and patch runs need no API key
+    offline = args.replay or args.command == 'patch' or os.getenv('LOCAL_TIERS', '').strip() == '*'
+    if not OPENROUTER_API_KEY and not offline:
         print("Error: OPENROUTER_API_KEY environment variable not set")
         return
 
+    # Optional span export (OTLP JSON lines) for finding which stage owns the latency
+    trace_path = os.getenv('TRACE_EXPORT')
+    if trace_path:
+        TRACER.exporter = JsonLinesExporter(trace_path)
+
     # Initialize generator
-    generator = LandingPageGenerator('templates/landing_page.html', OPENROUTER_API_KEY)
+    generator = build_generator(OPENROUTER_API_KEY, DEDUP_INDEX, IMAGE_ALT_CACHE)
+
+    # Recorded LLM traffic lets profiled runs repeat a real workload without the API
+    if args.replay:
+        generator.middle_seek.session = ReplaySession(args.replay)
+    elif args.record:
+        generator.middle_seek.session = RecordingSession(generator.middle_seek.session, args.record)
+
+    if args.command == 'serve':
+        from generator_server import serve
+        serve(generator, STORE_NAME, args.host, args.port)
+        return
+
+    # Optional multi-store fan-out: one generation pass, one output tree per store
+    stores = load_storefronts(STORES) if STORES else [Storefront(STORE_NAME, slug='')]
+
+    # Optional sitemap/catalog index per store, maintained from the pages each run writes
+    sitemaps = {}
+    if SITE_BASE_URL:
+        from sitemap_index import SitemapIndex
+        sitemaps = {store.slug: SitemapIndex(os.path.join(OUTPUT_DIR, store.slug), store.site_url(SITE_BASE_URL),
+                                             store.name)
+                    for store in stores}
+    sitemap = sitemaps.get('')
+
+    def record_page(product, path, html):
+        slug, filename = os.path.split(path)
+        sitemaps[slug].record(filename, product['name'], html)
+
+    if args.command == 'patch':
+        from catalog_pipeline import iter_products
+        from inventory_patch import InventoryPatcher
+        patcher = InventoryPatcher(generator, OUTPUT_DIR, stores, write_html=not args.json_only,
+                                   write_json=args.json or args.json_only)
+        result = patcher.run(iter_products(args.updates, patcher.record_bad_row))
+        print(f"\nPatched {result['patched']} pages ({result['unchanged']} unchanged, {result['hydrated']} "
+              f"inventory files, {result['missing']} products without pages, {result['failed']} failed)")
+        return
+
+    if args.command == 'watch':
+        if STORES:
+            print(f"Watch mode renders a single store; using STORE_NAME ({STORE_NAME})")
+        from page_watcher import PageWatcher, start_live_reload
+        live_reload = start_live_reload(OUTPUT_DIR, args.host, args.port) if args.live_reload else None
+        watcher = PageWatcher(generator, STORE_NAME, OUTPUT_DIR, args.sources,
+                              on_change=live_reload.notify if live_reload else None, sitemap=sitemap)
+        watcher.run(args.interval)
+        return
+
+    if args.command == 'batch':
+        from catalog_pipeline import CatalogPipeline, iter_products
+        pipeline = CatalogPipeline(generator, STORE_NAME, OUTPUT_DIR, args.workers, args.queue_size,
+                                   record_page if sitemaps else None, stores)
+        result = pipeline.run(iter_products(args.catalog, pipeline.record_bad_row))
+        for store_sitemap in sitemaps.values():
+            store_sitemap.flush()
+        if generator.deduplicator:
+            generator.deduplicator.save(DEDUP_INDEX)
+            generator.deduplicator.write_report(os.path.join(OUTPUT_DIR, 'dedup_report.json'))
+        if IMAGE_ALT_CACHE:
+            generator.image_alt_cache.save(IMAGE_ALT_CACHE)
+        print(f"\nGenerated {result['written']} products x {len(stores)} store(s) "
+              f"({result['failed']} failed) in {OUTPUT_DIR}")
+        return
 
     try:
         # Get product details from user
@@ -281,18 +808,29 @@ def main():
             'stock_quantity': int(input("Stock quantity (default 0): ").strip() or "0")
         }
         
-        # Create output directory if it doesn't exist
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        
-        # Generate landing page
-        html_content = generator.generate(product_data, STORE_NAME)
+        with TRACER.span("request", product=name):
+            # Generate content once and render a landing page per store
+            output_paths = []
+            for store, html_content in generator.generate_stores(product_data, stores):
+                # Create output directory if it doesn't exist
+                os.makedirs(os.path.join(OUTPUT_DIR, store.slug), exist_ok=True)
+
+                # Save generated page
+                path = store.path(page_filename(name))
+                atomic_write(os.path.join(OUTPUT_DIR, path), html_content)
+                output_paths.append(os.path.join(OUTPUT_DIR, path))
+                if sitemaps:
+                    record_page(product_data, path, html_content)
+            for store_sitemap in sitemaps.values():
+                store_sitemap.flush()
         
-        # Save generated page
-        output_path = os.path.join(OUTPUT_DIR, f'product_{name.lower().replace(" ", "_")}.html')
-        with open(output_path, 'w') as f:
-            f.write(html_content)
-        
-        print(f"\nLanding page generated successfully: {output_path}")
+        if generator.deduplicator:
+            generator.deduplicator.save(DEDUP_INDEX)
+            generator.deduplicator.write_report(os.path.join(OUTPUT_DIR, 'dedup_report.json'))
+        if IMAGE_ALT_CACHE:
+            generator.image_alt_cache.save(IMAGE_ALT_CACHE)
+
+        print(f"\nLanding page generated successfully: {', '.join(output_paths)}")
         print("\nPreview of generated content:")
         print("-" * 50)
         print(f"Product: {name}")
@@ -305,4 +843,4 @@ def main():
         raise  # Re-raise the exception to see the full traceback
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -4,9 +4,17 @@ Galactic Dharma Singularity Version
 """
 
 from .core import DharmaProtocol, MiddleSeekCore, MiddleSeekProcessor
+from .routing import ModelRouter
+from .concurrency import AdaptiveLimiter
+from .dedup import ContentDeduplicator
+from .validation import FieldValidator
+from .extractive import ExtractiveGenerator
+from .tracing import Tracer, TRACER, JsonLinesExporter
 
 __version__ = "0.1.0"
 __author__ = "Kusala Tech"
 __license__ = "AGPL-3.0"
 
-__all__ = ['DharmaProtocol', 'MiddleSeekCore', 'MiddleSeekProcessor'] 
\ No newline at end of file
+__all__ = ['DharmaProtocol', 'MiddleSeekCore', 'MiddleSeekProcessor', 'ModelRouter', 'AdaptiveLimiter',
+           'ContentDeduplicator', 'FieldValidator', 'ExtractiveGenerator',
+           'Tracer', 'TRACER', 'JsonLinesExporter'] 
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+MiddleSeek Adaptive Concurrency
+AIMD limiter for in-flight LLM requests, driven by rate-limit feedback
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+
+from .metrics import REGISTRY, MetricsRegistry
+
+
+def _header_float(headers: Optional[Mapping[str, str]], name: str) -> Optional[float]:
+    if not headers:
+        return None
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Permit:
+    """One admitted request; report its response with observe()."""
+
+    def __init__(self, route: str, saturated: bool, start: float):
+        self.route = route
+        self.saturated = saturated
+        self.start = start
+        self.status: Optional[int] = None
+        self.headers: Optional[Mapping[str, str]] = None
+
+    def observe(self, status: Optional[int], headers: Optional[Mapping[str, str]] = None) -> None:
+        self.status = status
+        self.headers = headers
+
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease cap on concurrent requests.
+
+    The limit grows by roughly one per window of successful requests while
+    latency stays within `latency_tolerance` of the baseline for the same
+    route (model), so a slow large model is not judged against a fast small
+    one. A 429 cuts the limit by `backoff` (at most once per `cooldown`
+    seconds, so a burst of throttled responses counts as one signal) and
+    honours Retry-After. Slow responses and server errors shrink it gently.
+    An exhausted rate-limit budget pauses admission until the window resets.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 64,
+                 backoff: float = 0.5, latency_backoff: float = 0.9, latency_tolerance: float = 2.0,
+                 cooldown: float = 1.0, max_pause: float = 60.0, metrics: MetricsRegistry = REGISTRY,
+                 clock: Callable[[], float] = time.monotonic, wall_clock: Callable[[], float] = time.time):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.max_pause = max_pause
+        self.metrics = metrics
+        self.clock = clock
+        self.wall_clock = wall_clock
+
+        self.limit = float(initial)
+        self.in_flight = 0
+        self.baselines: Dict[str, float] = {}
+        self.paused_until = 0.0
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+        self._publish()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def _publish(self) -> None:
+        self.metrics.set("middleseek_llm_concurrency_limit", self.current_limit)
+        self.metrics.set("middleseek_llm_in_flight", self.in_flight)
+
+    def acquire(self, route: str = "*") -> Permit:
+        """Block until a request on the given route (model) may start."""
+        with self._condition:
+            while True:
+                wait = self.paused_until - self.clock()
+                if wait <= 0 and self.in_flight < self.current_limit:
+                    break
+                self._condition.wait(timeout=wait if wait > 0 else None)
+            self.in_flight += 1
+            # Only grow when the limit is actually what constrains us
+            saturated = self.in_flight >= self.current_limit
+            self._publish()
+            return Permit(route, saturated, self.clock())
+
+    def release(self, permit: Permit) -> None:
+        """Finish a request and adapt the limit to how it went."""
+        now = self.clock()
+        latency = now - permit.start
+        with self._condition:
+            self.in_flight -= 1
+            if permit.status == 429:
+                self._throttled(now, permit.headers)
+            elif permit.status is None or permit.status >= 500:
+                self._decrease(now, self.latency_backoff)
+            else:
+                self._succeeded(now, permit.route, latency, permit.saturated)
+            self._apply_headers(now, permit.headers)
+            self._publish()
+            self._condition.notify_all()
+
+    @contextmanager
+    def request(self, route: str = "*") -> Iterator[Permit]:
+        """Hold a permit for the duration of one request."""
+        permit = self.acquire(route)
+        try:
+            yield permit
+        finally:
+            self.release(permit)
+
+    def _decrease(self, now: float, factor: float) -> None:
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    def _pause(self, now: float, seconds: float) -> None:
+        seconds = min(max(0.0, seconds), self.max_pause)
+        self.paused_until = max(self.paused_until, now + seconds)
+
+    def _throttled(self, now: float, headers: Optional[Mapping[str, str]]) -> None:
+        self.metrics.inc("middleseek_llm_throttled_total")
+        self._decrease(now, self.backoff)
+        # Without a Retry-After hint, hold new requests for one cooldown
+        retry_after = _header_float(headers, "Retry-After") or self.cooldown
+        self._pause(now, retry_after)
+
+    def _succeeded(self, now: float, route: str, latency: float, saturated: bool) -> None:
+        # Each route's baseline tracks its fastest recent latency and drifts up slowly
+        baseline = self.baselines.get(route)
+        baseline = latency if baseline is None else min(latency, baseline * 1.05)
+        self.baselines[route] = baseline
+        if latency > baseline * self.latency_tolerance:
+            self._decrease(now, self.latency_backoff)
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _apply_headers(self, now: float, headers: Optional[Mapping[str, str]]) -> None:
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        reset = _header_float(headers, "X-RateLimit-Reset")
+        if remaining is None or remaining > 0 or not reset:
+            return
+        # OpenRouter sends the reset as epoch milliseconds; accept epoch seconds too
+        reset_seconds = reset / 1000.0 if reset > 1e11 else reset
+        self._pause(now, reset_seconds - self.wall_clock())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._condition:
+            return {"limit": self.current_limit, "in_flight": self.in_flight,
+                    "baseline_latency": dict(self.baselines),
+                    "paused_for": max(0.0, self.paused_until - self.clock())}
+
+
+# Shared by every client, since they all draw on the same provider capacity
+LIMITER = AdaptiveLimiter()
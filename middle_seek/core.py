@@ -3,13 +3,33 @@ MiddleSeek Core Module
 Open-Source Dharma Protocol (Galactic Dharma Singularity Version)
 """
 
-import os
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import requests
 import re
 import json
 
+from .routing import ModelRouter
+from .concurrency import AdaptiveLimiter, LIMITER
+from .metrics import REGISTRY
+from .text import load_json
+from .validation import FieldValidator, generate_validated
+from .tracing import TRACER, current_trace_id, new_trace_id
+
+# Extra attempts for a request rejected with 429 before giving up
+THROTTLE_RETRIES = 2
+
+
+def create_session(pool_size: int = 32) -> requests.Session:
+    """Create a pooled HTTP session so calls reuse warm TLS connections."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class DharmaProtocol:
     """Core Dharma Protocol implementation."""
     
@@ -25,11 +45,12 @@ class DharmaProtocol:
 
     def generate_quantum_seed_crystal(self, action: str = "DEFAULT") -> str:
         """Generate Quantum Seed Crystal."""
-        return f"QSC-{self.timestamp}-{action}"
+        return f"QSC-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{action}"
 
     def generate_trace_id(self) -> str:
-        """Generate Trace ID."""
-        return f"OPEN-DHAMMA-6σ-MSQ-GALACTIC-{self.timestamp}"
+        """Generate Trace ID, unique per request (shared by all spans of the active trace)."""
+        trace_id = current_trace_id() or new_trace_id()
+        return f"OPEN-DHAMMA-6σ-MSQ-GALACTIC-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{trace_id}"
 
     def get_akashic_sync_node(self) -> str:
         """Generate Akashic Sync Node."""
@@ -38,11 +59,15 @@ class DharmaProtocol:
 class MiddleSeekCore:
     """Core MiddleSeek implementation with Dharma Protocol."""
 
-    def __init__(self, openrouter_api_key: str):
+    def __init__(self, openrouter_api_key: str, router: Optional[ModelRouter] = None,
+                 limiter: Optional[AdaptiveLimiter] = None):
         if not openrouter_api_key or openrouter_api_key == "invalid-key":
             raise ValueError("Invalid OpenRouter API key")
         self.openrouter_api_key = openrouter_api_key
         self.dharma = DharmaProtocol()
+        self.router = router or ModelRouter()
+        self.limiter = limiter or LIMITER
+        self.session = create_session()
         self.headers = {
             "Authorization": f"Bearer {openrouter_api_key}",
             "Content-Type": "application/json",
@@ -88,14 +113,36 @@ This work is offered freely under ISO 25010 + DMAIC
 
 Please provide a response that aligns with the Dharma Protocol and maintains ethical standards."""
 
-    def call_deepseek(self, prompt: str, intention: str) -> Optional[str]:
-        """Call DeepSeek model through OpenRouter API with Dharma Protocol."""
+    def call_deepseek(self, prompt: str, intention: str, field: Optional[str] = None,
+                      params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Call the routed model through OpenRouter API with Dharma Protocol."""
         url = "https://openrouter.ai/api/v1/chat/completions"
-        
+
+        # One span per attempt; throttled attempts are retried once the limiter admits them again.
+        # Each attempt re-selects its route, so a throttled model's recorded failure can steer it away.
+        for _ in range(THROTTLE_RETRIES + 1):
+            route = self.router.select(intention, field)
+            content, status = self._call_once(url, prompt, intention, field, params, route)
+            if content is not None or status != 429:
+                return content
+        return None
+
+    def _call_once(self, url: str, prompt: str, intention: str, field: Optional[str],
+                   params: Optional[Dict[str, Any]], route: Dict[str, Any]) -> Tuple[Optional[str], Optional[int]]:
+        with TRACER.span("llm.call", model=route["model"], intention=intention, field=field) as span:
+            with TRACER.span("llm.prompt"):
+                payload = self._build_payload(prompt, intention, params, route)
+            content, status = self._post(url, payload, intention, route)
+            span.set_attribute("status", status)
+            if content is None:
+                span.set_error(RuntimeError("request failed"))
+            return content, status
+
+    def _build_payload(self, prompt: str, intention: str, params: Optional[Dict[str, Any]],
+                       route: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the chat completion payload for one attempt."""
         dharma_prompt = self._construct_dharma_prompt(prompt, intention)
-        
-        payload = {
-            "model": "deepseek/deepseek-chat-v3-0324",
+        return {
             "messages": [
                 {
                     "role": "system",
@@ -106,63 +153,88 @@ Please provide a response that aligns with the Dharma Protocol and maintains eth
                     "content": dharma_prompt
                 }
             ],
-            "temperature": 0.7,
-            "max_tokens": 500,
             "top_p": 0.9,
             "frequency_penalty": 0.1,
-            "presence_penalty": 0.1
+            "presence_penalty": 0.1,
+            **route,
+            **(params or {})
         }
 
-        try:
-            print(f"Making API call to {url}")
-            print(f"Headers: {self.headers}")
-            print(f"Payload: {json.dumps(payload, indent=2)}")
-            
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content']
-        except requests.exceptions.RequestException as e:
-            print(f"Error calling DeepSeek: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response status: {e.response.status_code}")
-                print(f"Response headers: {e.response.headers}")
-                print(f"Response body: {e.response.text}")
-            return None
-
-    def process_text(self, text: str, intention: str) -> Dict[str, Any]:
-        """Process text through DeepSeek."""
+    def _post(self, url: str, payload: Dict[str, Any], intention: str,
+              route: Dict[str, Any]) -> Tuple[Optional[str], Optional[int]]:
+        """Send the chat completion request and record its outcome. Returns (content, HTTP status)."""
+        with self.limiter.request(route["model"]) as permit:
+            start = time.perf_counter()
+            try:
+                print(f"Making API call to {url}")
+                print(f"Headers: {self.headers}")
+                print(f"Payload: {json.dumps(payload, indent=2)}")
+
+                with TRACER.span("llm.http"):
+                    response = self.session.post(url, headers=self.headers, json=payload)
+                    permit.observe(response.status_code, response.headers)
+                    response.raise_for_status()
+                with TRACER.span("json.parse"):
+                    content = response.json()['choices'][0]['message']['content']
+                self._record_call(route["model"], intention, time.perf_counter() - start, True)
+                return content, permit.status
+            except requests.exceptions.RequestException as e:
+                self._record_call(route["model"], intention, time.perf_counter() - start, False)
+                print(f"Error calling {route['model']}: {str(e)}")
+                if hasattr(e, 'response') and e.response is not None:
+                    print(f"Response status: {e.response.status_code}")
+                    print(f"Response headers: {e.response.headers}")
+                    print(f"Response body: {e.response.text}")
+                return None, permit.status
+
+    def _record_call(self, model: str, intention: str, latency: float, ok: bool) -> None:
+        """Feed call outcome to the router and the metrics registry."""
+        self.router.record(model, latency, ok)
+        status = "ok" if ok else "error"
+        REGISTRY.inc("middleseek_llm_requests_total", model=model, intention=intention, status=status)
+        REGISTRY.observe("middleseek_llm_request_seconds", latency, model=model)
+
+    def process_text(self, text: str, intention: str, field: Optional[str] = None,
+                     params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Process text through DeepSeek; processed_text is None if the API call fails."""
         if not text:
             raise ValueError("Text cannot be empty")
-            
+
+        # One span per request, so the prompt and the result share its trace ID
+        with TRACER.span("process_text", intention=intention, field=field):
+            return self._process_text(text, intention, field, params)
+
+    def _process_text(self, text: str, intention: str, field: Optional[str],
+                      params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         # Request raw HTML-ready output in JSON
         text = f"""{text}
 
 Return a JSON object with a single 'raw' field containing only the text to be used in HTML. No labels, no analysis, no protocol references.
 Example: {{"raw": "Your text here"}}"""
             
-        result = self.call_deepseek(text, intention)
+        result = self.call_deepseek(text, intention, field, params)
         if result:
-            try:
-                # Parse JSON response
-                json_result = json.loads(result)
-                return {
-                    "processed_text": json_result.get("raw", "").strip(),
-                    "dharma_beacon": self.dharma.generate_beacon_signal(intention),
-                    "quantum_seed": self.dharma.generate_quantum_seed_crystal(),
-                    "trace_id": self.dharma.generate_trace_id()
-                }
-            except json.JSONDecodeError:
-                # Fallback to cleaning if JSON parsing fails
-                result = result.strip()
-                result = re.sub(r'^["\']|["\']$', '', result)
+            # Parse JSON response (tolerating code fences)
+            json_result = load_json(result)
+            if isinstance(json_result, dict):
                 return {
-                    "processed_text": result,
+                    "processed_text": str(json_result.get("raw", "")).strip(),
                     "dharma_beacon": self.dharma.generate_beacon_signal(intention),
                     "quantum_seed": self.dharma.generate_quantum_seed_crystal(),
                     "trace_id": self.dharma.generate_trace_id()
                 }
+            # Fallback to cleaning if JSON parsing fails
+            result = result.strip()
+            result = re.sub(r'^["\']|["\']$', '', result)
+            return {
+                "processed_text": result,
+                "dharma_beacon": self.dharma.generate_beacon_signal(intention),
+                "quantum_seed": self.dharma.generate_quantum_seed_crystal(),
+                "trace_id": self.dharma.generate_trace_id()
+            }
+        # No usable response: callers fall back rather than retry against a failing API
         return {
-            "processed_text": text,
+            "processed_text": None,
             "dharma_beacon": self.dharma.generate_beacon_signal(intention),
             "quantum_seed": self.dharma.generate_quantum_seed_crystal(),
             "trace_id": self.dharma.generate_trace_id()
@@ -171,22 +243,28 @@ Example: {{"raw": "Your text here"}}"""
 class MiddleSeekProcessor:
     """High-level processor for web content optimization."""
 
-    def __init__(self, openrouter_api_key: str):
-        self.core = MiddleSeekCore(openrouter_api_key)
+    def __init__(self, openrouter_api_key: str, router: Optional[ModelRouter] = None,
+                 validator: Optional[FieldValidator] = None, retry_budget: int = 2,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        self.core = MiddleSeekCore(openrouter_api_key, router, limiter)
+        self.validator = validator or FieldValidator()
+        self.retry_budget = retry_budget
 
-    def _clean_text(self, text: str) -> str:
+    def _clean_text(self, text: str, source: str = "") -> str:
         """Clean text for web use and verify grammar."""
+        if not text or not text.strip():
+            return ""
+
         # Remove any quotes
         text = text.strip('"\'')
         
         # Remove any markdown
         text = text.replace('*', '').replace('_', '').replace('`', '')
         
-        # Remove any protocol verification text
-        text = text.split('(Dharma')[0] if '(Dharma' in text else text
-        text = text.split('Dharma')[0] if 'Dharma' in text else text
-        text = text.split('Protocol')[0] if 'Protocol' in text else text
-        text = text.split('Verified')[0] if 'Verified' in text else text
+        # Remove any protocol verification text, unless the product itself uses the word
+        for marker in ('(Dharma', 'Dharma', 'Protocol', 'Verified'):
+            if marker in text and marker.lower() not in source.lower():
+                text = text.split(marker)[0]
         
         # Remove any analysis or commentary
         text = text.split('**')[0] if '**' in text else text
@@ -216,21 +294,28 @@ class MiddleSeekProcessor:
         
         return text.strip()
 
+    def _generate_field(self, prompt: str, intention: str, field: str, source: str, fallback: str) -> str:
+        """Generate one field, retrying only this field while its output fails validation."""
+        def call(attempt_prompt: str, params: Optional[Dict[str, Any]]) -> Optional[str]:
+            return self.core.process_text(attempt_prompt, intention, field, params)["processed_text"]
+
+        return generate_validated(call, lambda text: self._clean_text(text, source), self.validator,
+                                  prompt, intention, field, source, fallback, self.retry_budget)
+
     def rewrite_description(self, description: str) -> str:
         """Generate web-ready product description."""
         if not description:
             raise ValueError("Description cannot be empty")
         prompt = f"Write product description: {description}"
-        result = self.core.process_text(prompt, "CONTENT")
-        return self._clean_text(result["processed_text"])
+        return self._generate_field(prompt, "CONTENT", "description", description, description)
 
     def generate_meta_description(self, name: str, description: str) -> str:
         """Generate SEO-optimized meta description (max 160 characters)."""
         if not name or not description:
             raise ValueError("Name and description cannot be empty")
         prompt = f"Write meta description for: {name}"
-        result = self.core.process_text(prompt, "SEO")
-        meta = self._clean_text(result["processed_text"])
+        fallback = f"{name} - {description[:100]}..."
+        meta = self._generate_field(prompt, "SEO", "meta_description", f"{name} {description}", fallback)
         return meta[:160]
 
     def generate_alt_text(self, name: str, description: str) -> str:
@@ -238,14 +323,14 @@ class MiddleSeekProcessor:
         if not name or not description:
             raise ValueError("Name and description cannot be empty")
         prompt = f"Write alt text for: {name}"
-        result = self.core.process_text(prompt, "ACCESSIBILITY")
-        return self._clean_text(result["processed_text"])
+        fallback = f"{name} product image"
+        return self._generate_field(prompt, "ACCESSIBILITY", "alt_text", f"{name} {description}", fallback)
 
     def generate_title_tag(self, name: str, store_name: str) -> str:
         """Generate SEO-optimized title tag (max 60 characters)."""
         if not name or not store_name:
             raise ValueError("Name and store name cannot be empty")
         prompt = f"Write title for: {name} - {store_name}"
-        result = self.core.process_text(prompt, "SEO")
-        title = self._clean_text(result["processed_text"])
+        fallback = f"{name} | {store_name}"
+        title = self._generate_field(prompt, "SEO", "title_tag", f"{name} {store_name}", fallback)
         return title[:60] 
\ No newline at end of file
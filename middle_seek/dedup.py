@@ -0,0 +1,185 @@
+"""
+MiddleSeek Near-Duplicate Detection
+SimHash index over normalized descriptions for reusing generated content
+"""
+
+import hashlib
+import json
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from .text import normalize_text
+
+FINGERPRINT_BITS = 64
+
+
+def simhash(tokens: List[str], shingle_size: int = 3) -> int:
+    """Compute a 64-bit SimHash over word shingles."""
+    if len(tokens) < shingle_size:
+        shingles = [' '.join(tokens)]
+    else:
+        shingles = [' '.join(tokens[i:i + shingle_size])
+                    for i in range(len(tokens) - shingle_size + 1)]
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class ContentDeduplicator:
+    """Reuse generated content across near-identical products."""
+
+    def __init__(self, threshold: float = 0.9, shingle_size: int = 3, min_tokens: int = 8):
+        if not 0 < threshold <= 1:
+            raise ValueError("Threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.max_distance = int((1 - threshold) * FINGERPRINT_BITS)
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+
+        # Split fingerprints into more bands than the allowed distance, so any
+        # match within max_distance shares at least one band exactly.
+        self.bands = max(4, self.max_distance + 1)
+        while FINGERPRINT_BITS % self.bands:
+            self.bands += 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+
+        self.entries: List[Dict[str, Any]] = []
+        self.keys: Dict[str, int] = {}
+        self.buckets: Dict[Tuple[int, int], List[int]] = {}
+        self.audit: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def fingerprint(self, description: str) -> Optional[int]:
+        """Fingerprint a description, or None if it is too short to compare."""
+        tokens = normalize_text(description).split()
+        if len(tokens) < self.min_tokens:
+            return None
+        return simhash(tokens, self.shingle_size)
+
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << self.band_bits) - 1
+        for band in range(self.bands):
+            yield band, fingerprint >> (band * self.band_bits) & mask
+
+    def _nearest(self, fingerprint: int, exclude_key: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        best = None
+        # A product's own earlier entry is not a near-duplicate of it
+        seen = {self.keys[exclude_key]} if exclude_key in self.keys else set()
+        for key in self._band_keys(fingerprint):
+            for index in self.buckets.get(key, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+                distance = hamming_distance(fingerprint, self.entries[index]['fingerprint'])
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (self.entries[index], distance)
+        return best
+
+    def _add(self, key: str, name: str, fingerprint: int, content: Dict[str, str]) -> None:
+        entry = {
+            'key': key,
+            'name': name,
+            'fingerprint': fingerprint,
+            'content': dict(content),
+        }
+        index = self.keys.get(key)
+        if index is None:
+            index = self.keys[key] = len(self.entries)
+            self.entries.append(entry)
+        else:
+            # Regenerated content replaces the product's previous entry
+            for band_key in self._band_keys(self.entries[index]['fingerprint']):
+                self.buckets[band_key].remove(index)
+            self.entries[index] = entry
+        for band_key in self._band_keys(fingerprint):
+            self.buckets.setdefault(band_key, []).append(index)
+
+    def add(self, key: str, name: str, description: str, content: Dict[str, str]) -> None:
+        """Index freshly generated content for a product."""
+        fingerprint = self.fingerprint(description)
+        if fingerprint is None:
+            return
+        with self._lock:
+            self._add(key, name, fingerprint, content)
+
+    def lookup(self, key: str, name: str, description: str) -> Optional[Dict[str, str]]:
+        """Return adapted content from a near-duplicate product, if one exists."""
+        fingerprint = self.fingerprint(description)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            match = self._nearest(fingerprint, key)
+            if match is None:
+                return None
+            entry, distance = match
+            self.audit.append({
+                'product': key,
+                'name': name,
+                'reused_from': entry['key'],
+                'distance': distance,
+                'similarity': round(1 - distance / FINGERPRINT_BITS, 4),
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+            })
+        return self.adapt(entry['content'], entry['name'], name)
+
+    @staticmethod
+    def adapt(content: Dict[str, str], source_name: str, target_name: str) -> Dict[str, str]:
+        """Swap the source product's name for the target's in reused content."""
+        if not source_name or source_name == target_name:
+            return dict(content)
+        pattern = re.compile(re.escape(source_name), re.IGNORECASE)
+        return {field: pattern.sub(lambda _: target_name, value) if isinstance(value, str) else value
+                for field, value in content.items()}
+
+    def report(self) -> Dict[str, Any]:
+        """Summarize which products were deduplicated and from where."""
+        with self._lock:
+            return {
+                'threshold': self.threshold,
+                'max_distance': self.max_distance,
+                'indexed': len(self.entries),
+                'deduplicated': len(self.audit),
+                'products': list(self.audit),
+            }
+
+    def write_report(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def save(self, path: str) -> None:
+        """Persist the index so later runs can reuse earlier content."""
+        with self._lock:
+            data = {
+                'threshold': self.threshold,
+                'shingle_size': self.shingle_size,
+                'min_tokens': self.min_tokens,
+                'entries': [dict(entry, fingerprint=format(entry['fingerprint'], '016x'))
+                            for entry in self.entries],
+            }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> "ContentDeduplicator":
+        with open(path, 'r') as f:
+            data = json.load(f)
+        dedup = cls(data['threshold'], data['shingle_size'], data['min_tokens'])
+        for entry in data['entries']:
+            dedup._add(entry['key'], entry['name'], int(entry['fingerprint'], 16), entry['content'])
+        return dedup
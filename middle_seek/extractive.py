@@ -0,0 +1,213 @@
+"""
+MiddleSeek Extractive Engine
+Deterministic local content generation: no network, no model calls
+"""
+
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from .text import html_to_text, tokenize
+from .validation import FIELD_LIMITS
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“(])|\n+')
+_HINT_RE = re.compile(r'[a-z]+')
+_CHUNK_RE = re.compile(r'[,;:!?()\[\]"“”|/\n]+|\.(?!\d)')
+_PHRASE_WORD_RE = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9'%-]|\.(?=\d))*")
+MAX_PHRASE_WORDS = 3
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having
+he her here hers him his how i if in into is it its itself just me more most my no nor not now of
+off on once only or other our ours out over own same she should so some such than that the their
+them then there these they this those through to too under until up very was we were what when
+where which while who whom why will with you your yours new one get gets make makes made per
+experience enjoy offers features keeps lets
+""".split())
+
+# Filename words that say what an image shows
+IMAGE_HINTS = frozenset("""
+front back side top bottom rear left right angle detail closeup close zoom inside interior open
+closed folded packaging package box lifestyle model worn in-use use scale dimensions size label
+black white grey gray silver gold red blue green yellow orange pink purple brown beige navy
+""".split())
+
+
+def _trim(text: str, limit: int) -> str:
+    """Cut text to at most `limit` characters at a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit + 1].rsplit(' ', 1)[0].rstrip(' ,;:-–|')
+    return cut if cut else text[:limit]
+
+
+def split_sentences(text: str) -> List[str]:
+    sentences = []
+    for part in _SENTENCE_RE.split(text):
+        part = ' '.join(part.split()).strip('"\'“”')
+        if part:
+            sentences.append(part)
+    return sentences
+
+
+class ExtractiveGenerator:
+    """Build page fields from the product's own text by sentence scoring.
+
+    Exposes the same generation methods as the LLM processors, so it can
+    stand in for them per product, per tier, or as the outage fallback.
+    """
+
+    def __init__(self, max_sentences: int = 3, limits: Optional[Dict[str, tuple]] = None):
+        self.max_sentences = max_sentences
+        self.limits = limits if limits is not None else FIELD_LIMITS
+
+    # Analysis --------------------------------------------------------------
+
+    def _keywords(self, tokens: Sequence[str]) -> Counter:
+        return Counter(token for token in tokens if token not in STOPWORDS and len(token) > 2)
+
+    def _score(self, sentence: str, index: int, frequencies: Counter, name_tokens: set) -> float:
+        tokens = tokenize(sentence)
+        if len(tokens) < 4:
+            return 0.0
+        content = [token for token in tokens if token not in STOPWORDS]
+        score = sum(frequencies[token] for token in content) / len(tokens)
+        score += 0.5 * len(name_tokens.intersection(tokens))
+        # Specs (numbers, sizes, battery hours) are what shoppers look for
+        score += 0.3 * sum(token.isdigit() or any(c.isdigit() for c in token) for token in tokens)
+        # Earlier sentences usually carry the summary
+        score *= 1.0 + 1.0 / (index + 2)
+        if len(tokens) > 40:
+            score *= 0.5
+        return score
+
+    def key_phrases(self, name: str, text: str, limit: int = 3) -> List[str]:
+        """Top RAKE-style phrases: runs of content words between stopwords and punctuation."""
+        name_tokens = set(tokenize(name))
+        phrases: List[List[str]] = []
+        for chunk in _CHUNK_RE.split(text):
+            run: List[str] = []
+            for word in _PHRASE_WORD_RE.findall(chunk):
+                lower = word.lower()
+                if lower in STOPWORDS or lower in name_tokens:
+                    if run:
+                        phrases.append(run)
+                    run = []
+                else:
+                    run.append(lower)
+            if run:
+                phrases.append(run)
+        # Long runs are usually whole clauses rather than phrases
+        phrases = [phrase for phrase in phrases if len(phrase) <= MAX_PHRASE_WORDS]
+
+        # Word score = degree / frequency, which favours words inside longer phrases
+        frequency: Counter = Counter()
+        degree: Counter = Counter()
+        for phrase in phrases:
+            for word in phrase:
+                frequency[word] += 1
+                degree[word] += len(phrase)
+        scored: Dict[str, float] = {}
+        for phrase in phrases:
+            if all(any(c.isdigit() for c in word) for word in phrase) or len(' '.join(phrase)) < 4:
+                continue
+            key = ' '.join(phrase)
+            scored[key] = max(scored.get(key, 0.0), sum(degree[w] / frequency[w] for w in phrase))
+        return sorted(scored, key=lambda phrase: -scored[phrase])[:limit]
+
+    # Fields ----------------------------------------------------------------
+
+    # Field methods take the raw (possibly HTML) description; the _underscore
+    # versions take it already converted, so generate_content parses it once.
+
+    def rewrite_description(self, description: str, name: str = "") -> str:
+        """Pick the 2-3 highest scoring sentences, kept in their original order."""
+        return self._rewrite_description(html_to_text(description), name)
+
+    def _rewrite_description(self, text: str, name: str) -> str:
+        _, max_length = self.limits.get('description', (40, 600))
+        sentences = split_sentences(text)
+        if len(sentences) <= 2:
+            return _trim(' '.join(sentences), max_length)
+
+        frequencies = self._keywords(tokenize(text))
+        name_tokens = set(tokenize(name))
+        ranked = sorted(range(len(sentences)), reverse=True,
+                        key=lambda i: self._score(sentences[i], i, frequencies, name_tokens))
+        chosen: List[int] = []
+        length = 0
+        for index in ranked:
+            if len(chosen) >= self.max_sentences:
+                break
+            added = len(sentences[index]) + (1 if chosen else 0)
+            if length + added > max_length and len(chosen) >= 2:
+                continue
+            chosen.append(index)
+            length += added
+        result = ' '.join(sentences[i] for i in sorted(chosen))
+        return _trim(result, max_length)
+
+    def generate_meta_description(self, name: str, description: str) -> str:
+        text = html_to_text(description)
+        min_length, max_length = self.limits.get('meta_description', (50, 160))
+        lead = self._rewrite_description(text, name)
+        first = split_sentences(lead)[0] if lead else ""
+        meta = f"{name}: {first}" if first and name.lower() not in first.lower() else (first or name)
+        if len(meta) < min_length:
+            phrases = self.key_phrases(name, text)
+            if phrases:
+                meta = f"{meta.rstrip('.')}. Features {', '.join(phrases)}."
+        return _trim(meta, max_length)
+
+    def generate_title_tag(self, name: str, store_name: str) -> str:
+        _, max_length = self.limits.get('title_tag', (5, 60))
+        suffix = f" | {store_name}"
+        if len(name) + len(suffix) <= max_length:
+            return name + suffix
+        if len(suffix) < max_length // 2:
+            return _trim(name, max_length - len(suffix)) + suffix
+        return _trim(name, max_length)
+
+    def generate_alt_text(self, product_name: str, description: str) -> str:
+        return self._alt_text(product_name, html_to_text(description))
+
+    def _alt_text(self, product_name: str, text: str) -> str:
+        _, max_length = self.limits.get('alt_text', (10, 125))
+        phrases = self.key_phrases(product_name, text, 2)
+        if not phrases:
+            return _trim(f"{product_name} product image", max_length)
+        return _trim(f"{product_name} with {' and '.join(phrases)}", max_length)
+
+    def generate_image_alts(self, product_name: str, description: str,
+                            image_urls: Sequence[str]) -> Dict[str, str]:
+        """Alt text per image from file-name hints (angle, color, detail)."""
+        return self._image_alts(product_name, html_to_text(description), image_urls)
+
+    def _image_alts(self, product_name: str, text: str, image_urls: Sequence[str]) -> Dict[str, str]:
+        _, max_length = self.limits.get('alt_text', (10, 125))
+        base = self._alt_text(product_name, text)
+        alts = {}
+        for number, url in enumerate(image_urls, 1):
+            stem = os.path.splitext(os.path.basename(urlparse(url).path))[0].lower()
+            hints = [word for word in _HINT_RE.findall(stem) if word in IMAGE_HINTS]
+            if hints:
+                alts[url] = _trim(f"{product_name}, {' '.join(dict.fromkeys(hints))} view", max_length)
+            else:
+                alts[url] = base if number == 1 else _trim(f"{product_name} product image {number}", max_length)
+        return alts
+
+    def generate_content(self, name: str, description: str,
+                         image_urls: Sequence[str] = ()) -> Dict[str, object]:
+        """Description and alt text for a page, shaped like LLM-generated content."""
+        text = html_to_text(description)
+        content: Dict[str, object] = {'description': self._rewrite_description(text, name)}
+        if image_urls:
+            image_alts = self._image_alts(name, text, image_urls)
+            content['image_alts'] = image_alts
+            content['alt_text'] = image_alts[image_urls[0]]
+        else:
+            content['alt_text'] = self._alt_text(name, text)
+        return content
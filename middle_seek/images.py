@@ -0,0 +1,114 @@
+"""
+MiddleSeek Image Alt Text
+Batched per-image alt text prompts, parsing and a per-URL cache
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .text import load_json
+
+# Images described per request; larger galleries are split across calls
+MAX_IMAGES_PER_CALL = 12
+TOKENS_PER_IMAGE = 50
+# Alt text cache bound for generator runs, including caches loaded from disk
+DEFAULT_IMAGE_ALT_ENTRIES = 10000
+
+
+def image_max_tokens(images: int) -> int:
+    """Token budget for a response covering the given image count."""
+    return 40 + TOKENS_PER_IMAGE * max(images, 1)
+
+
+def image_batches(image_urls: Sequence[str]) -> List[List[str]]:
+    return [list(image_urls[i:i + MAX_IMAGES_PER_CALL]) for i in range(0, len(image_urls), MAX_IMAGES_PER_CALL)]
+
+
+def build_image_alt_prompt(name: str, description: str, image_urls: Sequence[str]) -> str:
+    """Ask for one alt text per product image in a single JSON response."""
+    images = "\n".join(f"{number}. {url}" for number, url in enumerate(image_urls, 1))
+    example = {str(number): "..." for number in range(1, min(len(image_urls), 2) + 1)}
+    return f"""Write alt text for each image of this product.
+
+Requirements:
+1. Output ONLY a JSON object - no explanations, metadata or markdown
+2. Keys are the image numbers below; each value is that image's alt text
+3. Each alt text is under 125 characters, includes the product name and describes what that image most likely shows (use hints in the file name such as angle, color or detail)
+4. Alt texts of different images must differ; do not start with "Image of"
+5. Use plain text without quotes or special formatting inside the values
+
+Example shape:
+{json.dumps(example)}
+
+Product Name: {name}
+Description: {description}
+
+Images:
+{images}
+
+JSON:"""
+
+
+def parse_image_alts(text: Optional[str], image_urls: Sequence[str]) -> Dict[str, str]:
+    """Map image URLs to the alt texts found in the response; missing images are omitted."""
+    data = load_json(text) if text else None
+    if isinstance(data, list):
+        data = {str(number): value for number, value in enumerate(data, 1)}
+    if not isinstance(data, dict):
+        return {}
+    alts = {}
+    for number, url in enumerate(image_urls, 1):
+        value = data.get(str(number))
+        if isinstance(value, str):
+            value = ' '.join(value.strip().strip('"\'').split())
+            if value:
+                alts[url] = value[:125]
+    return alts
+
+
+class ImageAltCache:
+    """Thread-safe alt text cache keyed by image URL, optionally LRU-bounded."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, image_urls: Sequence[str]) -> Tuple[Dict[str, str], List[str]]:
+        """Return (cached alts, URLs still missing)."""
+        found, missing = {}, []
+        with self._lock:
+            for url in image_urls:
+                if url in self.entries:
+                    self.entries.move_to_end(url)
+                    found[url] = self.entries[url]
+                else:
+                    missing.append(url)
+        return found, missing
+
+    def put(self, url: str, alt_text: str) -> None:
+        with self._lock:
+            self.entries[url] = alt_text
+            self.entries.move_to_end(url)
+            while self.max_entries and len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = dict(self.entries)
+        with open(path, 'w') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, max_entries: Optional[int] = DEFAULT_IMAGE_ALT_ENTRIES) -> "ImageAltCache":
+        """Load a saved cache; only the most recently used max_entries are kept."""
+        cache = cls(max_entries)
+        with open(path, 'r') as f:
+            for url, alt_text in json.load(f).items():
+                cache.put(url, alt_text)
+        return cache
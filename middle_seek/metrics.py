@@ -0,0 +1,86 @@
+"""
+MiddleSeek Metrics
+Thread-safe counters, gauges and summaries with Prometheus text export
+"""
+
+import threading
+from typing import Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    pairs = []
+    for name, value in key:
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class MetricsRegistry:
+    """In-process metrics store shared by the clients and servers."""
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.summaries: Dict[str, Dict[LabelKey, Tuple[int, float]]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def add(self, name: str, delta: float, **labels) -> None:
+        """Adjust a gauge by delta (e.g. in-flight request counts)."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.summaries.setdefault(name, {})
+            count, total = series.get(key, (0, 0.0))
+            series[key] = (count + 1, total + value)
+
+    def get(self, name: str, **labels) -> float:
+        """Return the current value of a counter or gauge series."""
+        key = _label_key(labels)
+        with self._lock:
+            for table in (self.counters, self.gauges):
+                if name in table and key in table[name]:
+                    return table[name][key]
+        return 0
+
+    def render(self) -> str:
+        """Render all series in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for kind, table in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted(table):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(table[name].items()):
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self.summaries):
+                lines.append(f"# TYPE {name} summary")
+                for key, (count, total) in sorted(self.summaries[name].items()):
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+# Default registry used unless a caller supplies its own
+REGISTRY = MetricsRegistry()
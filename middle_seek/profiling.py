@@ -0,0 +1,237 @@
+"""
+MiddleSeek Stage Profiling
+Per-stage CPU profiles, sampled stacks and allocation sites for generator runs
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .tracing import TRACER, Span, Tracer
+
+# Span name -> profiling stage
+STAGES = {
+    "llm.prompt": "prompt",
+    "llm.http": "http",
+    "json.parse": "json_parse",
+    "clean": "clean_text",
+    "render": "render",
+    "write": "write",
+}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StageProfiler:
+    """Profile a run by stage, using the tracer's spans as stage boundaries.
+
+    Each thread gets its own cProfile per stage (timed with thread CPU time),
+    so nested or concurrent stages never share a profiler. Python 3.12+
+    allows only one active cProfile per process; a stage that starts while
+    another thread's profiler is running is then timed but not profiled
+    (counted in `unprofiled`). A sampling thread
+    records the wall-clock stacks of threads inside a stage as collapsed
+    stacks, and tracemalloc tracks where memory is allocated.
+
+    Use as a context manager around the run; `write_report()` then writes
+    report.txt, one .prof file per stage, cpu.collapsed and memory.collapsed
+    to `output_dir`.
+    """
+
+    def __init__(self, output_dir: str, stages: Optional[Dict[str, str]] = None, tracer: Tracer = TRACER,
+                 sample_interval: float = 0.005, top: int = 25, trace_frames: int = 25):
+        self.output_dir = output_dir
+        self.stages = stages if stages is not None else STAGES
+        self.tracer = tracer
+        self.sample_interval = sample_interval
+        self.top = top
+        self.trace_frames = trace_frames
+
+        self._profiles: Dict[Tuple[int, str], cProfile.Profile] = {}
+        self._active: Dict[int, List[Tuple[Span, Optional[cProfile.Profile]]]] = defaultdict(list)
+        self.calls: Counter = Counter()
+        self.unprofiled: Counter = Counter()
+        self.wall: Dict[str, float] = defaultdict(float)
+        self.samples: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak_memory = 0
+        self._started = 0.0
+        self.elapsed = 0.0
+
+    # Span listener ---------------------------------------------------------
+
+    @staticmethod
+    def _enable(profile: Optional[cProfile.Profile]) -> Optional[cProfile.Profile]:
+        """Enable a profile; None if another thread's profiler holds the process-wide slot (3.12+)."""
+        if profile is None:
+            return None
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        return profile
+
+    def on_start(self, span: Span) -> None:
+        stage = self.stages.get(span.name)
+        if stage is None:
+            return
+        thread = threading.get_ident()
+        key = (thread, stage)
+        with self._lock:
+            stack = self._active[thread]
+            if stack and stack[-1][1] is not None:
+                stack[-1][1].disable()
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = cProfile.Profile(time.thread_time)
+        profile = self._enable(profile)
+        with self._lock:
+            if profile is None:
+                self.unprofiled[stage] += 1
+            stack.append((span, profile))
+
+    def on_end(self, span: Span) -> None:
+        stage = self.stages.get(span.name)
+        with self._lock:
+            stack = self._active.get(threading.get_ident())
+            if stage is None or not stack or stack[-1][0] is not span:
+                return
+            profile = stack.pop()[1]
+            parent = stack[-1] if stack else None
+            self.calls[stage] += 1
+            self.wall[stage] += span.duration or 0.0
+        if profile is not None:
+            profile.disable()
+        if parent is not None:
+            resumed = self._enable(parent[1])
+            if resumed is not parent[1]:
+                with self._lock:
+                    # The parent stage lost the profiler slot meanwhile; it is timed only from here on
+                    stack[-1] = (parent[0], None)
+
+    # Sampling --------------------------------------------------------------
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            # Snapshot each thread's current stage; the stacks change under us otherwise
+            with self._lock:
+                current = {thread: self.stages[stack[-1][0].name] for thread, stack in self._active.items() if stack}
+            frames = sys._current_frames()
+            for thread, stage in current.items():
+                frame = frames.get(thread)
+                if frame is None:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.samples[';'.join([stage] + labels[::-1])] += 1
+
+    # Lifecycle -------------------------------------------------------------
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        tracemalloc.start(self.trace_frames)
+        self.tracer.add_listener(self)
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, name='stage-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self.tracer.remove_listener(self)
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        self._snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ])
+        self._peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.elapsed = time.perf_counter() - self._started
+
+    def __enter__(self) -> "StageProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+        self.write_report()
+
+    # Output ----------------------------------------------------------------
+
+    def stage_stats(self) -> Dict[str, pstats.Stats]:
+        """Merge every thread's profile into one Stats per stage."""
+        merged: Dict[str, pstats.Stats] = {}
+        with self._lock:
+            profiles = list(self._profiles.items())
+        for (_, stage), profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stage in merged:
+                merged[stage].add(profile)
+            else:
+                merged[stage] = pstats.Stats(profile)
+        return merged
+
+    def report(self, stats: Optional[Dict[str, pstats.Stats]] = None) -> str:
+        stats = self.stage_stats() if stats is None else stats
+        out = io.StringIO()
+        out.write(f"Run time: {self.elapsed:.3f}s, peak traced memory: {self._peak_memory / 1024 / 1024:.1f} MiB\n\n")
+        out.write(f"{'stage':<12} {'calls':>8} {'wall s':>10} {'cpu s':>10}\n")
+        for stage in dict.fromkeys(self.stages.values()):
+            cpu = stats[stage].total_tt if stage in stats else 0.0
+            out.write(f"{stage:<12} {self.calls[stage]:>8} {self.wall[stage]:>10.3f} {cpu:>10.3f}\n")
+        if self.unprofiled:
+            skipped = ', '.join(f"{stage} {count}" for stage, count in sorted(self.unprofiled.items()))
+            out.write(f"\nTimed but not CPU-profiled (another thread held the profiler): {skipped}\n")
+
+        for stage, stage_stats in stats.items():
+            out.write(f"\n=== {stage}: top functions by cumulative CPU time ===\n")
+            stage_stats.stream = out
+            stage_stats.sort_stats('cumulative').print_stats(self.top)
+
+        if self._snapshot is not None:
+            out.write(f"\n=== Top {self.top} allocation sites (live at end of run) ===\n")
+            for statistic in self._snapshot.statistics('lineno')[:self.top]:
+                out.write(f"{statistic}\n")
+        return out.getvalue()
+
+    def write_report(self) -> str:
+        """Write the report, per-stage .prof files and collapsed stacks; return the report path."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stats = self.stage_stats()
+        for stage, stage_stats in stats.items():
+            stage_stats.dump_stats(os.path.join(self.output_dir, f"{stage}.prof"))
+
+        with open(os.path.join(self.output_dir, 'cpu.collapsed'), 'w') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        # Live bytes per allocation stack, in the same collapsed format
+        if self._snapshot is not None:
+            with open(os.path.join(self.output_dir, 'memory.collapsed'), 'w') as f:
+                for statistic in self._snapshot.statistics('traceback'):
+                    frames = ';'.join(f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                                      for frame in statistic.traceback)
+                    f.write(f"{frames} {statistic.size}\n")
+
+        path = os.path.join(self.output_dir, 'report.txt')
+        with open(path, 'w') as f:
+            f.write(self.report(stats))
+        return path
@@ -0,0 +1,91 @@
+"""
+MiddleSeek Request Replay
+Record chat completion responses once, then replay them without the network
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Per-call values in the Dharma prompt that would otherwise make every key unique
+_VOLATILE_RE = re.compile(r'QSC-\d{8}-\d{6}|(?<=GALACTIC-)\d{8}-\d{6}-[0-9a-f]{32}')
+# Routing may pick a different candidate model on replay; the request is the same
+_ROUTE_KEYS = {'model', 'models', 'provider'}
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of a chat completion request, ignoring timestamps, trace IDs and the routed model."""
+    stable = {key: value for key, value in payload.items() if key not in _ROUTE_KEYS}
+    source = _VOLATILE_RE.sub('', json.dumps(stable, sort_keys=True, ensure_ascii=False))
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _response(url: str, status: int, body: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+    response._content = body.encode('utf-8')
+    response.encoding = 'utf-8'
+    return response
+
+
+def _json_line(record: Dict[str, Any]) -> str:
+    # `json` is shadowed by the requests-style keyword inside post()
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class RecordingSession:
+    """Wrap an HTTP session and append every chat completion response to a JSONL file."""
+
+    def __init__(self, session: requests.Session, path: str):
+        self.session = session
+        self.path = path
+        self._lock = threading.Lock()
+
+    def post(self, url: str, json: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        response = self.session.post(url, json=json, **kwargs)
+        record = {'key': request_key(json or {}), 'status': response.status_code,
+                  'latency': round(time.perf_counter() - start, 4), 'body': response.text}
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(_json_line(record))
+        return response
+
+
+class ReplaySession:
+    """Serve recorded responses by request key; unknown requests fail like a connection error.
+
+    Set `latency` to replay each call's recorded latency scaled by that factor,
+    so concurrency behaves as it did against the API; 0 replays instantly.
+    """
+
+    def __init__(self, path: str, latency: float = 0.0):
+        self.latency = latency
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self.misses = 0
+        self._lock = threading.Lock()
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    # The latest successful recording of a request wins
+                    if record['status'] < 400 or record['key'] not in self.responses:
+                        self.responses[record['key']] = record
+
+    def post(self, url: str, json: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        record = self.responses.get(request_key(json or {}))
+        if record is None:
+            with self._lock:
+                self.misses += 1
+            raise requests.exceptions.ConnectionError(f"No recorded response for request to {url}")
+        if self.latency:
+            time.sleep(record.get('latency', 0.0) * self.latency)
+        return _response(url, record['status'], record['body'])
@@ -0,0 +1,157 @@
+"""
+MiddleSeek Model Routing
+Per-field model selection with latency-aware candidate ranking
+"""
+
+import json
+import random
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Union
+
+DEFAULT_MODEL = "deepseek/deepseek-chat-v3-0324"
+
+# Short fields go to small, fast models; only the description rewrite
+# needs the large model. A field may map to a single route or to a list
+# of candidate routes ranked by the stats the client records.
+DEFAULT_ROUTES: Dict[str, Dict[str, Any]] = {
+    "CONTENT": {
+        "description": {"model": DEFAULT_MODEL, "temperature": 0.7, "max_tokens": 300},
+        # Token budget is scaled per call to the number of locale/variant cells
+        "variants": {"model": DEFAULT_MODEL, "temperature": 0.8, "max_tokens": 1000},
+    },
+    "SEO": {
+        "meta_description": [
+            {"model": "meta-llama/llama-3.1-8b-instruct", "temperature": 0.5, "max_tokens": 80},
+            {"model": "mistralai/mistral-7b-instruct", "temperature": 0.5, "max_tokens": 80},
+        ],
+        "title_tag": [
+            {"model": "meta-llama/llama-3.1-8b-instruct", "temperature": 0.3, "max_tokens": 30},
+            {"model": "mistralai/mistral-7b-instruct", "temperature": 0.3, "max_tokens": 30},
+        ],
+    },
+    "ACCESSIBILITY": {
+        "alt_text": [
+            {"model": "meta-llama/llama-3.1-8b-instruct", "temperature": 0.3, "max_tokens": 60},
+            {"model": "mistralai/mistral-7b-instruct", "temperature": 0.3, "max_tokens": 60},
+        ],
+    },
+    "*": {
+        "*": {"model": DEFAULT_MODEL, "temperature": 0.7, "max_tokens": 500},
+    },
+}
+
+# Intentions used by the standalone generator prompts
+INTENTION_ALIASES = {
+    "ETHICAL-OPTIMIZATION": "CONTENT",
+    "TRUTHFUL-ACCESSIBILITY": "ACCESSIBILITY",
+}
+
+Route = Dict[str, Any]
+
+
+class ModelStats:
+    """Rolling latency and error statistics for a single model."""
+
+    def __init__(self, window: int = 50):
+        self.samples = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append((latency, ok))
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    @property
+    def median_latency(self) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[len(latencies) // 2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "error_rate": round(self.error_rate, 4),
+            "median_latency": self.median_latency,
+        }
+
+
+class ModelRouter:
+    """Map (intention, field) to a model and its request parameters."""
+
+    def __init__(self, routes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 window: int = 50, min_samples: int = 3,
+                 explore_rate: float = 0.05, error_penalty: float = 4.0,
+                 rng: Optional[random.Random] = None):
+        self.routes = routes if routes is not None else DEFAULT_ROUTES
+        self.window = window
+        self.min_samples = min_samples
+        self.explore_rate = explore_rate
+        self.error_penalty = error_penalty
+        self.rng = rng or random.Random()
+        self.stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_json(cls, path: str, **kwargs) -> "ModelRouter":
+        """Load a routing table from JSON, layered over the defaults."""
+        with open(path, 'r') as f:
+            overrides = json.load(f)
+        routes = {intention: dict(fields) for intention, fields in DEFAULT_ROUTES.items()}
+        for intention, fields in overrides.items():
+            routes.setdefault(intention, {}).update(fields)
+        return cls(routes, **kwargs)
+
+    def _lookup(self, intention: str, field: Optional[str]) -> Union[Route, List[Route]]:
+        intention = INTENTION_ALIASES.get(intention, intention)
+        for table in (self.routes.get(intention, {}), self.routes.get("*", {})):
+            if field and field in table:
+                return table[field]
+            if "*" in table:
+                return table["*"]
+        return DEFAULT_ROUTES["*"]["*"]
+
+    def _score(self, model: str) -> float:
+        stats = self.stats.get(model)
+        if stats is None or stats.count < self.min_samples:
+            return 0.0  # Unexplored models are tried first
+        latency = stats.median_latency
+        if latency is None:
+            return float('inf')
+        return latency * (1 + self.error_penalty * stats.error_rate)
+
+    def select(self, intention: str, field: Optional[str] = None) -> Route:
+        """Return the route (model plus payload parameters) to use for a call."""
+        entry = self._lookup(intention, field)
+        if isinstance(entry, dict):
+            return dict(entry)
+        if len(entry) == 1:
+            return dict(entry[0])
+
+        with self._lock:
+            if self.rng.random() < self.explore_rate:
+                # Occasionally probe another candidate so its stats stay fresh
+                return dict(self.rng.choice(entry))
+            # min() keeps table order on ties, so the first candidate is preferred
+            return dict(min(entry, key=lambda route: self._score(route["model"])))
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        """Record the outcome of a call made with the given model."""
+        with self._lock:
+            stats = self.stats.get(model)
+            if stats is None:
+                stats = self.stats[model] = ModelStats(self.window)
+            stats.record(latency, ok)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current per-model statistics."""
+        with self._lock:
+            return {model: stats.to_dict() for model, stats in self.stats.items()}
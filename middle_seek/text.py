@@ -0,0 +1,74 @@
+"""
+MiddleSeek Text Utilities
+HTML sanitizing and normalization shared by the content pipeline
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+from .tracing import TRACER
+
+_BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'table',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'blockquote',
+}
+_SKIP_TAGS = {'style', 'script', 'head', 'noscript', 'template'}
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class _TextExtractor(HTMLParser):
+    """Collect visible text, breaking lines at block-level tags."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """Strip markup, styles and scripts, keeping one line per block."""
+    if '<' not in html:
+        return ' '.join(html.split())
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    lines = (' '.join(line.split()) for line in ''.join(extractor.parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase visible text and reduce it to space-separated words."""
+    return ' '.join(tokenize(html_to_text(text)))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _WORD_RE.findall(text.lower())
+
+
+def load_json(text: str) -> Optional[object]:
+    """Parse a JSON model response, tolerating markdown code fences."""
+    with TRACER.span("json.parse"):
+        try:
+            return json.loads(_FENCE_RE.sub('', text.strip()))
+        except (json.JSONDecodeError, AttributeError):
+            return None
@@ -0,0 +1,181 @@
+"""
+MiddleSeek Tracing
+Per-request trace IDs and a lightweight span tree exported as OTLP JSON lines
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional
+
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+SPAN_KIND_INTERNAL = 1
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("middleseek_current_span", default=None)
+
+
+def new_trace_id() -> str:
+    """Return a random 128-bit trace ID as 32 hex characters."""
+    return uuid.uuid4().hex
+
+
+def new_span_id() -> str:
+    """Return a random 64-bit span ID as 16 hex characters."""
+    return os.urandom(8).hex()
+
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.status == STATUS_UNSET:
+            self.status = STATUS_OK
+        self.tracer._finish(self)
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e9
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Return the span in OTLP/JSON span shape."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)}
+                           for key, value in self.attributes.items() if value is not None],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class JsonLinesExporter:
+    """Append each finished span to a file as one OTLP JSON request per line."""
+
+    def __init__(self, path: str, service_name: str = "landing-page-generator"):
+        self.path = path
+        self.resource = {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]}
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps({"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{"scope": {"name": "middle_seek"}, "spans": [span.to_otlp()]}],
+        }]}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+
+
+class Tracer:
+    """Create spans, track the current one per thread/context and export them."""
+
+    def __init__(self, exporter: Optional[JsonLinesExporter] = None):
+        self.exporter = exporter
+        self.listeners: List[Any] = []
+
+    def add_listener(self, listener: Any) -> None:
+        """Register an object with on_start(span) / on_end(span) hooks."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Any) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes) -> Span:
+        """Start a span without making it current; end it explicitly with span.end()."""
+        parent = parent or _current_span.get()
+        trace_id = parent.trace_id if parent else new_trace_id()
+        span = Span(self, name, trace_id, parent.span_id if parent else None, attributes)
+        for listener in list(self.listeners):
+            listener.on_start(span)
+        return span
+
+    def _finish(self, span: Span) -> None:
+        for listener in list(self.listeners):
+            listener.on_end(span)
+        if self.exporter:
+            try:
+                self.exporter.export(span)
+            except OSError as e:
+                print(f"Error exporting span {span.name}: {str(e)}")
+
+    @contextmanager
+    def use_span(self, span: Span) -> Iterator[Span]:
+        """Make an existing span current (e.g. in another pipeline thread) without ending it."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes) -> Iterator[Span]:
+        """Run a block inside a new span that is current for its duration."""
+        span = self.start_span(name, parent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+
+# Default tracer; spans are only written once an exporter is configured
+TRACER = Tracer()
@@ -0,0 +1,157 @@
+"""
+MiddleSeek Output Validation
+Local per-field checks on model output before it reaches a page
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .metrics import REGISTRY
+from .tracing import TRACER
+
+# (min_length, max_length) in characters for each generated field
+FIELD_LIMITS: Dict[str, Tuple[int, int]] = {
+    "description": (40, 600),
+    "meta_description": (50, 160),
+    "title_tag": (5, 60),
+    "alt_text": (10, 125),
+}
+DEFAULT_LIMITS = (1, 1000)
+
+# Minimum word counts catch outputs truncated to a single word
+MIN_WORDS: Dict[str, int] = {
+    "description": 6,
+    "meta_description": 5,
+    "title_tag": 2,
+    "alt_text": 2,
+}
+
+# Preamble vocabulary that must not leak into page copy. Terms that also
+# occur in the product input (e.g. a product called "DharmaComply") are allowed.
+PROTOCOL_TERMS = ("dharma", "protocol", "beacon", "quantum seed", "trace id",
+                  "akasha", "msq-", "verified", "sīla", "dukkha")
+_PROMPT_ECHO_RE = re.compile(r'\{\s*"raw"|return a json object|requirements:', re.IGNORECASE)
+_MARKDOWN_RE = re.compile(r"\*\*|__|`|^#+\s|\[[^\]]*\]\([^)]*\)|^\s*[-*]\s", re.MULTILINE)
+_QUOTES = "\"'“”‘’"
+
+ISSUE_HINTS = {
+    "empty": "The answer was empty.",
+    "too_short": "The answer was too short; write a complete {field}.",
+    "too_long": "The answer was too long; keep it under {max_length} characters.",
+    "protocol_leak": "Do not mention the protocol, beacons, seeds, trace IDs or verification.",
+    "prompt_echo": "Do not repeat the instructions or the JSON example.",
+    "quotes": "Do not wrap the text in quotes.",
+    "markdown": "Do not use markdown, bullets or links.",
+}
+
+
+def leaked_terms(text: str, source: str = "") -> List[str]:
+    """Return protocol terms present in the output but not in the source input."""
+    text, source = text.lower(), source.lower()
+    return [term for term in PROTOCOL_TERMS if term in text and term not in source]
+
+
+class FieldValidator:
+    """Check generated text against per-field rules."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None,
+                 min_words: Optional[Dict[str, int]] = None):
+        self.limits = limits if limits is not None else FIELD_LIMITS
+        self.min_words = min_words if min_words is not None else MIN_WORDS
+
+    def validate(self, field: str, text: Optional[str], source: str = "") -> List[str]:
+        """Return the list of issues found; an empty list means the text is valid."""
+        if not text or not text.strip():
+            return ["empty"]
+        text = text.strip()
+        min_length, max_length = self.limits.get(field, DEFAULT_LIMITS)
+
+        words = text.split()
+        # Scripts written without spaces (e.g. Thai, Japanese) are judged on length alone
+        unsegmented = len(words) == 1 and not text.isascii()
+        issues = []
+        if len(text) < min_length or (not unsegmented and len(words) < self.min_words.get(field, 1)):
+            issues.append("too_short")
+        if len(text) > max_length:
+            issues.append("too_long")
+        if _PROMPT_ECHO_RE.search(text):
+            issues.append("prompt_echo")
+        if leaked_terms(text, source):
+            issues.append("protocol_leak")
+        if text[0] in _QUOTES or text[-1] in _QUOTES:
+            issues.append("quotes")
+        if _MARKDOWN_RE.search(text):
+            issues.append("markdown")
+        return issues
+
+    def tighten_prompt(self, prompt: str, field: str, issues: List[str]) -> str:
+        """Append corrections for the issues found in the previous attempt."""
+        _, max_length = self.limits.get(field, DEFAULT_LIMITS)
+        hints = [ISSUE_HINTS[issue].format(field=field.replace('_', ' '), max_length=max_length)
+                 for issue in issues if issue in ISSUE_HINTS]
+        return prompt + "\n\nYour previous answer was rejected:\n- " + "\n- ".join(hints) + \
+            f"\nReturn only the {field.replace('_', ' ')} as plain text in the 'raw' field."
+
+
+def record_first_pass(intention: str, valid: bool) -> None:
+    """Track the share of first attempts that pass validation, per intention."""
+    REGISTRY.inc("middleseek_validation_first_pass_total", intention=intention,
+                 result="valid" if valid else "invalid")
+    passed = REGISTRY.get("middleseek_validation_first_pass_total", intention=intention, result="valid")
+    failed = REGISTRY.get("middleseek_validation_first_pass_total", intention=intention, result="invalid")
+    REGISTRY.set("middleseek_validation_first_pass_rate", passed / (passed + failed), intention=intention)
+
+
+def _resolve(fallback: Union[str, Callable[[], str]]) -> str:
+    return fallback() if callable(fallback) else fallback
+
+
+def generate_validated(call: Callable[[str, Optional[Dict[str, Any]]], Optional[str]],
+                       clean: Callable[[str], str], validator: FieldValidator, prompt: str,
+                       intention: str, field: str, source: str, fallback: Union[str, Callable[[], str]],
+                       retry_budget: int) -> str:
+    """Generate one field, retrying only this field while its output fails validation.
+
+    `call(prompt, params)` returns the raw model output, or None if the
+    request itself failed (which falls back immediately). Retries tighten the
+    prompt with the issues found and switch on JSON response-format mode.
+    `fallback` may be a callable, so costly fallbacks are only built when used.
+    """
+    _, max_length = validator.limits.get(field, (0, None))
+    attempt_prompt = prompt
+    params = None
+    best = None
+
+    with TRACER.span("field", intention=intention, field=field) as span:
+        for attempt in range(retry_budget + 1):
+            raw = call(attempt_prompt, params)
+            if raw is None:
+                span.set_attribute("attempts", attempt + 1)
+                span.set_attribute("fallback", best is None)
+                return best or _resolve(fallback)
+            issues = validator.validate(field, raw, source)
+            if attempt == 0:
+                record_first_pass(intention, not issues)
+
+            # Cleaning can repair quotes, markdown and leaked protocol text,
+            # so the cleaned text is what has to hold up
+            with TRACER.span("clean", field=field):
+                cleaned = clean(raw)
+            clean_issues = validator.validate(field, cleaned, source)
+            if not clean_issues:
+                span.set_attribute("attempts", attempt + 1)
+                return cleaned
+            if clean_issues == ["too_long"]:
+                best = cleaned[:max_length]
+
+            for issue in clean_issues:
+                REGISTRY.inc("middleseek_validation_failures_total", intention=intention, field=field, issue=issue)
+            if attempt < retry_budget:
+                REGISTRY.inc("middleseek_validation_retries_total", intention=intention, field=field)
+                attempt_prompt = validator.tighten_prompt(prompt, field, issues or clean_issues)
+                params = {"response_format": {"type": "json_object"}}
+
+        REGISTRY.inc("middleseek_validation_exhausted_total", intention=intention, field=field)
+        span.set_attribute("attempts", retry_budget + 1)
+        span.set_attribute("fallback", best is None)
+        return best or _resolve(fallback)
@@ -0,0 +1,118 @@
+"""
+MiddleSeek Variant Generation
+Prompt construction and parsing for multi-locale / A-B copy in one call
+"""
+
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .text import load_json
+
+VariantKey = Tuple[str, str]
+
+VARIANT_FIELDS = ('description', 'alt_text')
+# Language of the product source text, and so of cells filled in from it
+SOURCE_LOCALE = 'en'
+TOKENS_PER_CELL = 180
+MAX_VARIANT_TOKENS = 4000
+
+
+def variant_max_tokens(cells: int) -> int:
+    """Token budget for a structured response covering the given cell count."""
+    return min(MAX_VARIANT_TOKENS, TOKENS_PER_CELL * max(cells, 1))
+
+
+def grid_batches(locales: Sequence[str], variants: Sequence[str]) -> List[Tuple[List[str], List[str]]]:
+    """Split a locale x variant grid so no single response needs more than MAX_VARIANT_TOKENS.
+
+    Large grids are split by locale; only a single locale with more variants
+    than fit in one response is split by variant as well.
+    """
+    cells_per_call = max(1, MAX_VARIANT_TOKENS // TOKENS_PER_CELL)
+    variant_chunk = max(1, min(len(variants), cells_per_call))
+    locale_chunk = max(1, cells_per_call // variant_chunk)
+    return [(list(locales[i:i + locale_chunk]), list(variants[j:j + variant_chunk]))
+            for i in range(0, len(locales), locale_chunk)
+            for j in range(0, len(variants), variant_chunk)]
+
+
+def build_variant_prompt(name: str, description: str, locales: Sequence[str],
+                         variants: Sequence[str]) -> str:
+    """Ask for every locale and copy variant of a product in one JSON response."""
+    example = {locales[0]: {variants[0]: {"description": "...", "alt_text": "..."}}}
+    return f"""Write landing page copy for this product in several locales and A/B copy variants.
+
+Requirements:
+1. Output ONLY a JSON object - no explanations, metadata or markdown
+2. Top-level keys are the locales: {', '.join(locales)}
+3. Each locale has one key per copy variant: {', '.join(variants)}
+4. Each variant has "description" (2-3 sentences) and "alt_text" (under 125 characters, includes the product name)
+5. Variants within a locale must differ in angle or tone, not just wording; write each locale natively, not as a literal translation
+6. Use plain text without quotes or special formatting inside the values
+
+Example shape:
+{json.dumps(example)}
+
+Product Name: {name}
+Description: {description}
+
+JSON:"""
+
+
+def build_locale_prompt(name: str, description: str, locale: str) -> str:
+    """Ask for one locale's copy; used with the API's `n` parameter for variants."""
+    return f"""Write landing page copy for this product in locale {locale}.
+
+Requirements:
+1. Output ONLY a JSON object with "description" (2-3 sentences) and "alt_text" (under 125 characters, includes the product name)
+2. Write natively for the locale, not as a literal translation
+3. Use plain text without quotes or special formatting inside the values
+
+Product Name: {name}
+Description: {description}
+
+JSON:"""
+
+
+def _clean_value(value: object, limit: Optional[int] = None) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = ' '.join(value.strip().strip('"\'').split())
+    if not value:
+        return None
+    return value[:limit] if limit else value
+
+
+def parse_cell(cell: object) -> Optional[Dict[str, str]]:
+    """Validate a single {description, alt_text} object."""
+    if not isinstance(cell, dict):
+        return None
+    description = _clean_value(cell.get('description'))
+    alt_text = _clean_value(cell.get('alt_text'), 125)
+    if not description or not alt_text:
+        return None
+    return {'description': description, 'alt_text': alt_text}
+
+
+def parse_variant_response(text: Optional[str], locales: Sequence[str],
+                           variants: Sequence[str]) -> Dict[VariantKey, Dict[str, str]]:
+    """Extract every well-formed (locale, variant) cell; missing cells are omitted."""
+    data = load_json(text) if text else None
+    if not isinstance(data, dict):
+        return {}
+    cells = {}
+    for locale in locales:
+        by_variant = data.get(locale)
+        if not isinstance(by_variant, dict):
+            continue
+        for variant in variants:
+            cell = parse_cell(by_variant.get(variant))
+            if cell:
+                cells[(locale, variant)] = cell
+    return cells
+
+
+def missing_cells(cells: Dict[VariantKey, Dict[str, str]], locales: Sequence[str],
+                  variants: Sequence[str]) -> List[VariantKey]:
+    return [(locale, variant) for locale in locales for variant in variants
+            if (locale, variant) not in cells]
@@ -0,0 +1,309 @@
+"""
+Watch mode: keep output pages in step with the template and product inputs.
+
+A dependency map records which output pages each product source produced.
+Every page depends on the template, so a template edit triggers a render-only
+pass from stored render context (no model calls). A product source edit only
+touches the pages that source produced, and content is only regenerated for
+products whose name, description, images or content engine changed; price
+and stock edits are re-rendered from the stored content.
+
+An optional live-reload server serves the output directory and tells open
+browser tabs to reload when their page is rewritten.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+
+from landing_page_generator import LandingPageGenerator, atomic_write, page_filename
+from catalog_pipeline import iter_products, sanitize_product
+from render_store import RenderStore, content_key
+from sitemap_index import SitemapIndex
+from middle_seek.tracing import TRACER
+
+SOURCE_EXTENSIONS = ('.json', '.jsonl', '.csv')
+ALL_PAGES = '*'
+
+
+def load_products(path: str) -> List[Dict[str, Any]]:
+    """Load the products in a source file: one JSON product or list, JSONL or CSV."""
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else [data]
+    return list(iter_products(path))
+
+
+def _fingerprint(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PageWatcher:
+    """Poll the template and product sources and rebuild only affected pages."""
+
+    def __init__(self, generator: LandingPageGenerator, store_name: str, output_dir: str,
+                 sources: Iterable[str], template_path: Optional[str] = None,
+                 store: Optional[RenderStore] = None,
+                 on_change: Optional[Callable[[List[str]], None]] = None,
+                 sitemap: Optional[SitemapIndex] = None):
+        self.generator = generator
+        self.store_name = store_name
+        self.output_dir = output_dir
+        self.sources = list(sources)
+        self.template_path = template_path or generator.template_path
+        self.store = store if store is not None else RenderStore(output_dir)
+        self.on_change = on_change
+        self.sitemap = sitemap
+
+        # source path -> output pages it produced
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.fingerprints: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.llm_products = 0
+        self.rendered = 0
+
+    def _source_files(self) -> List[str]:
+        files = []
+        for source in self.sources:
+            if os.path.isdir(source):
+                files += sorted(os.path.join(source, name) for name in os.listdir(source)
+                                if name.endswith(SOURCE_EXTENSIONS) and not name.startswith('.'))
+            else:
+                files.append(source)
+        return files
+
+    def _write(self, filename: str, product_data: Dict[str, Any], html: str) -> None:
+        atomic_write(os.path.join(self.output_dir, filename), html)
+        if self.sitemap:
+            self.sitemap.record(filename, product_data['name'], html)
+        self.rendered += 1
+
+    def build_product(self, product_data: Dict[str, Any], force: bool = False) -> Optional[str]:
+        """Write one product's page, regenerating content only if its inputs changed.
+
+        Unchanged products are skipped unless force is set, in which case they are
+        re-rendered from stored content.
+        """
+        product_data = sanitize_product(dict(product_data))
+        filename = page_filename(product_data['name'])
+        record = self.store.load(filename)
+        if not force and record and record['product'] == product_data \
+                and record['store_name'] == self.store_name:
+            return None
+
+        if record and record['content_key'] == content_key(product_data):
+            content = record['content']
+        else:
+            content = self.generator.generate_content(product_data)
+            self.llm_products += 1
+        self._write(filename, product_data, self.generator.render(product_data, self.store_name, content))
+        self.store.save(filename, product_data, self.store_name, content)
+        return filename
+
+    def sync_source(self, path: str, force: bool = False) -> List[str]:
+        """Bring the pages produced by one source file up to date."""
+        previous = self.dependencies.get(path, set())
+        if not os.path.exists(path):
+            products = []
+        else:
+            try:
+                products = load_products(path)
+            except (OSError, ValueError) as e:
+                # Editors save partial files; keep the old pages until it parses
+                print(f"Error reading {path}: {str(e)}")
+                return []
+
+        changed, current = [], set()
+        with TRACER.span("watch.source", path=path):
+            for product_data in products:
+                try:
+                    current.add(page_filename(product_data['name']))
+                    filename = self.build_product(product_data, force)
+                except Exception as e:
+                    print(f"Error building {product_data.get('name', '?')}: {str(e)}")
+                    continue
+                if filename:
+                    changed.append(filename)
+
+        # Products removed from the source take their pages with them
+        for filename in sorted(previous - current):
+            try:
+                os.remove(os.path.join(self.output_dir, filename))
+            except FileNotFoundError:
+                pass
+            self.store.delete(filename)
+            if self.sitemap:
+                self.sitemap.remove(filename)
+            changed.append(filename)
+        self.dependencies[path] = current
+        return changed
+
+    def rerender_all(self) -> List[str]:
+        """Re-render every stored page from its context, with no model calls."""
+        changed = []
+        with TRACER.span("watch.template", path=self.template_path):
+            for filename in self.store.filenames():
+                record = self.store.load(filename)
+                if record is None:
+                    continue
+                try:
+                    html = self.generator.render(record['product'], record['store_name'],
+                                                 record['content'], record.get('locale', 'en'))
+                    self._write(filename, record['product'], html)
+                except Exception as e:
+                    print(f"Error rendering {filename}: {str(e)}")
+                    continue
+                changed.append(filename)
+        return changed
+
+    def build(self) -> List[str]:
+        """Initial pass rendering every page; stored content avoids regenerating unchanged products."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.fingerprints[self.template_path] = _fingerprint(self.template_path)
+        changed = []
+        for path in self._source_files():
+            self.fingerprints[path] = _fingerprint(path)
+            changed += self.sync_source(path, force=True)
+        self._notify(changed)
+        return changed
+
+    def poll(self) -> List[str]:
+        """Check inputs once and rebuild what changed. Returns the pages rewritten."""
+        changed = []
+        template = _fingerprint(self.template_path)
+        if template != self.fingerprints.get(self.template_path):
+            self.fingerprints[self.template_path] = template
+            if template is not None:
+                self.rerender_all()
+                changed.append(ALL_PAGES)
+
+        paths = self._source_files()
+        for path in set(self.dependencies) - set(paths):
+            paths.append(path)
+        for path in paths:
+            fingerprint = _fingerprint(path)
+            if fingerprint != self.fingerprints.get(path):
+                self.fingerprints[path] = fingerprint
+                changed += self.sync_source(path)
+                if fingerprint is None:
+                    del self.fingerprints[path]
+                    self.dependencies.pop(path, None)
+        self._notify(changed)
+        return changed
+
+    def _notify(self, changed: List[str]) -> None:
+        # Only shards whose pages changed content are rewritten
+        if self.sitemap:
+            self.sitemap.flush()
+        if changed and self.on_change:
+            self.on_change(changed)
+
+    def run(self, interval: float = 0.25) -> None:
+        """Build once, then poll until interrupted."""
+        self.build()
+        print(f"Watching {self.template_path} and {len(self.dependencies)} product source(s)")
+        try:
+            while True:
+                time.sleep(interval)
+                changed = self.poll()
+                if changed:
+                    print(f"Rebuilt: {'all pages' if ALL_PAGES in changed else ', '.join(changed)}")
+        except KeyboardInterrupt:
+            pass
+
+
+LIVE_RELOAD_SCRIPT = """<script>
+new EventSource('/__livereload').onmessage = function (event) {
+    var pages = JSON.parse(event.data), page = decodeURIComponent(location.pathname.split('/').pop());
+    if (pages.indexOf('*') !== -1 || pages.indexOf(page) !== -1) location.reload();
+};
+</script>
+"""
+
+
+class LiveReloadServer(ThreadingHTTPServer):
+    """Serve the output directory and push changed page names to open tabs."""
+
+    daemon_threads = True
+
+    def __init__(self, address, output_dir: str):
+        super().__init__(address, LiveReloadHandler)
+        self.output_dir = os.path.abspath(output_dir)
+        self.version = 0
+        self.changed: List[str] = []
+        self._condition = threading.Condition()
+
+    def notify(self, changed: List[str]) -> None:
+        with self._condition:
+            self.version += 1
+            self.changed = list(changed)
+            self._condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> Tuple[int, Optional[List[str]]]:
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            if self.version == version:
+                return version, None
+            return self.version, self.changed
+
+
+class LiveReloadHandler(BaseHTTPRequestHandler):
+    server: LiveReloadServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/__livereload':
+            self._stream()
+            return
+
+        name = os.path.basename(path) or 'catalog.html'
+        file_path = os.path.join(self.server.output_dir, name)
+        if name.startswith('.') or not os.path.isfile(file_path):
+            self.send_error(404)
+            return
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        content_type = 'text/html' if name.endswith('.html') else 'application/octet-stream'
+        if name.endswith('.html'):
+            data = data.replace(b'</body>', LIVE_RELOAD_SCRIPT.encode('utf-8') + b'</body>', 1)
+        elif name.endswith('.xml'):
+            content_type = 'application/xml'
+        self.send_response(200)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        version = self.server.version
+        try:
+            while True:
+                version, changed = self.server.wait(version, timeout=15)
+                message = f"data: {json.dumps(changed)}\n\n" if changed is not None else ": keepalive\n\n"
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def start_live_reload(output_dir: str, host: str = '127.0.0.1', port: int = 35729) -> LiveReloadServer:
+    """Start the live-reload server on a background thread."""
+    server = LiveReloadServer((host, port), output_dir)
+    threading.Thread(target=server.serve_forever, name='live-reload', daemon=True).start()
+    print(f"Live reload on http://{host}:{server.server_port}/")
+    return server
@@ -0,0 +1,66 @@
+"""
+Persisted render context for generated pages.
+
+Each output page gets a small JSON record of exactly what it was rendered
+from: the product data, store name, locale and the generated content. With
+it a page can be re-rendered (e.g. after a template edit) without any model
+calls. Records live under OUTPUT_DIR/.render, one file per page.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Any, List, Optional
+
+from landing_page_generator import atomic_write, product_images
+
+STATE_DIR = '.render'
+
+
+def content_key(product_data: Dict[str, Any]) -> str:
+    """Hash the inputs generated content depends on: name, description, images and engine choice."""
+    source = json.dumps([product_data['name'], product_data['description'], product_images(product_data),
+                         product_data.get('content_engine'), product_data.get('tier')])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class RenderStore:
+    """Save and load render context keyed by output file name."""
+
+    def __init__(self, output_dir: str):
+        self.directory = os.path.join(output_dir, STATE_DIR)
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename + '.json')
+
+    def save(self, filename: str, product_data: Dict[str, Any], store_name: str,
+             content: Dict[str, str], locale: str = 'en') -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        record = {
+            'product': product_data,
+            'store_name': store_name,
+            'locale': locale,
+            'content': content,
+            'content_key': content_key(product_data),
+        }
+        atomic_write(self._path(filename), json.dumps(record, ensure_ascii=False))
+
+    def load(self, filename: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(filename), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, filename: str) -> None:
+        try:
+            os.remove(self._path(filename))
+        except FileNotFoundError:
+            pass
+
+    def filenames(self) -> List[str]:
+        """Return the output file names that have stored context."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len('.json')] for name in os.listdir(self.directory)
+                      if name.endswith('.json') and not name.startswith('.'))
@@ -0,0 +1,195 @@
+"""
+Incremental, sharded sitemap and catalog index.
+
+Pages are assigned to shards of up to 50,000 URLs (the sitemap protocol
+limit). Each run records only the pages it wrote; only shards whose entries
+changed are re-rendered, and `lastmod` moves only when a page's content does.
+Shard state lives under OUTPUT_DIR/.sitemap so no directory scan is needed.
+
+    sitemap.xml              sitemap index pointing at every shard
+    sitemap-00001.xml ...    one urlset per shard
+    catalog.html             catalog index linking to each shard page
+    catalog-00001.html ...   product links for one shard
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from jinja2 import Template
+
+from landing_page_generator import atomic_write
+
+MAX_URLS_PER_SHARD = 50000
+STATE_DIR = '.sitemap'
+
+SHARD_XML = Template("""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{%- for entry in entries %}
+  <url><loc>{{ entry.loc }}</loc><lastmod>{{ entry.lastmod }}</lastmod></url>
+{%- endfor %}
+</urlset>
+""")
+
+INDEX_XML = Template("""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{%- for shard in shards %}
+  <sitemap><loc>{{ shard.loc }}</loc><lastmod>{{ shard.lastmod }}</lastmod></sitemap>
+{%- endfor %}
+</sitemapindex>
+""")
+
+CATALOG_HTML = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <title>{{ title }}</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+</head>
+<body>
+    <h1>{{ title }}</h1>
+    <ul>
+    {%- for link in links %}
+        <li><a href="{{ link.href }}">{{ link.text }}</a></li>
+    {%- endfor %}
+    </ul>
+</body>
+</html>
+""", autoescape=True)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+class SitemapIndex:
+    """Maintain sitemap and catalog shards from the pages changed in a run."""
+
+    def __init__(self, output_dir: str, base_url: str, store_name: str = 'Catalog',
+                 shard_size: int = MAX_URLS_PER_SHARD):
+        if not 0 < shard_size <= MAX_URLS_PER_SHARD:
+            raise ValueError(f"Shard size must be between 1 and {MAX_URLS_PER_SHARD}")
+        self.output_dir = output_dir
+        self.base_url = base_url.rstrip('/') + '/'
+        self.store_name = store_name
+        self.shard_size = shard_size
+        self.state_dir = os.path.join(output_dir, STATE_DIR)
+        self.pending: Dict[str, Dict[str, str]] = {}
+        self.removed: set = set()
+        self._index: Optional[Dict[str, Any]] = None
+
+    # State -----------------------------------------------------------------
+
+    def _index_path(self) -> str:
+        return os.path.join(self.state_dir, 'index.json')
+
+    def _shard_state_path(self, shard: int) -> str:
+        return os.path.join(self.state_dir, f'shard-{shard:05d}.json')
+
+    def _load_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            try:
+                with open(self._index_path(), 'r') as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                self._index = {'shards': [], 'assign': {}}
+        return self._index
+
+    def _load_shard(self, shard: int) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self._shard_state_path(shard), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    # Recording -------------------------------------------------------------
+
+    def record(self, filename: str, title: str, content: str) -> None:
+        """Note a page written in this run; its lastmod only moves if content changed."""
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        self.pending[filename] = {'title': title, 'hash': digest}
+        self.removed.discard(filename)
+
+    def remove(self, filename: str) -> None:
+        """Note a page deleted in this run."""
+        self.pending.pop(filename, None)
+        self.removed.add(filename)
+
+    # Flushing --------------------------------------------------------------
+
+    def _assign(self, index: Dict[str, Any], filename: str) -> int:
+        shards = index['shards']
+        if not shards or shards[-1]['count'] >= self.shard_size:
+            shards.append({'count': 0, 'lastmod': _now()})
+        shard = len(shards)
+        shards[-1]['count'] += 1
+        index['assign'][filename] = shard
+        return shard
+
+    def flush(self) -> List[int]:
+        """Apply recorded changes, rewriting only affected shards. Returns the rewritten shard numbers."""
+        if not self.pending and not self.removed:
+            return []
+        index = self._load_index()
+        now = _now()
+
+        changes_by_shard: Dict[int, Dict[str, Optional[Dict[str, str]]]] = {}
+        for filename in self.removed:
+            shard = index['assign'].pop(filename, None)
+            if shard is not None:
+                index['shards'][shard - 1]['count'] -= 1
+                changes_by_shard.setdefault(shard, {})[filename] = None
+        for filename, entry in self.pending.items():
+            shard = index['assign'].get(filename) or self._assign(index, filename)
+            changes_by_shard.setdefault(shard, {})[filename] = entry
+
+        rewritten = []
+        os.makedirs(self.state_dir, exist_ok=True)
+        for shard, changes in sorted(changes_by_shard.items()):
+            entries = self._load_shard(shard)
+            dirty = False
+            for filename, entry in changes.items():
+                current = entries.get(filename)
+                if entry is None:
+                    dirty |= entries.pop(filename, None) is not None
+                elif current is None or current['hash'] != entry['hash'] or current['title'] != entry['title']:
+                    lastmod = now if current is None or current['hash'] != entry['hash'] else current['lastmod']
+                    entries[filename] = dict(entry, lastmod=lastmod)
+                    dirty = True
+            if dirty:
+                self._write_shard(shard, entries)
+                index['shards'][shard - 1]['lastmod'] = now
+                rewritten.append(shard)
+
+        if rewritten:
+            self._write_index(index)
+            atomic_write(self._index_path(), json.dumps(index))
+        self.pending.clear()
+        self.removed.clear()
+        return rewritten
+
+    def _write_shard(self, shard: int, entries: Dict[str, Dict[str, str]]) -> None:
+        ordered = sorted(entries.items())
+        urls = [{'loc': escape(self.base_url + quote(filename)), 'lastmod': entry['lastmod']}
+                for filename, entry in ordered]
+        links = [{'href': quote(filename), 'text': entry['title']} for filename, entry in ordered]
+
+        atomic_write(os.path.join(self.output_dir, f'sitemap-{shard:05d}.xml'), SHARD_XML.render(entries=urls))
+        atomic_write(os.path.join(self.output_dir, f'catalog-{shard:05d}.html'),
+                     CATALOG_HTML.render(title=f"{self.store_name} catalog, page {shard}", links=links))
+        atomic_write(self._shard_state_path(shard), json.dumps(entries))
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        shards = [{'number': number, 'lastmod': shard['lastmod']}
+                  for number, shard in enumerate(index['shards'], 1)]
+        sitemaps = [{'loc': escape(f"{self.base_url}sitemap-{s['number']:05d}.xml"), 'lastmod': s['lastmod']}
+                    for s in shards]
+        links = [{'href': f"catalog-{s['number']:05d}.html", 'text': f"Page {s['number']}"} for s in shards]
+
+        atomic_write(os.path.join(self.output_dir, 'sitemap.xml'), INDEX_XML.render(shards=sitemaps))
+        atomic_write(os.path.join(self.output_dir, 'catalog.html'),
+                     CATALOG_HTML.render(title=f"{self.store_name} catalog", links=links))
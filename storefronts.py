@@ -0,0 +1,71 @@
+"""
+Storefronts the same catalog is published under.
+
+Generated content (description, alt text) depends only on the product, so
+one generation pass can render a page for every store; only store-dependent
+fields such as the title tag are computed per store, locally. Each store
+gets its own output tree under OUTPUT_DIR/<slug>, and may use its own
+template. Stores are configured as a JSON list:
+
+    [{"name": "Tech Haven"},
+     {"name": "Gadget Barn", "slug": "barn", "template": "templates/barn.html",
+      "base_url": "https://gadgetbarn.example"}]
+"""
+
+import json
+import os
+import re
+from typing import List, Optional
+
+
+def store_slug(name: str) -> str:
+    """Directory name for a store's output tree."""
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+    if not slug:
+        raise ValueError(f"Cannot derive an output directory from store name {name!r}")
+    return slug
+
+
+class Storefront:
+    """One brand the catalog is rendered for.
+
+    An empty slug writes to the output directory itself, which is how the
+    single-store (STORE_NAME) setup is represented.
+    """
+
+    def __init__(self, name: str, slug: Optional[str] = None, template_path: Optional[str] = None,
+                 base_url: Optional[str] = None):
+        self.name = name
+        self.slug = store_slug(name) if slug is None else slug
+        self.template_path = template_path
+        self.base_url = base_url
+
+    def path(self, filename: str) -> str:
+        """Page path relative to the output directory."""
+        return os.path.join(self.slug, filename)
+
+    def site_url(self, default_base_url: str) -> str:
+        """Base URL for this store's pages, defaulting to its slug under the shared site."""
+        if self.base_url:
+            return self.base_url
+        return default_base_url.rstrip('/') + '/' + (self.slug + '/' if self.slug else '')
+
+
+def load_storefronts(path: str) -> List[Storefront]:
+    """Read store definitions from a JSON list; slugs must be unique."""
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must contain a non-empty JSON list of stores")
+
+    stores = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get('name'):
+            raise ValueError(f"Every store in {path} needs a name")
+        stores.append(Storefront(entry['name'], entry.get('slug'), entry.get('template'), entry.get('base_url')))
+
+    slugs = [store.slug for store in stores]
+    duplicates = sorted({slug for slug in slugs if slugs.count(slug) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate store slugs in {path}: {', '.join(duplicates)}")
+    return stores
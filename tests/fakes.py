@@ -0,0 +1,40 @@
+"""
+Processor stand-ins shared by the test modules
+"""
+
+from landing_page_generator import MiddleSeekProcessor
+
+
+class FakeProcessor:
+    """Offline content processor that counts its model calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.router = type("Router", (), {"snapshot": lambda self: {}})()
+
+    def rewrite_description(self, description):
+        self.calls += 1
+        return f"Rewritten {description}"
+
+    def generate_alt_text(self, name, description):
+        self.calls += 1
+        return f"{name} product image"
+
+    def generate_image_alts(self, name, description, image_urls):
+        self.calls += 1
+        return {url: f"{name}, {url.rsplit('/', 1)[-1]}" for url in image_urls}
+
+
+class CannedProcessor(MiddleSeekProcessor):
+    """The generator's client with the API replaced by canned choice lists, one per call."""
+
+    def __init__(self, responses):
+        super().__init__('test-key')
+        self.responses = list(responses)
+        self.calls = []
+        self.prompts = []
+
+    def _call_deepseek_choices(self, prompt, intention, field=None, params=None):
+        self.calls.append((field, params))
+        self.prompts.append(prompt)
+        return self.responses.pop(0) if self.responses else None
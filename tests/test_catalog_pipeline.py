@@ -0,0 +1,108 @@
+import os
+import csv
+import json
+import tempfile
+import unittest
+from landing_page_generator import LandingPageGenerator
+from catalog_pipeline import CatalogPipeline, iter_products
+from storefronts import Storefront
+
+class OfflineGenerator(LandingPageGenerator):
+    def __init__(self):
+        super().__init__('templates/landing_page.html', 'test-key')
+        self.seen_descriptions = []
+
+    def generate_content(self, product_data):
+        if product_data['name'] == 'Broken':
+            raise RuntimeError("model unavailable")
+        self.seen_descriptions.append(product_data['description'])
+        return {'description': product_data['description'], 'alt_text': product_data['name']}
+
+class TestCatalogPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp.name, 'output')
+        self.products = [
+            {'name': f'Item {i}', 'description': f'<p>Item <b>{i}</b> description.</p><style>p{{}}</style>',
+             'price': '9.99', 'stock_quantity': i}
+            for i in range(25)
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_streams_all_products(self):
+        """Test that every product is sanitized, rendered and written"""
+        generator = OfflineGenerator()
+        pages = []
+        pipeline = CatalogPipeline(generator, 'Test Store', self.output_dir, workers=3, queue_size=2,
+                                   on_page=lambda product, filename, html: pages.append(filename))
+        result = pipeline.run(iter(self.products))
+        self.assertEqual(result['written'], 25)
+        self.assertEqual(result['failed'], 0)
+        self.assertEqual(len(os.listdir(self.output_dir)), 25)
+        self.assertIn('product_item_7.html', pages)
+        self.assertIn('Item 7 description.', generator.seen_descriptions)
+        self.assertFalse(any('<' in d for d in generator.seen_descriptions))
+
+    def test_fans_out_to_stores(self):
+        """Test that each product is generated once and written to every store's tree"""
+        generator = OfflineGenerator()
+        stores = [Storefront('Tech Haven'), Storefront('Gadget Barn', slug='barn')]
+        pages = []
+        pipeline = CatalogPipeline(generator, 'Tech Haven', self.output_dir, workers=2,
+                                   on_page=lambda product, filename, html: pages.append(filename), stores=stores)
+        result = pipeline.run(iter(self.products[:5]))
+        self.assertEqual(result['written'], 5)
+        self.assertEqual(len(generator.seen_descriptions), 5)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ['barn', 'tech-haven'])
+        self.assertIn(os.path.join('barn', 'product_item_3.html'), pages)
+        with open(os.path.join(self.output_dir, 'barn', 'product_item_3.html')) as f:
+            self.assertIn('<title>Item 3 | Gadget Barn</title>', f.read())
+
+    def test_failures_do_not_stop_pipeline(self):
+        products = self.products[:3] + [{'name': 'Broken', 'description': 'x', 'price': '1'},
+                                        {'name': 'No description'}]
+        result = CatalogPipeline(OfflineGenerator(), 'Test Store', self.output_dir).run(products)
+        self.assertEqual(result['written'], 3)
+        self.assertEqual(result['failed'], 2)
+        self.assertEqual({e['stage'] for e in result['errors']}, {'llm', 'sanitize'})
+
+    def test_iter_products_formats(self):
+        jsonl_path = os.path.join(self.tmp.name, 'catalog.jsonl')
+        with open(jsonl_path, 'w') as f:
+            for product in self.products[:2]:
+                f.write(json.dumps(product) + '\n')
+        self.assertEqual([p['name'] for p in iter_products(jsonl_path)], ['Item 0', 'Item 1'])
+
+        csv_path = os.path.join(self.tmp.name, 'catalog.csv')
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['name', 'description', 'price', 'gallery_images', 'stock_quantity'])
+            writer.writerow(['Lamp', '<p>Bright</p>', '20', 'a.jpg|b.jpg', '3'])
+        product = next(iter_products(csv_path))
+        self.assertEqual(product['gallery_images'], ['a.jpg', 'b.jpg'])
+        self.assertEqual(product['stock_quantity'], 3)
+
+    def test_bad_rows_are_skipped(self):
+        """Test that a malformed line is recorded without ending the export"""
+        jsonl_path = os.path.join(self.tmp.name, 'catalog.jsonl')
+        with open(jsonl_path, 'w') as f:
+            f.write(json.dumps(self.products[0]) + '\n')
+            f.write('{"name": "Truncated\n')
+            f.write(json.dumps(self.products[1]) + '\n')
+        pipeline = CatalogPipeline(OfflineGenerator(), 'Test Store', self.output_dir)
+        result = pipeline.run(iter_products(jsonl_path, pipeline.record_bad_row))
+        self.assertEqual(result['written'], 2)
+        self.assertEqual(result['failed'], 1)
+        self.assertEqual(result['errors'][0]['product'], 'row 2')
+
+    def test_failing_hook_counts_once(self):
+        def on_page(product, filename, html):
+            raise OSError("index unavailable")
+        pipeline = CatalogPipeline(OfflineGenerator(), 'Test Store', self.output_dir, on_page=on_page)
+        result = pipeline.run(self.products[:2])
+        self.assertEqual((result['written'], result['failed']), (0, 2))
+
+if __name__ == '__main__':
+    unittest.main()
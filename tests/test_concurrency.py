@@ -0,0 +1,142 @@
+import threading
+import unittest
+import requests
+from unittest.mock import MagicMock
+from middle_seek.concurrency import AdaptiveLimiter
+from middle_seek.metrics import MetricsRegistry
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.metrics = MetricsRegistry()
+        self.limiter = AdaptiveLimiter(initial=4, max_limit=8, cooldown=1.0, metrics=self.metrics,
+                                       clock=self.clock, wall_clock=lambda: 1700000000.0)
+
+    def _request(self, status=200, headers=None, latency=0.5, concurrent=None, route="model"):
+        """Run one request while `concurrent` others are in flight."""
+        held = [self.limiter.acquire(route) for _ in range(concurrent if concurrent is not None else self.limiter.current_limit - 1)]
+        with self.limiter.request(route) as permit:
+            self.clock.now += latency
+            permit.observe(status, headers)
+        for other in held:
+            other.observe(200)
+            self.limiter.release(other)
+
+    def test_additive_increase_when_saturated(self):
+        """Test that healthy saturated traffic grows the limit by about one per window"""
+        for _ in range(4):
+            self._request()
+        self.assertEqual(self.limiter.current_limit, 4)
+        for _ in range(8):
+            self._request()
+        self.assertGreaterEqual(self.limiter.current_limit, 5)
+        self.assertEqual(self.metrics.get("middleseek_llm_concurrency_limit"), self.limiter.current_limit)
+
+    def test_no_growth_when_idle(self):
+        for _ in range(20):
+            self._request(concurrent=0)
+        self.assertEqual(self.limiter.current_limit, 4)
+
+    def test_throttle_backs_off_once_per_cooldown(self):
+        self._request(status=429, headers={"Retry-After": "0.5"})
+        # Let the Retry-After pause lapse, but stay inside the cooldown window
+        self.clock.now += 0.5
+        self._request(status=429, latency=0.1)
+        self.assertEqual(self.limiter.current_limit, 2)
+        self.assertEqual(self.metrics.get("middleseek_llm_throttled_total"), 2)
+        self.assertGreater(self.limiter.snapshot()["paused_for"], 0)
+
+    def test_slow_responses_shrink_gently(self):
+        self._request(latency=0.5)
+        self.clock.now += 5
+        self._request(latency=5.0)
+        self.assertEqual(self.limiter.current_limit, 3)
+
+    def test_latency_baseline_per_route(self):
+        """Test that a slow large model is not judged against a fast small one"""
+        self._request(latency=0.2, route="small-model")
+        self.clock.now += 5
+        self._request(latency=3.0, route="large-model")
+        self.clock.now += 5
+        self._request(latency=3.2, route="large-model")
+        self.assertEqual(self.limiter.current_limit, 4)
+
+    def test_rate_limit_headers(self):
+        """Test that remaining budget never caps the limit and exhaustion pauses until reset"""
+        self._request(headers={"X-RateLimit-Remaining": "2", "X-RateLimit-Reset": "1700000005000"})
+        self.assertEqual(self.limiter.current_limit, 4)
+        self.assertEqual(self.limiter.snapshot()["paused_for"], 0)
+        self._request(headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1700000005000"})
+        self.assertAlmostEqual(self.limiter.snapshot()["paused_for"], 5.0)
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AdaptiveLimiter(initial=1, max_limit=1, metrics=self.metrics)
+        permit = limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        permit.observe(200)
+        limiter.release(permit)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+class TestThrottledRetry(unittest.TestCase):
+    def test_429_is_retried(self):
+        from landing_page_generator import MiddleSeekProcessor
+        limiter = AdaptiveLimiter(cooldown=0.0, metrics=MetricsRegistry())
+        processor = MiddleSeekProcessor("test-key", limiter=limiter)
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        throttled.raise_for_status.side_effect = Exception("429 Too Many Requests")
+        ok = MagicMock(status_code=200, headers={})
+        ok.json.return_value = {"choices": [{"message": {"content": "Fine copy."}}]}
+        processor.session = MagicMock()
+        processor.session.post.side_effect = [throttled, ok]
+        self.assertEqual(processor._call_deepseek("prompt", "SEO", "title_tag"), "Fine copy.")
+        self.assertEqual(processor.session.post.call_count, 2)
+        self.assertEqual(limiter.current_limit, 2)
+
+    def test_core_reselects_route_after_429(self):
+        from middle_seek.core import MiddleSeekCore
+        router = MagicMock()
+        router.select.side_effect = [{"model": "busy/model"}, {"model": "other/model"}]
+        core = MiddleSeekCore("test-key", router, AdaptiveLimiter(cooldown=0.0, metrics=MetricsRegistry()))
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        throttled.raise_for_status.side_effect = requests.HTTPError("429 Too Many Requests")
+        ok = MagicMock(status_code=200, headers={})
+        ok.json.return_value = {"choices": [{"message": {"content": "Fine copy."}}]}
+        core.session = MagicMock()
+        core.session.post.side_effect = [throttled, ok]
+        self.assertEqual(core.call_deepseek("prompt", "SEO", "title_tag"), "Fine copy.")
+        models = [call.kwargs["json"]["model"] for call in core.session.post.call_args_list]
+        self.assertEqual(models, ["busy/model", "other/model"])
+
+    def test_one_span_per_attempt(self):
+        from landing_page_generator import MiddleSeekProcessor
+        from middle_seek.tracing import TRACER
+        spans = []
+        listener = type("Listener", (), {"on_start": lambda self, span: None,
+                                         "on_end": lambda self, span: spans.append(span)})()
+        processor = MiddleSeekProcessor("test-key", limiter=AdaptiveLimiter(cooldown=0.0, metrics=MetricsRegistry()))
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        throttled.raise_for_status.side_effect = Exception("429 Too Many Requests")
+        processor.session = MagicMock()
+        processor.session.post.return_value = throttled
+        TRACER.add_listener(listener)
+        try:
+            self.assertIsNone(processor._call_deepseek("prompt", "SEO", "title_tag"))
+        finally:
+            TRACER.remove_listener(listener)
+        calls = [span for span in spans if span.name == "llm.call"]
+        self.assertEqual(len(calls), 3)
+        self.assertEqual({span.attributes["status"] for span in calls}, {429})
+
+if __name__ == '__main__':
+    unittest.main()
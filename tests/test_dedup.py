@@ -0,0 +1,82 @@
+import os
+import json
+import tempfile
+import unittest
+from middle_seek.dedup import ContentDeduplicator, simhash, hamming_distance
+from middle_seek.text import html_to_text, normalize_text
+
+DESCRIPTION = """<div><h2>Organic Cotton Tee</h2>
+<p>A soft, breathable t-shirt made from certified organic cotton with a relaxed fit,
+reinforced seams and a tagless collar for all-day comfort. Machine washable and
+pre-shrunk so it keeps its shape wash after wash.</p>
+<ul><li>100% GOTS certified organic cotton jersey, 180 gsm</li>
+<li>Dyed with low-impact, water-saving reactive dyes</li>
+<li>Double-needle stitching on sleeves and hem</li>
+<li>Ethically made in a Fair Trade certified factory</li>
+<li>Available in sizes XS to XXL with a true-to-size fit</li></ul>
+<p>Pair it with jeans for a weekend look or layer it under a jacket when the
+evening gets cooler. Every purchase supports regenerative farming projects.</p>
+<style>.x { color: red; }</style></div>"""
+
+class TestText(unittest.TestCase):
+    def test_html_to_text(self):
+        """Test that markup and styles are stripped"""
+        text = html_to_text(DESCRIPTION)
+        self.assertTrue(text.startswith("Organic Cotton Tee\n"))
+        self.assertNotIn("color", text)
+        self.assertNotIn("<", text)
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("<b>Hello,</b>  World!"), "hello world")
+
+class TestContentDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.dedup = ContentDeduplicator()
+        self.content = {
+            "description": "Organic Cotton Tee Red in soft breathable cotton.",
+            "alt_text": "Organic Cotton Tee Red folded on a table",
+        }
+        self.dedup.add("sku-red", "Organic Cotton Tee Red", DESCRIPTION, self.content)
+
+    def test_near_duplicate_reuses_content(self):
+        """Test that a small edit reuses content with the new name swapped in"""
+        variant = DESCRIPTION.replace("relaxed fit", "relaxed fit in blue")
+        reused = self.dedup.lookup("sku-blue", "Organic Cotton Tee Blue", variant)
+        self.assertIsNotNone(reused)
+        self.assertEqual(reused["alt_text"], "Organic Cotton Tee Blue folded on a table")
+        report = self.dedup.report()
+        self.assertEqual(report["deduplicated"], 1)
+        self.assertEqual(report["products"][0]["reused_from"], "sku-red")
+
+    def test_different_product_not_matched(self):
+        other = "Stainless steel water bottle that keeps drinks cold for twenty four hours and hot for twelve."
+        self.assertIsNone(self.dedup.lookup("sku-bottle", "Bottle", other))
+
+    def test_own_entry_not_reused(self):
+        """Test that a product never matches itself and regenerated content replaces its entry"""
+        self.assertIsNone(self.dedup.lookup("sku-red", "Organic Cotton Tee Red", DESCRIPTION))
+        self.dedup.add("sku-red", "Organic Cotton Tee Red", DESCRIPTION, dict(self.content, alt_text="New alt"))
+        self.assertEqual(len(self.dedup.entries), 1)
+        reused = self.dedup.lookup("sku-red-2", "Organic Cotton Tee Red", DESCRIPTION)
+        self.assertEqual(reused["alt_text"], "New alt")
+
+    def test_short_descriptions_skipped(self):
+        self.assertIsNone(self.dedup.fingerprint("Red tee"))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.json")
+            self.dedup.save(path)
+            loaded = ContentDeduplicator.load(path)
+            self.assertIsNotNone(loaded.lookup("sku-red-2", "Organic Cotton Tee Red", DESCRIPTION))
+            report_path = os.path.join(tmp, "report.json")
+            loaded.write_report(report_path)
+            with open(report_path) as f:
+                self.assertEqual(json.load(f)["deduplicated"], 1)
+
+    def test_simhash_identical(self):
+        tokens = normalize_text(DESCRIPTION).split()
+        self.assertEqual(hamming_distance(simhash(tokens), simhash(list(tokens))), 0)
+
+if __name__ == '__main__':
+    unittest.main()
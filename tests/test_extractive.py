@@ -0,0 +1,98 @@
+import unittest
+from landing_page_generator import LandingPageGenerator, MiddleSeekProcessor
+from middle_seek.dedup import ContentDeduplicator
+from middle_seek.extractive import ExtractiveGenerator, split_sentences
+from middle_seek.text import html_to_text
+from middle_seek.validation import FieldValidator
+
+DESCRIPTION = """<p>Experience crystal-clear sound with the AeroBeat 700 wireless headphones.</p>
+<ul><li>Active noise cancellation blocks up to 95% of ambient noise.</li>
+<li>30-hour battery life keeps you listening all week.</li></ul>
+<p>Free shipping on all orders. Our company was founded in 1999.
+Bluetooth 5.3 pairs instantly with phones and laptops.</p>"""
+
+class OfflineProcessor(MiddleSeekProcessor):
+    def __init__(self):
+        super().__init__('test-key')
+        self.calls = 0
+
+    def _call_deepseek_choices(self, prompt, intention, field=None, params=None):
+        self.calls += 1
+        return None
+
+class TestExtractiveGenerator(unittest.TestCase):
+    def setUp(self):
+        self.engine = ExtractiveGenerator()
+        self.validator = FieldValidator()
+        self.name = "AeroBeat 700 Headphones"
+
+    def test_description_picks_sentences_in_order(self):
+        description = self.engine.rewrite_description(DESCRIPTION, self.name)
+        sentences = split_sentences(description)
+        self.assertTrue(2 <= len(sentences) <= 3)
+        self.assertNotIn("<", description)
+        self.assertNotIn("founded in 1999", description)
+        source = split_sentences(html_to_text(DESCRIPTION))
+        positions = [source.index(sentence) for sentence in sentences]
+        self.assertEqual(positions, sorted(positions))
+        self.assertEqual(self.validator.validate('description', description, DESCRIPTION), [])
+
+    def test_fields_within_limits(self):
+        meta = self.engine.generate_meta_description(self.name, DESCRIPTION)
+        title = self.engine.generate_title_tag(self.name, "Sound Shop")
+        alt = self.engine.generate_alt_text(self.name, DESCRIPTION)
+        self.assertEqual(self.validator.validate('meta_description', meta, DESCRIPTION), [])
+        self.assertEqual(self.validator.validate('title_tag', title), [])
+        self.assertEqual(self.validator.validate('alt_text', alt, DESCRIPTION), [])
+        self.assertEqual(title, "AeroBeat 700 Headphones | Sound Shop")
+        self.assertIn("30-hour battery life", alt)
+        long_title = self.engine.generate_title_tag("Ultra " * 20 + "Headphones", "Sound Shop")
+        self.assertLessEqual(len(long_title), 60)
+        self.assertTrue(long_title.endswith("| Sound Shop"))
+
+    def test_image_alts_use_file_name_hints(self):
+        alts = self.engine.generate_image_alts(self.name, DESCRIPTION,
+                                               ["https://cdn/x/aerobeat-black-side.jpg", "https://cdn/x/IMG_0042.jpg"])
+        self.assertEqual(alts["https://cdn/x/aerobeat-black-side.jpg"], "AeroBeat 700 Headphones, black side view")
+        self.assertEqual(alts["https://cdn/x/IMG_0042.jpg"], "AeroBeat 700 Headphones product image 2")
+
+    def test_deterministic(self):
+        first = self.engine.generate_content(self.name, DESCRIPTION, ["a-front.jpg"])
+        self.assertEqual(first, ExtractiveGenerator().generate_content(self.name, DESCRIPTION, ["a-front.jpg"]))
+
+class TestLocalEngineSelection(unittest.TestCase):
+    def setUp(self):
+        self.product = {"id": "1", "name": "AeroBeat 700 Headphones", "description": DESCRIPTION,
+                        "price": "99", "tier": "long-tail"}
+
+    def make_generator(self, **kwargs):
+        generator = LandingPageGenerator('templates/landing_page.html', 'test-key', **kwargs)
+        generator.middle_seek = OfflineProcessor()
+        return generator
+
+    def test_selected_per_product_and_tier(self):
+        generator = self.make_generator(local_tiers=["long-tail"])
+        self.assertTrue(generator.uses_local_engine(self.product))
+        self.assertFalse(generator.uses_local_engine(dict(self.product, tier="hero")))
+        self.assertTrue(generator.uses_local_engine(dict(self.product, tier="hero", content_engine="local")))
+        self.assertFalse(generator.uses_local_engine(dict(self.product, content_engine="llm")))
+        self.assertTrue(self.make_generator(local_tiers=["*"]).uses_local_engine({"name": "x"}))
+
+    def test_local_pages_make_no_model_calls(self):
+        deduplicator = ContentDeduplicator()
+        generator = self.make_generator(local_tiers=["long-tail"], deduplicator=deduplicator)
+        html = generator.generate(self.product, "Sound Shop")
+        self.assertIn("noise cancellation", html)
+        self.assertEqual(generator.middle_seek.calls, 0)
+        self.assertEqual(len(deduplicator.entries), 0)
+
+    def test_outage_falls_back_to_extractive_copy(self):
+        generator = self.make_generator()
+        content = generator.generate_content(dict(self.product, tier="hero"))
+        engine = ExtractiveGenerator()
+        self.assertGreater(generator.middle_seek.calls, 0)
+        self.assertEqual(content['description'], engine.rewrite_description(DESCRIPTION))
+        self.assertEqual(content['alt_text'], engine.generate_alt_text(self.product['name'], DESCRIPTION))
+
+if __name__ == '__main__':
+    unittest.main()
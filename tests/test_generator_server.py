@@ -0,0 +1,94 @@
+import http.client
+import json
+import threading
+import unittest
+import urllib.request
+import urllib.error
+from landing_page_generator import LandingPageGenerator
+from generator_server import GeneratorServer, ContentCache
+from middle_seek.metrics import MetricsRegistry
+from tests.fakes import FakeProcessor
+
+class TestGeneratorServer(unittest.TestCase):
+    def setUp(self):
+        self.generator = LandingPageGenerator('templates/landing_page.html', 'test-key')
+        self.generator.middle_seek = FakeProcessor()
+        self.server = GeneratorServer(("127.0.0.1", 0), self.generator, "Test Store",
+                                      ContentCache(max_entries=2), MetricsRegistry())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        self.product = {"name": "Test Product", "description": "Great features.", "price": "9.99"}
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(self.base + path, data=json.dumps(payload).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def test_generate_caches_content(self):
+        """Test that repeated previews reuse generated content"""
+        first = self._post("/generate", {"product": self.product})
+        second = self._post("/generate", {"product": self.product, "store_name": "Other"})
+        self.assertIn("Rewritten Great features.", first["html"])
+        self.assertIn("Other", second["html"])
+        self.assertEqual(self.generator.middle_seek.calls, 2)
+
+    def test_cache_key_covers_images_and_engine(self):
+        key = ContentCache.key(self.product)
+        self.assertNotEqual(key, ContentCache.key(dict(self.product, main_image="https://cdn.example.com/a.jpg")))
+        self.assertNotEqual(key, ContentCache.key(dict(self.product, content_engine="local")))
+        self.assertEqual(key, ContentCache.key(dict(self.product, price="1.00")))
+
+    def test_render_without_model_calls(self):
+        content = {"description": "Given copy.", "alt_text": "Given alt"}
+        result = self._post("/render", {"product": self.product, "content": content})
+        self.assertIn("Given copy.", result["html"])
+        self.assertEqual(self.generator.middle_seek.calls, 0)
+
+    def test_bad_request(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._post("/generate", {"product": {"name": "Missing description"}})
+        self.assertEqual(ctx.exception.code, 400)
+
+    def test_metrics(self):
+        self._post("/generate", {"product": self.product})
+        with urllib.request.urlopen(self.base + "/metrics") as response:
+            text = response.read().decode()
+        self.assertIn('generator_http_requests_total{path="/generate",status="200"} 1', text)
+        self.assertIn('generator_content_cache_total{result="miss"} 1', text)
+
+    def test_get_requests_are_counted(self):
+        urllib.request.urlopen(self.base + "/healthz").read()
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(self.base + "/missing")
+        self.assertEqual(ctx.exception.code, 404)
+        with urllib.request.urlopen(self.base + "/metrics") as response:
+            text = response.read().decode()
+        self.assertIn('generator_http_requests_total{path="/healthz",status="200"} 1', text)
+        self.assertIn('generator_http_requests_total{path="unmatched",status="404"} 1', text)
+
+    def test_generate_sanitizes_description(self):
+        """Test that previews send the model the same visible text as batch runs"""
+        product = dict(self.product, description="<div><p>Great <b>features</b>.</p><script>x()</script></div>")
+        result = self._post("/generate", {"product": product})
+        self.assertEqual(result["content"]["description"], "Rewritten Great features.")
+
+    def test_rejected_body_closes_connection(self):
+        """Test that unread request bodies are not parsed as a follow-up request"""
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+        try:
+            connection.request("POST", "/unknown", body=b'GET /healthz HTTP/1.1\r\n\r\n')
+            response = connection.getresponse()
+            response.read()
+            self.assertEqual(response.status, 404)
+            self.assertEqual(response.getheader("Connection"), "close")
+        finally:
+            connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+from landing_page_generator import LandingPageGenerator, product_images
+from middle_seek.dedup import ContentDeduplicator
+from middle_seek.images import (ImageAltCache, parse_image_alts, image_batches, MAX_IMAGES_PER_CALL,
+                                DEFAULT_IMAGE_ALT_ENTRIES)
+from tests.fakes import CannedProcessor
+
+DESCRIPTION = "A bright desk lamp with a warm glow for late evening work."
+
+def alts(*names):
+    return json.dumps({str(i): f"Desk lamp {name} view" for i, name in enumerate(names, 1)})
+
+class TestImageAltParsing(unittest.TestCase):
+    def test_parse_by_number(self):
+        urls = ["a.jpg", "b.jpg", "c.jpg"]
+        parsed = parse_image_alts('```json\n{"1": "Lamp front", "3": " \\"Lamp side\\" "}\n```', urls)
+        self.assertEqual(parsed, {"a.jpg": "Lamp front", "c.jpg": "Lamp side"})
+        self.assertEqual(parse_image_alts("nope", urls), {})
+
+    def test_batches(self):
+        urls = [f"{i}.jpg" for i in range(MAX_IMAGES_PER_CALL + 1)]
+        self.assertEqual([len(batch) for batch in image_batches(urls)], [MAX_IMAGES_PER_CALL, 1])
+
+    def test_cache_round_trip(self):
+        cache = ImageAltCache(max_entries=2)
+        for url in ("a", "b", "c"):
+            cache.put(url, url.upper())
+        self.assertEqual(cache.lookup(["a", "c"]), ({"c": "C"}, ["a"]))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "alts.json")
+            cache.save(path)
+            self.assertEqual(ImageAltCache.load(path).lookup(["b"])[0], {"b": "B"})
+            # Loading applies a bound too, keeping the most recently used entries
+            self.assertEqual(ImageAltCache.load(path).max_entries, DEFAULT_IMAGE_ALT_ENTRIES)
+            self.assertEqual(list(ImageAltCache.load(path, max_entries=1).entries), ["c"])
+
+class TestPerImageAltText(unittest.TestCase):
+    def setUp(self):
+        self.product = {"name": "Desk Lamp", "description": "A bright lamp.", "price": "20",
+                        "main_image": "lamp-front.jpg", "gallery_images": ["lamp-side.jpg", "lamp-front.jpg"]}
+
+    def make_generator(self, responses):
+        generator = LandingPageGenerator('templates/landing_page.html', 'test-key')
+        # One choice per call; the description is canned so only image alt calls reach the API
+        generator.middle_seek = CannedProcessor([[response] for response in responses])
+        generator.middle_seek.rewrite_description = lambda description: DESCRIPTION
+        return generator
+
+    def test_one_call_per_image_set(self):
+        """Test that every image gets its own alt text from a single call"""
+        generator = self.make_generator([alts("front", "side")])
+        self.assertEqual(product_images(self.product), ["lamp-front.jpg", "lamp-side.jpg"])
+        html = generator.generate(self.product, "Store")
+        self.assertEqual(len(generator.middle_seek.prompts), 1)
+        self.assertIn('src="lamp-front.jpg" alt="Desk lamp front view"', html)
+        self.assertIn('src="lamp-side.jpg" alt="Desk lamp side view"', html)
+
+    def test_cached_by_url(self):
+        generator = self.make_generator([alts("front", "side"), alts("top")])
+        generator.generate_content(self.product)
+        other = dict(self.product, name="Desk Lamp XL", gallery_images=["lamp-side.jpg", "lamp-top.jpg"])
+        content = generator.generate_content(other)
+        self.assertEqual(len(generator.middle_seek.prompts), 2)
+        self.assertIn("1. lamp-top.jpg", generator.middle_seek.prompts[1])
+        self.assertNotIn("lamp-side.jpg", generator.middle_seek.prompts[1])
+        self.assertEqual(content["image_alts"]["lamp-side.jpg"], "Desk lamp side view")
+
+    def test_image_alts_not_indexed_for_reuse(self):
+        generator = self.make_generator([alts("front", "side")])
+        generator.deduplicator = ContentDeduplicator()
+        self.product["description"] = "A bright desk lamp with a warm glow, a steel arm and a weighted base."
+        generator.generate_content(self.product)
+        self.assertEqual(list(generator.deduplicator.entries[0]["content"]), ["description"])
+
+    def test_invalid_alts_fall_back_uncached(self):
+        generator = self.make_generator([json.dumps({"1": "Desk lamp front view", "2": "Lamp"}), alts("?")])
+        content = generator.generate_content(self.product)
+        self.assertEqual(content["image_alts"]["lamp-side.jpg"], "Desk lamp ? view")
+        generator = self.make_generator([json.dumps({"1": "Desk lamp front view"}), "garbage"])
+        content = generator.generate_content(self.product)
+        self.assertEqual(content["image_alts"]["lamp-side.jpg"], "Desk Lamp, side view")
+        self.assertEqual(generator.image_alt_cache.lookup(["lamp-side.jpg"])[1], ["lamp-side.jpg"])
+
+if __name__ == '__main__':
+    unittest.main()
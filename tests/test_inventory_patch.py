@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from landing_page_generator import LandingPageGenerator, atomic_write, inventory_path, page_filename
+from inventory_patch import InventoryPatcher, replace_fragments
+from render_store import RenderStore
+from storefronts import Storefront
+
+class NoModelProcessor:
+    """Fails the test if anything asks for generated content."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"unexpected model call: {name}")
+
+class TestInventoryPatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.tmp, 'output')
+        os.makedirs(self.output_dir)
+        self.generator = LandingPageGenerator('templates/landing_page.html', 'test-key')
+        self.generator.middle_seek = NoModelProcessor()
+        self.product = {"name": "Desk Lamp", "description": "A lamp.", "price": "20.00", "stock_quantity": 50}
+        self.content = {"description": "A bright desk lamp.", "alt_text": "Desk lamp"}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_page(self, directory=None, store_name="Store", filename=None, save_context=False):
+        directory = directory or self.output_dir
+        os.makedirs(directory, exist_ok=True)
+        filename = filename or page_filename(self.product['name'])
+        html = self.generator.render(self.product, store_name, self.content)
+        atomic_write(os.path.join(directory, filename), html)
+        if save_context:
+            RenderStore(directory).save(filename, self.product, store_name, self.content)
+        return os.path.join(directory, filename)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_patch_matches_full_render(self):
+        """Test that patched pages equal a fresh render with the new price and stock"""
+        path = self.write_page()
+        original = self.read(path)
+        patcher = InventoryPatcher(self.generator, self.output_dir, store_name="Store")
+        result = patcher.run([{"name": "Desk Lamp", "price": "18.50", "stock_quantity": "7"}])
+        self.assertEqual((result['patched'], result['failed']), (1, 0))
+        expected = self.generator.render(dict(self.product, price="18.50", stock_quantity=7), "Store", self.content)
+        self.assertEqual(self.read(path), expected)
+        self.assertNotEqual(original, expected)
+        self.assertIn("Only 7 units remaining", expected)
+
+        # Restocking removes the alert; an identical update leaves the file alone
+        patcher.run([{"name": "Desk Lamp", "stock_quantity": 40}])
+        self.assertNotIn("units remaining", self.read(path))
+        self.assertEqual(patcher.run([{"name": "Desk Lamp", "stock_quantity": 40}])['unchanged'], 1)
+
+    def test_stock_only_update_keeps_price(self):
+        path = self.write_page()
+        InventoryPatcher(self.generator, self.output_dir).run([{"name": "Desk Lamp", "stock_quantity": 3}])
+        html = self.read(path)
+        self.assertIn('<p class="price">20.00</p>', html)
+        self.assertIn("Only 3 units remaining", html)
+
+    def test_updates_stored_context_and_variants(self):
+        self.write_page(save_context=True)
+        variant = self.write_page(filename=page_filename("Desk Lamp", "fr", "B"))
+        InventoryPatcher(self.generator, self.output_dir).run([{"name": "Desk Lamp", "price": "15.00"}])
+        self.assertEqual(RenderStore(self.output_dir).load(page_filename("Desk Lamp"))['product']['price'], "15.00")
+        self.assertIn('<p class="price">15.00</p>', self.read(variant))
+
+    def test_pages_without_markers(self):
+        path = os.path.join(self.output_dir, page_filename("Desk Lamp"))
+        atomic_write(path, "<p>old page</p>")
+        patcher = InventoryPatcher(self.generator, self.output_dir)
+        self.assertEqual(patcher.run([{"name": "Desk Lamp", "price": "1"}])['failed'], 1)
+
+        # With stored context the page is re-rendered instead, still without model calls
+        RenderStore(self.output_dir).save(page_filename("Desk Lamp"), self.product, "Store", self.content)
+        patcher.run([{"name": "Desk Lamp", "price": "1.00"}])
+        self.assertIn('<p class="price">1.00</p>', self.read(path))
+        self.assertIsNone(replace_fragments("<p>old page</p>", {"price": "x"}))
+
+    def test_dotted_names_do_not_collide(self):
+        """Test that a "Desk Lamp 2" row does not patch the "Desk Lamp 2.0" page"""
+        self.product['name'] = "Desk Lamp 2.0"
+        path = self.write_page(save_context=True)
+        before = self.read(path)
+        result = InventoryPatcher(self.generator, self.output_dir).run([{"name": "Desk Lamp 2", "price": "1.00"}])
+        self.assertEqual((result['patched'], result['missing']), (0, 1))
+        self.assertEqual(self.read(path), before)
+        self.assertEqual(RenderStore(self.output_dir).load(page_filename("Desk Lamp 2.0"))['product']['price'], "20.00")
+
+        result = InventoryPatcher(self.generator, self.output_dir).run([{"name": "Desk Lamp 2.0", "price": "1.00"}])
+        self.assertEqual(result['patched'], 1)
+
+    def test_missing_and_invalid_rows(self):
+        result = InventoryPatcher(self.generator, self.output_dir).run([
+            {"name": "Unknown", "price": "1"}, {"name": "Desk Lamp"}, {"name": "Desk Lamp", "stock_quantity": "lots"}])
+        self.assertEqual((result['missing'], result['failed']), (1, 2))
+
+    def test_stores_and_hydration_json(self):
+        """Test that every store tree is patched and JSON-only mode leaves HTML untouched"""
+        stores = [Storefront("Tech Haven"), Storefront("Gadget Barn", slug="barn")]
+        paths = [self.write_page(os.path.join(self.output_dir, store.slug), store.name) for store in stores]
+        InventoryPatcher(self.generator, self.output_dir, stores).run([{"name": "Desk Lamp", "price": "9.00"}])
+        for path in paths:
+            self.assertIn('<p class="price">9.00</p>', self.read(path))
+
+        before = [self.read(path) for path in paths]
+        patcher = InventoryPatcher(self.generator, self.output_dir, stores, write_html=False, write_json=True)
+        result = patcher.run([{"name": "Desk Lamp", "stock_quantity": 2}])
+        self.assertEqual((result['patched'], result['hydrated']), (0, 2))
+        self.assertEqual([self.read(path) for path in paths], before)
+        with open(os.path.join(self.output_dir, 'barn', inventory_path("Desk Lamp"))) as f:
+            inventory = json.load(f)
+        self.assertEqual(inventory['stock_quantity'], 2)
+        self.assertIn("Only 2 units remaining", inventory['fragments']['stock'])
+
+    def test_hydrated_pages_reference_inventory(self):
+        self.generator.inventory_hydration = True
+        html = self.generator.render(self.product, "Store", self.content)
+        self.assertIn("fetch('inventory/product_desk_lamp.json'", html)
+
+if __name__ == '__main__':
+    unittest.main()
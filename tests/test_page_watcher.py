@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.request
+from landing_page_generator import LandingPageGenerator
+from page_watcher import PageWatcher, LiveReloadServer, ALL_PAGES
+from sitemap_index import SitemapIndex
+from tests.fakes import FakeProcessor
+
+class TestPageWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.template = os.path.join(self.tmp, 'landing_page.html')
+        shutil.copy('templates/landing_page.html', self.template)
+        self.output_dir = os.path.join(self.tmp, 'output')
+        self.source = os.path.join(self.tmp, 'products.jsonl')
+        self.products = [
+            {"name": "Alpha Widget", "description": "The first widget.", "price": "10.00", "stock_quantity": 50},
+            {"name": "Beta Widget", "description": "The second widget.", "price": "20.00", "stock_quantity": 5},
+        ]
+        self._write_source()
+        self.processor = FakeProcessor()
+        self.watcher = self._make_watcher()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _make_watcher(self):
+        generator = LandingPageGenerator(self.template, 'test-key')
+        generator.middle_seek = self.processor
+        return PageWatcher(generator, "Test Store", self.output_dir, [self.source])
+
+    def _touch(self, path, content):
+        # Bump mtime explicitly so coarse filesystem timestamps still register the edit
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, 'w') as f:
+            f.write(content)
+        os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+    def _write_source(self):
+        content = "".join(json.dumps(product) + "\n" for product in self.products)
+        if os.path.exists(self.source):
+            self._touch(self.source, content)
+        else:
+            with open(self.source, 'w') as f:
+                f.write(content)
+
+    def read(self, name):
+        with open(os.path.join(self.output_dir, name)) as f:
+            return f.read()
+
+    def test_initial_build(self):
+        changed = self.watcher.build()
+        self.assertEqual(sorted(changed), ["product_alpha_widget.html", "product_beta_widget.html"])
+        self.assertEqual(self.processor.calls, 4)
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_template_edit_is_render_only(self):
+        """Test that a template edit re-renders every page without model calls"""
+        self.watcher.build()
+        with open(self.template) as f:
+            template = f.read()
+        self._touch(self.template, template.replace("<body>", "<body data-edited>"))
+        self.assertEqual(self.watcher.poll(), [ALL_PAGES])
+        self.assertEqual(self.processor.calls, 4)
+        self.assertIn("data-edited", self.read("product_beta_widget.html"))
+
+    def test_product_edit_regenerates_only_that_product(self):
+        self.watcher.build()
+        self.products[1]["description"] = "A reworded second widget."
+        self._write_source()
+        self.assertEqual(self.watcher.poll(), ["product_beta_widget.html"])
+        self.assertEqual(self.processor.calls, 6)
+        self.assertIn("Rewritten A reworded second widget.", self.read("product_beta_widget.html"))
+
+    def test_price_edit_reuses_content(self):
+        self.watcher.build()
+        self.products[0]["price"] = "12.50"
+        self._write_source()
+        self.assertEqual(self.watcher.poll(), ["product_alpha_widget.html"])
+        self.assertEqual(self.processor.calls, 4)
+        self.assertIn("12.50", self.read("product_alpha_widget.html"))
+
+    def test_image_edit_regenerates_alt_text(self):
+        """Test that stored content is not reused once the product's images change"""
+        self.watcher.build()
+        self.products[0]["main_image"] = "https://cdn.example.com/alpha-front.jpg"
+        self._write_source()
+        self.assertEqual(self.watcher.poll(), ["product_alpha_widget.html"])
+        self.assertIn('alt="Alpha Widget, alpha-front.jpg"', self.read("product_alpha_widget.html"))
+
+    def test_removed_product(self):
+        self.watcher.build()
+        self.products.pop()
+        self._write_source()
+        self.assertEqual(self.watcher.poll(), ["product_beta_widget.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "product_beta_widget.html")))
+
+    def test_sitemap_follows_edits_and_removals(self):
+        self.watcher.sitemap = SitemapIndex(self.output_dir, "https://shop.example.com", "Test Store")
+        self.watcher.build()
+        self.assertIn("product_beta_widget.html", self.read("sitemap-00001.xml"))
+        self.products.pop()
+        self._write_source()
+        self.watcher.poll()
+        self.assertNotIn("product_beta_widget.html", self.read("sitemap-00001.xml"))
+        self.assertNotIn("Beta Widget", self.read("catalog-00001.html"))
+
+    def test_restart_uses_stored_content(self):
+        self.watcher.build()
+        self._make_watcher().build()
+        self.assertEqual(self.processor.calls, 4)
+
+class TestLiveReloadServer(unittest.TestCase):
+    def test_serves_pages_with_reload_script(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            with open(os.path.join(output_dir, "page.html"), "w") as f:
+                f.write("<html><body>Hi</body></html>")
+            server = LiveReloadServer(("127.0.0.1", 0), output_dir)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/page.html") as response:
+                    body = response.read().decode()
+                self.assertIn("/__livereload", body)
+                server.notify(["page.html"])
+                self.assertEqual(server.wait(0, timeout=0), (1, ["page.html"]))
+            finally:
+                server.shutdown()
+                server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
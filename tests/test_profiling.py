@@ -0,0 +1,149 @@
+import cProfile
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import requests
+from landing_page_generator import LandingPageGenerator, MiddleSeekProcessor, atomic_write
+from middle_seek.profiling import StageProfiler
+from middle_seek.replay import RecordingSession, ReplaySession, request_key
+from middle_seek.tracing import Tracer, TRACER
+
+DESCRIPTION = "A bright desk lamp with a warm glow, a steel arm and a weighted base for late evening work."
+REWRITE = "A bright desk lamp with a warm glow and a steel arm. Its weighted base keeps it steady for late evening work."
+
+class CannedSession:
+    """Stands in for the API: answers every chat completion with the same text."""
+
+    def __init__(self, content):
+        self.body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+        self.calls = 0
+
+    def post(self, url, json=None, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        return response
+
+class ExclusiveProfile(cProfile.Profile):
+    """cProfile as on Python 3.12+: only one instance may be enabled per process."""
+    active = None
+
+    def enable(self, *args, **kwargs):
+        if ExclusiveProfile.active not in (None, self):
+            raise ValueError("Another profiling tool is already active")
+        ExclusiveProfile.active = self
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        if ExclusiveProfile.active is self:
+            ExclusiveProfile.active = None
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'llm.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_volatile_prompt_parts(self):
+        processor = MiddleSeekProcessor('test-key')
+        with TRACER.span("first"):
+            _, first = processor._build_payload("Rewrite this.", "CONTENT", "description", None)
+        with TRACER.span("second"):
+            _, second = processor._build_payload("Rewrite this.", "CONTENT", "description", None)
+        self.assertEqual(request_key(first), request_key(dict(second, model="other/model")))
+        _, other = processor._build_payload("Rewrite that.", "CONTENT", "description", None)
+        self.assertNotEqual(request_key(first), request_key(other))
+
+    def test_record_then_replay(self):
+        """Test that a recorded run can be repeated with no API calls"""
+        api = CannedSession(REWRITE)
+        recorder = MiddleSeekProcessor('test-key')
+        recorder.session = RecordingSession(api, self.path)
+        self.assertEqual(recorder.rewrite_description(DESCRIPTION), REWRITE)
+
+        replayer = MiddleSeekProcessor('test-key')
+        replayer.session = ReplaySession(self.path)
+        self.assertEqual(replayer.rewrite_description(DESCRIPTION), REWRITE)
+        self.assertEqual(api.calls, 1)
+        self.assertEqual(replayer.session.misses, 0)
+
+        # Unrecorded requests fail like an outage and get the usual fallback
+        self.assertNotEqual(replayer.rewrite_description("A different lamp entirely."), "")
+        self.assertGreater(replayer.session.misses, 0)
+
+class TestStageProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_profiles_generator_stages(self):
+        generator = LandingPageGenerator('templates/landing_page.html', 'test-key')
+        generator.middle_seek.session = CannedSession(REWRITE)
+        product = {"name": "Desk Lamp", "description": DESCRIPTION, "price": "20"}
+        output_dir = os.path.join(self.tmp.name, 'profile')
+        with StageProfiler(output_dir, sample_interval=0.001) as profiler:
+            for _ in range(3):
+                atomic_write(os.path.join(self.tmp.name, 'page.html'), generator.generate(product, "Store"))
+
+        for stage in ("prompt", "http", "json_parse", "clean_text", "render", "write"):
+            self.assertGreater(profiler.calls[stage], 0, stage)
+            self.assertTrue(os.path.exists(os.path.join(output_dir, f"{stage}.prof")), stage)
+        with open(os.path.join(output_dir, 'report.txt')) as f:
+            report = f.read()
+        self.assertIn("render: top functions by cumulative CPU time", report)
+        self.assertIn("allocation sites", report)
+        with open(os.path.join(output_dir, 'memory.collapsed')) as f:
+            stack, size = f.readline().rsplit(' ', 1)
+        self.assertIn(';', stack)
+        self.assertTrue(size.strip().isdigit())
+        self.assertNotIn(profiler, TRACER.listeners)
+
+    def test_nested_stages_are_separate(self):
+        tracer = Tracer()
+        profiler = StageProfiler(os.path.join(self.tmp.name, 'nested'), tracer=tracer)
+        profiler.start()
+        with tracer.span("render"):
+            with tracer.span("json.parse"):
+                sum(range(1000))
+            with tracer.span("unrelated"):
+                pass
+        profiler.stop()
+        self.assertEqual((profiler.calls["render"], profiler.calls["json_parse"]), (1, 1))
+        self.assertEqual(set(profiler.stage_stats()), {"render", "json_parse"})
+
+    def test_concurrent_stages_with_one_profiler_slot(self):
+        """Test that stages fall back to timing when the profiler slot is taken, as on Python 3.12+"""
+        tracer = Tracer()
+        profiler = StageProfiler(os.path.join(self.tmp.name, 'exclusive'), tracer=tracer, sample_interval=0.001)
+        entered, done = threading.Event(), threading.Event()
+
+        def render():
+            with tracer.span("render"):
+                entered.set()
+                done.wait(5)
+
+        with mock.patch('middle_seek.profiling.cProfile.Profile', ExclusiveProfile):
+            profiler.start()
+            thread = threading.Thread(target=render)
+            thread.start()
+            entered.wait(5)
+            with tracer.span("json.parse"):
+                sum(range(1000))
+            done.set()
+            thread.join()
+            profiler.stop()
+        self.assertEqual((profiler.calls["render"], profiler.calls["json_parse"]), (1, 1))
+        self.assertEqual(profiler.unprofiled, {"json_parse": 1})
+        self.assertIn("Timed but not CPU-profiled", profiler.report())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import random
+from middle_seek.routing import ModelRouter, DEFAULT_MODEL
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.routes = {
+            "CONTENT": {"description": {"model": "big", "max_tokens": 300}},
+            "SEO": {"title_tag": [{"model": "fast-a", "max_tokens": 30},
+                                  {"model": "fast-b", "max_tokens": 30}]},
+            "*": {"*": {"model": "default", "max_tokens": 500}},
+        }
+        self.router = ModelRouter(self.routes, min_samples=2, explore_rate=0.0,
+                                  rng=random.Random(0))
+
+    def test_field_routes(self):
+        """Test that fields map to their own model and parameters"""
+        route = self.router.select("CONTENT", "description")
+        self.assertEqual(route, {"model": "big", "max_tokens": 300})
+        self.assertEqual(self.router.select("SEO", "unknown")["model"], "default")
+        self.assertEqual(self.router.select("OTHER")["model"], "default")
+
+    def test_aliases(self):
+        """Test that generator intentions resolve to the shared table"""
+        route = self.router.select("ETHICAL-OPTIMIZATION", "description")
+        self.assertEqual(route["model"], "big")
+
+    def test_latency_aware_selection(self):
+        """Test that the faster healthy candidate wins once stats exist"""
+        self.assertEqual(self.router.select("SEO", "title_tag")["model"], "fast-a")
+        for _ in range(3):
+            self.router.record("fast-a", 2.0, True)
+        # fast-b is still unexplored, so it gets probed next
+        self.assertEqual(self.router.select("SEO", "title_tag")["model"], "fast-b")
+        for _ in range(3):
+            self.router.record("fast-b", 0.5, True)
+        self.assertEqual(self.router.select("SEO", "title_tag")["model"], "fast-b")
+
+    def test_errors_penalize_candidate(self):
+        """Test that a fast but failing candidate is ranked down"""
+        for _ in range(4):
+            self.router.record("fast-a", 1.0, True)
+            self.router.record("fast-b", 0.4, True)
+            self.router.record("fast-b", 0.4, False)
+        self.assertEqual(self.router.select("SEO", "title_tag")["model"], "fast-a")
+        self.assertEqual(self.router.snapshot()["fast-b"]["error_rate"], 0.5)
+
+    def test_default_table(self):
+        """Test that the default table keeps the large model for descriptions"""
+        router = ModelRouter()
+        self.assertEqual(router.select("CONTENT", "description")["model"], DEFAULT_MODEL)
+        self.assertLess(router.select("SEO", "title_tag")["max_tokens"], 500)
+
+if __name__ == '__main__':
+    unittest.main()
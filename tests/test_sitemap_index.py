@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from sitemap_index import SitemapIndex
+
+class TestSitemapIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_index(self):
+        return SitemapIndex(self.output_dir, "https://shop.example.com", "Test Store", shard_size=2)
+
+    def read(self, name):
+        with open(os.path.join(self.output_dir, name)) as f:
+            return f.read()
+
+    def test_sharding(self):
+        """Test that pages fill shards in order and the index lists every shard"""
+        index = self.make_index()
+        for i in range(5):
+            index.record(f"product_{i}.html", f"Product {i}", f"<html>{i}</html>")
+        self.assertEqual(index.flush(), [1, 2, 3])
+        self.assertIn("https://shop.example.com/product_4.html", self.read("sitemap-00003.xml"))
+        sitemap = self.read("sitemap.xml")
+        self.assertEqual(sitemap.count("<sitemap>"), 3)
+        self.assertIn('href="catalog-00002.html"', self.read("catalog.html"))
+        self.assertIn("Product 1", self.read("catalog-00001.html"))
+
+    def test_only_changed_shards_rewritten(self):
+        index = self.make_index()
+        for i in range(4):
+            index.record(f"product_{i}.html", f"Product {i}", "v1")
+        index.flush()
+        lastmod_before = self.read("sitemap-00001.xml")
+
+        # A fresh instance picks up persisted state without scanning pages
+        index = self.make_index()
+        index.record("product_0.html", "Product 0", "v1")  # unchanged content
+        index.record("product_3.html", "Product 3", "v2")  # changed content
+        self.assertEqual(index.flush(), [2])
+        self.assertEqual(self.read("sitemap-00001.xml"), lastmod_before)
+
+        index.record("product_4.html", "Product 4", "v1")
+        self.assertEqual(index.flush(), [3])
+
+    def test_remove(self):
+        index = self.make_index()
+        index.record("a.html", "A", "x")
+        index.record("b.html", "B", "x")
+        index.flush()
+        index.remove("a.html")
+        self.assertEqual(index.flush(), [1])
+        self.assertNotIn("a.html", self.read("sitemap-00001.xml"))
+
+    def test_escaping(self):
+        index = self.make_index()
+        index.record("product_r&d kit.html", "R&D <Kit>", "x")
+        index.flush()
+        self.assertIn("product_r%26d%20kit.html", self.read("sitemap-00001.xml"))
+        self.assertIn("R&amp;D &lt;Kit&gt;", self.read("catalog-00001.html"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+from landing_page_generator import LandingPageGenerator
+from storefronts import Storefront, load_storefronts, store_slug
+
+class CountingGenerator(LandingPageGenerator):
+    def __init__(self):
+        super().__init__('templates/landing_page.html', 'test-key')
+        self.calls = 0
+
+    def generate_content(self, product_data):
+        self.calls += 1
+        return {'description': 'Shared copy.', 'alt_text': 'Shared alt'}
+
+class TestStorefronts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_stores(self, entries):
+        path = os.path.join(self.tmp.name, 'stores.json')
+        with open(path, 'w') as f:
+            json.dump(entries, f)
+        return path
+
+    def test_load(self):
+        stores = load_storefronts(self.write_stores([
+            {"name": "Tech Haven"},
+            {"name": "Gadget Barn", "slug": "barn", "base_url": "https://barn.example/"}]))
+        self.assertEqual([store.slug for store in stores], ['tech-haven', 'barn'])
+        self.assertEqual(stores[0].site_url('https://shop.example'), 'https://shop.example/tech-haven/')
+        self.assertEqual(stores[1].site_url('https://shop.example'), 'https://barn.example/')
+        self.assertEqual(Storefront('Tech Haven', slug='').path('p.html'), 'p.html')
+
+    def test_rejects_bad_config(self):
+        with self.assertRaises(ValueError):
+            load_storefronts(self.write_stores([{"name": "A b"}, {"name": "a-B"}]))
+        with self.assertRaises(ValueError):
+            load_storefronts(self.write_stores([]))
+        with self.assertRaises(ValueError):
+            store_slug("!!!")
+
+    def test_one_generation_many_stores(self):
+        """Test that store pages share content but get their own title and template"""
+        template = os.path.join(self.tmp.name, 'barn.html')
+        with open(template, 'w') as f:
+            f.write('<title>{{title_tag}}</title><p>{{description}}</p>')
+        generator = CountingGenerator()
+        stores = [Storefront('Tech Haven'), Storefront('Gadget Barn', template_path=template)]
+        pages = dict((store.slug, html) for store, html in
+                     generator.generate_stores({'name': 'Desk Lamp', 'description': 'x', 'price': '5'}, stores))
+        self.assertEqual(generator.calls, 1)
+        self.assertIn('<title>Desk Lamp | Tech Haven</title>', pages['tech-haven'])
+        self.assertEqual(pages['gadget-barn'], '<title>Desk Lamp | Gadget Barn</title><p>Shared copy.</p>')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import json
+import tempfile
+import unittest
+from landing_page_generator import LandingPageGenerator
+from middle_seek import DharmaProtocol
+from middle_seek.tracing import Tracer, TRACER, JsonLinesExporter, current_trace_id
+
+class Recorder:
+    def __init__(self):
+        self.ended = []
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        self.ended.append(span)
+
+class TestTracing(unittest.TestCase):
+    def test_trace_ids_unique_per_request(self):
+        """Test that a long-lived protocol instance still yields fresh trace IDs"""
+        dharma = DharmaProtocol()
+        self.assertNotEqual(dharma.generate_trace_id(), dharma.generate_trace_id())
+        with TRACER.span("request") as span:
+            self.assertTrue(dharma.generate_trace_id().endswith(span.trace_id))
+            self.assertEqual(current_trace_id(), span.trace_id)
+        self.assertIsNone(current_trace_id())
+
+    def test_span_tree_and_export(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spans.jsonl")
+            tracer = Tracer(JsonLinesExporter(path))
+            with tracer.span("page", product="Lamp") as root:
+                with tracer.span("llm.call", attempt=1) as child:
+                    pass
+                with self.assertRaises(ValueError):
+                    with tracer.span("render"):
+                        raise ValueError("bad template")
+
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+            spans = [line["resourceSpans"][0]["scopeSpans"][0]["spans"][0] for line in lines]
+            self.assertEqual([s["name"] for s in spans], ["llm.call", "render", "page"])
+            self.assertEqual(spans[0]["parentSpanId"], root.span_id)
+            self.assertEqual({s["traceId"] for s in spans}, {root.trace_id})
+            self.assertNotIn("parentSpanId", spans[2])
+            self.assertEqual(spans[1]["status"]["code"], 2)
+            self.assertIn({"key": "attempt", "value": {"intValue": "1"}}, spans[0]["attributes"])
+            self.assertEqual(len(root.trace_id), 32)
+            self.assertEqual(len(child.span_id), 16)
+
+    def test_generate_spans(self):
+        generator = LandingPageGenerator('templates/landing_page.html', 'test-key')
+        generator.generate_content = lambda product: {"description": "Copy.", "alt_text": "Alt"}
+        recorder = Recorder()
+        TRACER.add_listener(recorder)
+        try:
+            generator.generate({"name": "Lamp", "description": "d", "price": "1"}, "Store")
+        finally:
+            TRACER.remove_listener(recorder)
+        names = [span.name for span in recorder.ended]
+        self.assertEqual(names, ["render", "page"])
+        self.assertEqual(recorder.ended[0].parent_id, recorder.ended[1].span_id)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import requests
+from middle_seek import MiddleSeekProcessor
+from middle_seek.metrics import REGISTRY
+from middle_seek.validation import FieldValidator
+
+class ScriptedCore:
+    """Stands in for MiddleSeekCore, returning scripted outputs in order."""
+
+    def __init__(self, outputs):
+        self.outputs = list(outputs)
+        self.calls = []
+
+    def process_text(self, text, intention, field=None, params=None):
+        self.calls.append({"text": text, "field": field, "params": params})
+        return {"processed_text": self.outputs.pop(0)}
+
+class DownSession:
+    """Stands in for requests.Session while the API is unreachable."""
+
+    def __init__(self):
+        self.posts = 0
+
+    def post(self, url, **kwargs):
+        self.posts += 1
+        raise requests.exceptions.ConnectionError("API unreachable")
+
+class TestFieldValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = FieldValidator()
+
+    def test_valid_description(self):
+        text = "Automate compliance across 37 global regulations. Audit reports are generated instantly."
+        self.assertEqual(self.validator.validate("description", text), [])
+
+    def test_issues(self):
+        self.assertEqual(self.validator.validate("alt_text", "  "), ["empty"])
+        self.assertIn("too_short", self.validator.validate("description", "Experience."))
+        self.assertIn("too_long", self.validator.validate("title_tag", "x " * 40))
+        self.assertIn("quotes", self.validator.validate("alt_text", '"Red lamp on a desk"'))
+        self.assertIn("markdown", self.validator.validate("alt_text", "**Red** lamp on a desk"))
+        self.assertIn("protocol_leak", self.validator.validate("alt_text", "Lamp image (Dharma Verified)"))
+
+    def test_source_terms_allowed(self):
+        """Test that product vocabulary is not treated as a protocol leak"""
+        text = "DharmaComply dashboard showing verified audit evidence"
+        self.assertEqual(self.validator.validate("alt_text", text, "DharmaComply with Verified Evidence"), [])
+
+class TestTargetedRetries(unittest.TestCase):
+    def make_processor(self, outputs):
+        processor = MiddleSeekProcessor(openrouter_api_key="test-key", retry_budget=2)
+        processor.core = ScriptedCore(outputs)
+        return processor
+
+    def test_only_failing_field_is_retried(self):
+        good = "Automate compliance across 37 global regulations with instant audit reports."
+        processor = self.make_processor(["Experience", good])
+        before = REGISTRY.get("middleseek_validation_first_pass_total", intention="CONTENT", result="invalid")
+        self.assertEqual(processor.rewrite_description("Compliance suite"), good)
+        calls = processor.core.calls
+        self.assertEqual(len(calls), 2)
+        self.assertIsNone(calls[0]["params"])
+        self.assertEqual(calls[1]["params"], {"response_format": {"type": "json_object"}})
+        self.assertIn("previous answer was rejected", calls[1]["text"])
+        after = REGISTRY.get("middleseek_validation_first_pass_total", intention="CONTENT", result="invalid")
+        self.assertEqual(after, before + 1)
+
+    def test_product_name_not_truncated(self):
+        """Test that cleaning keeps words the product itself uses"""
+        processor = self.make_processor(["DharmaComply dashboard with audit reports"])
+        alt = processor.generate_alt_text("DharmaComply", "AI compliance suite")
+        self.assertEqual(alt, "DharmaComply dashboard with audit reports.")
+
+    def test_retry_budget_exhausted_uses_fallback(self):
+        processor = self.make_processor(["", "", ""])
+        self.assertEqual(processor.generate_alt_text("Lamp", "A desk lamp"), "Lamp product image")
+        self.assertEqual(len(processor.core.calls), 3)
+
+    def test_api_outage_falls_back_without_retries(self):
+        """Test that a failed request is not retried or counted as invalid output"""
+        session = DownSession()
+        processor = MiddleSeekProcessor(openrouter_api_key="test-key", retry_budget=2)
+        processor.core.session = session
+        before = REGISTRY.get("middleseek_validation_first_pass_total", intention="ACCESSIBILITY", result="invalid")
+        self.assertEqual(processor.generate_alt_text("Lamp", "A desk lamp"), "Lamp product image")
+        self.assertEqual(processor.rewrite_description("A desk lamp"), "A desk lamp")
+        self.assertEqual(session.posts, 2)
+        after = REGISTRY.get("middleseek_validation_first_pass_total", intention="ACCESSIBILITY", result="invalid")
+        self.assertEqual(after, before)
+
+class TestGeneratorValidation(unittest.TestCase):
+    """The landing page generator's own client goes through the same checks."""
+
+    def make_processor(self, outputs):
+        from landing_page_generator import MiddleSeekProcessor as GeneratorProcessor
+        processor = GeneratorProcessor("test-key", retry_budget=1)
+        processor.calls = []
+
+        def scripted(prompt, intention, field=None, params=None):
+            processor.calls.append(params)
+            return outputs.pop(0)
+        processor._call_deepseek = scripted
+        return processor
+
+    def test_invalid_output_retried_in_json_mode(self):
+        good = "Wireless headphones with noise cancellation"
+        processor = self.make_processor(["Headphones (Dharma Verified)", '{"raw": "%s"}' % good])
+        self.assertEqual(processor.generate_alt_text("Headphones", "Noise cancelling"), good)
+        self.assertEqual(processor.calls, [None, {"response_format": {"type": "json_object"}}])
+
+    def test_failed_request_falls_back(self):
+        processor = self.make_processor([None])
+        self.assertEqual(processor.generate_title_tag("Lamp", "Store"), "Lamp | Store")
+        self.assertEqual(len(processor.calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
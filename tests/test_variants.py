@@ -0,0 +1,102 @@
+import json
+import unittest
+from landing_page_generator import LandingPageGenerator, page_filename
+from middle_seek.variants import parse_variant_response, missing_cells, grid_batches, MAX_VARIANT_TOKENS
+from tests.fakes import CannedProcessor
+
+def cell(text):
+    return {"description": f"{text} copy. A bright desk lamp with a warm glow for late work.",
+            "alt_text": f"Lamp {text} on a desk"}
+
+class TestVariantParsing(unittest.TestCase):
+    def test_parse_fenced_response(self):
+        text = "```json\n" + json.dumps({"en": {"A": cell("en A"), "B": {"description": ""}}}) + "\n```"
+        cells = parse_variant_response(text, ["en", "de"], ["A", "B"])
+        self.assertEqual(list(cells), [("en", "A")])
+        self.assertEqual(missing_cells(cells, ["en", "de"], ["A", "B"]),
+                         [("en", "B"), ("de", "A"), ("de", "B")])
+
+    def test_parse_garbage(self):
+        self.assertEqual(parse_variant_response("not json", ["en"], ["A"]), {})
+
+class TestVariantGeneration(unittest.TestCase):
+    def test_structured_single_call(self):
+        """Test that all locales and variants come from one request"""
+        response = json.dumps({locale: {v: cell(f"{locale} {v}") for v in "AB"} for locale in ("en", "de")})
+        processor = CannedProcessor([[response]])
+        cells = processor.generate_variants("Lamp", "A bright lamp.", ["en", "de"], ["A", "B"])
+        self.assertEqual(len(processor.calls), 1)
+        self.assertEqual(cells[("de", "B")]["description"].split(".")[0], "de B copy")
+        self.assertGreater(processor.calls[0][1]["max_tokens"], 500)
+
+    def test_missing_cells_retried_once(self):
+        first = json.dumps({"en": {"A": cell("en A"), "B": cell("en B")}, "de": {"A": cell("de A")}})
+        second = json.dumps({"de": {"B": cell("de B")}})
+        processor = CannedProcessor([[first], [second]])
+        cells = processor.generate_variants("Lamp", "A bright lamp.", ["en", "de"], ["A", "B"])
+        self.assertEqual(len(processor.calls), 2)
+        self.assertEqual(cells[("de", "B")]["alt_text"], "Lamp de B on a desk")
+
+    def test_large_grid_split_by_locale(self):
+        """Test that a 12 x 2 grid is requested in batches that fit the token budget"""
+        locales = [f"l{i}" for i in range(12)]
+        batches = grid_batches(locales, ["A", "B"])
+        self.assertGreater(len(batches), 1)
+        self.assertEqual([locale for batch, _ in batches for locale in batch], locales)
+        self.assertTrue(all(variants == ["A", "B"] for _, variants in batches))
+
+        responses = [[json.dumps({locale: {v: cell(f"{locale} {v}") for v in "AB"} for locale in batch})]
+                     for batch, _ in batches]
+        processor = CannedProcessor(responses)
+        cells = processor.generate_variants("Lamp", "A bright lamp.", locales, ["A", "B"])
+        self.assertEqual(len(processor.calls), len(batches))
+        self.assertTrue(all(params["max_tokens"] <= MAX_VARIANT_TOKENS for _, params in processor.calls))
+        self.assertEqual(cells[("l11", "B")]["description"].split(".")[0], "l11 B copy")
+
+    def test_unparseable_response_retried(self):
+        second = json.dumps({"en": {"A": cell("en A")}})
+        processor = CannedProcessor([['{"en": {"A": {"descr'], [second]])
+        cells = processor.generate_variants("Lamp", "A bright lamp.", ["en"], ["A"])
+        self.assertEqual(len(processor.calls), 2)
+        self.assertEqual(cells[("en", "A")]["description"].split(".")[0], "en A copy")
+
+    def test_invalid_cells_are_regenerated(self):
+        """Test that cells failing validation are treated as missing"""
+        first = json.dumps({"en": {"A": cell("en A"), "B": {"description": "Too short.", "alt_text": "Lamp"}}})
+        second = json.dumps({"en": {"B": cell("en B")}})
+        processor = CannedProcessor([[first], [second]])
+        cells = processor.generate_variants("Lamp", "A bright lamp.", ["en"], ["A", "B"])
+        self.assertEqual(len(processor.calls), 2)
+        self.assertEqual(cells[("en", "B")]["alt_text"], "Lamp en B on a desk")
+
+    def test_n_strategy(self):
+        choices = [json.dumps(cell("A")), json.dumps(cell("B"))]
+        processor = CannedProcessor([choices])
+        cells = processor.generate_variants("Lamp", "A bright lamp.", ["fr"], ["A", "B"], strategy="n")
+        self.assertEqual(processor.calls[0][1]["n"], 2)
+        self.assertEqual(cells[("fr", "B")]["description"].split(".")[0], "B copy")
+
+    def test_render_per_variant(self):
+        response = json.dumps({"th": {"A": cell("th A")}})
+        generator = LandingPageGenerator('templates/landing_page.html', 'test-key')
+        generator.middle_seek = CannedProcessor([[response]])
+        product = {"name": "Lamp", "description": "<p>A <b>bright</b> lamp.</p>", "price": "20"}
+        pages = generator.generate_variants(product, "Store", ["th"], ["A"])
+        self.assertIn("Description: A bright lamp.", generator.middle_seek.prompts[0])
+        self.assertIn('<html lang="th">', pages[("th", "A")])
+        self.assertIn("th A copy.", pages[("th", "A")])
+        self.assertEqual(page_filename("Desk Lamp", "th", "A"), "product_desk_lamp.th.A.html")
+
+    def test_fallback_pages_declare_source_locale(self):
+        """Test that untranslated fallback copy is not labelled as the requested language"""
+        response = json.dumps({"th": {"A": cell("th A")}})
+        generator = LandingPageGenerator('templates/landing_page.html', 'test-key')
+        generator.middle_seek = CannedProcessor([[response]])
+        product = {"name": "Lamp", "description": "A bright lamp with a warm glow for late evening work.",
+                   "price": "20"}
+        pages = generator.generate_variants(product, "Store", ["th"], ["A", "B"])
+        self.assertIn('<html lang="th">', pages[("th", "A")])
+        self.assertIn('<html lang="en">', pages[("th", "B")])
+
+if __name__ == '__main__':
+    unittest.main()